@@ -0,0 +1,233 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import time
+from collections import OrderedDict
+
+import pytest
+
+from performance.utils.utils_baseline import (DEFAULT_BASELINE_RUNS, DEFAULT_BASELINE_STORE,
+                                              DEFAULT_REGRESSION_THRESHOLD)
+from session.utils.utils_collection import SkippedModule, SkippedTest, StubIndex
+from session.utils.utils_hooks import BUILDER, describe, EXECUTOR, group_modules, HookSignatures, module_id
+from session.utils.utils_reuse import DataCollectorCache
+from session.utils.utils_sharding import DEFAULT_DURATION_HISTORY, DurationHistory, partition, shard_units
+from session.utils.utils_warmup import DEFAULT_MEMORY_BUDGET_MB, DEFAULT_POOL_SIZE, WarmStandbyPool
+
+logger = logging.getLogger(__name__)
+
+
+def pytest_addoption(parser):
+    parser.addoption('--sdc-hook-grouping', action='store_true',
+                     help='Run modules asking for the same Data Collector configuration (from their sdc_*_hook '
+                          'fixtures) one after the other, on Data Collectors started once per configuration')
+    parser.addoption('--sdc-warm-pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                     help='Number of upcoming Data Collector configurations started in the background while the '
+                          'current module runs, with --sdc-hook-grouping (0 to disable)')
+    parser.addoption('--sdc-warm-pool-memory', type=int, default=DEFAULT_MEMORY_BUDGET_MB,
+                     help='Memory, in MB, the Data Collectors started by --sdc-hook-grouping and --sdc-warm-pool-size '
+                          'may take together, as estimated from their -Xmx')
+    parser.addoption('--shard-count', type=int, default=1,
+                     help='Number of shards the collected modules are split into, by their duration in the history')
+    parser.addoption('--shard-index', type=int, default=0,
+                     help='Shard to run, from 0 to --shard-count - 1')
+    parser.addoption('--duration-history',
+                     help='JSON file in which test durations are recorded and from which shards are balanced. '
+                          f'Durations are only recorded with this option or --shard-count (default: '
+                          f'{DEFAULT_DURATION_HISTORY})')
+    parser.addoption('--expand-stubs', action='store_true',
+                     help='Import and parametrize stub and skipped tests like any other test, instead of collecting '
+                          'each of them as a single skipped item (always the case for modules given explicitly)')
+    # Options of performance/conftest.py, which pytest only takes from the root conftest.py.
+    parser.addoption('--baseline-store', default=DEFAULT_BASELINE_STORE,
+                     help='SQLite file in which benchmark results are stored and compared against')
+    parser.addoption('--baseline-runs', type=int, default=DEFAULT_BASELINE_RUNS,
+                     help='Number of previous runs a benchmark result is compared against')
+    parser.addoption('--regression-threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                     help='Relative throughput drop (e.g. 0.1 for 10%%) above which a benchmark is a regression')
+    parser.addoption('--fail-on-regression', action='store_true',
+                     help='Fail regressed benchmarks instead of only flagging them')
+    parser.addoption('--dataset-registry',
+                     help='JSON file through which benchmark datasets are shared with the pytest runs before and '
+                          'after this one (see performance/compare_versions.py)')
+    parser.addoption('--keep-datasets', action='store_true',
+                     help='Leave the benchmark datasets in place at the end of the session for later runs')
+    parser.addoption('--el-cost-table',
+                     help='CSV file to which performance/test_el_cost.py writes its table of EL evaluation costs')
+
+
+def pytest_configure(config):
+    shard_count, shard_index = config.getoption('shard_count', 1), config.getoption('shard_index', 0)
+    if not 0 <= shard_index < shard_count:
+        raise pytest.UsageError(f'--shard-index must be between 0 and {shard_count - 1}, not {shard_index}')
+    duration_history = config.getoption('duration_history', None)
+    if duration_history is None and shard_count > 1:
+        duration_history = DEFAULT_DURATION_HISTORY
+    config.duration_history = DurationHistory(duration_history) if duration_history is not None else None
+    config.stub_index = StubIndex(getattr(config, 'cache', None))
+    # Modules given on the command line, whose stubs are expanded.
+    config.explicit_modules = set(str((config.invocation_params.dir / arg.split('::')[0]).resolve())
+                                  for arg in config.args)
+    # Module id: seconds spent collecting it.
+    config.collection_times = {}
+    config.lazily_collected_modules = set()
+
+
+def _collect_lazily(config, path):
+    return not config.getoption('expand_stubs', False) and str(path.resolve()) not in config.explicit_modules
+
+
+def pytest_pycollect_makemodule(module_path, parent):
+    """Collect modules whose tests all skip from their index, without importing them."""
+    if not _collect_lazily(parent.config, module_path):
+        return None
+    index = parent.config.stub_index.get(module_path)
+    if index is None or not index['lazy']:
+        return None
+    module = SkippedModule.from_parent(parent, path=module_path, index=index)
+    parent.config.lazily_collected_modules.add(module.nodeid)
+    return module
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pycollect_makeitem(collector, name, obj):
+    """Collect each stub or skipped test of an imported module as a single item, instead of one per parametrization."""
+    if not isinstance(collector, pytest.Module) or not _collect_lazily(collector.config, collector.path):
+        return None
+    index = collector.config.stub_index.get(collector.path)
+    lineno, reason = (index or {}).get('tests', {}).get(name, (None, None))
+    if reason is None or not callable(obj):
+        return None
+    return SkippedTest.from_parent(collector, name=name, reason=reason, lineno=lineno)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_make_collect_report(collector):
+    start = time.time()
+    yield
+    if isinstance(collector, pytest.File):
+        collector.config.collection_times[collector.nodeid] = time.time() - start
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    """Keep the modules of this shard, if the session is sharded, and group modules asking for identically
+    configured Data Collectors, i.e. with the same stage libraries, JVM options, ``sdc.properties`` and users, so that
+    they run one after the other on the same Data Collectors, if ``--sdc-hook-grouping`` is given.
+
+    When grouping, the signature of every module is kept in ``config.sdc_hook_signatures`` (module id to
+    :py:class:`session.utils.utils_hooks.HookSignature`), and the Data Collectors in ``config.sdc_cache``.
+    """
+    shard_count = config.getoption('shard_count', 1)
+    if shard_count > 1:
+        shards = partition(shard_units(items, config.duration_history), shard_count)
+        shard = shards[config.getoption('shard_index', 0)]
+        selected = set(item.nodeid for unit in shard for item in unit.items)
+        config.hook.pytest_deselected(items=[item for item in items if item.nodeid not in selected])
+        items[:] = [item for item in items if item.nodeid in selected]
+        logger.info('Running shard %s of %s: %s modules, %.1f s estimated (shards: %s)',
+                    config.getoption('shard_index', 0), shard_count, len(shard), sum(unit.duration for unit in shard),
+                    ', '.join(f'{sum(unit.duration for unit in other):.1f} s' for other in shards))
+
+    # Running hooks against the recorder costs time, so only when grouping.
+    if not config.getoption('sdc_hook_grouping', False):
+        return
+    signatures = HookSignatures(config.rootdir).module_signatures(items)
+    config.sdc_hook_signatures = signatures
+    items[:] = group_modules(items, signatures)
+    config.sdc_cache = DataCollectorCache()
+    distinct = list(OrderedDict.fromkeys(signature for signature in signatures.values() if signature is not None))
+    logger.info('Grouped %s modules by hook signature into %s distinct Data Collector configurations',
+                len(signatures), len(distinct))
+    for signature in distinct:
+        logger.debug('Data Collector configuration %s: %s', describe(signature),
+                     ', '.join(module for module, module_signature in signatures.items()
+                               if module_signature == signature))
+
+
+def pytest_collection_finish(session):
+    session.config.stub_index.save()
+    collection_times = sorted(session.config.collection_times.items(), key=lambda item: item[1], reverse=True)
+    logger.info('Collected %s modules in %.2f s (%s of them from their index of stub and skipped tests); slowest: %s',
+                len(collection_times), sum(seconds for _, seconds in collection_times),
+                len(session.config.lazily_collected_modules),
+                ', '.join(f'{module} {seconds:.2f} s' for module, seconds in collection_times[:10]))
+    for module, seconds in collection_times:
+        logger.debug('Collected %s in %.3f s%s', module, seconds,
+                     ' from its index' if module in session.config.lazily_collected_modules else '')
+
+    config = session.config
+    if getattr(config, 'sdc_cache', None) is None or not config.getoption('sdc_warm_pool_size', DEFAULT_POOL_SIZE):
+        return
+    config.sdc_warm_pool = WarmStandbyPool(config.sdc_cache, session.items, config.sdc_hook_signatures,
+                                           config.getoption('sdc_warm_pool_size'),
+                                           config.getoption('sdc_warm_pool_memory', DEFAULT_MEMORY_BUDGET_MB))
+
+
+@pytest.fixture(scope='module')
+def sdc_builder(request, sdc_common_hook, sdc_builder_hook):
+    """The test framework's ``sdc_builder``, shared by the modules of a group with ``--sdc-hook-grouping``."""
+    return _data_collector(request, BUILDER)
+
+
+@pytest.fixture(scope='module')
+def sdc_executor(request, sdc_common_hook, sdc_executor_hook):
+    """The test framework's ``sdc_executor``, shared by the modules of a group with ``--sdc-hook-grouping``."""
+    return _data_collector(request, EXECUTOR)
+
+
+def _data_collector(request, role):
+    # The hooks are requested by the fixtures above so that they are part of the fixture closure of every item,
+    # from which the hook signatures are computed.
+    cache = getattr(request.config, 'sdc_cache', None)
+    if cache is None:
+        return request.getfixturevalue(request.fixturename)
+    data_collector = cache.get(request, role, request.config.sdc_hook_signatures.get(module_id(request._pyfuncitem)))
+    pool = getattr(request.config, 'sdc_warm_pool', None)
+    if pool is not None:
+        # Once the module's own Data Collector is up, so that the next ones start from the same arguments.
+        pool.warm()
+    return data_collector
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    # Before the Data Collector fixtures of the module start, so that Data Collectors of other configurations are
+    # stopped first.
+    pool = getattr(item.config, 'sdc_warm_pool', None)
+    cache = getattr(item.config, 'sdc_cache', None)
+    if pool is not None:
+        pool.module_started(module_id(item))
+    elif cache is not None:
+        cache.module_started(item.config.sdc_hook_signatures.get(module_id(item)))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    if item.config.duration_history is not None:
+        report = outcome.get_result()
+        item.config.duration_history.record(report.nodeid, report.duration)
+
+
+def pytest_sessionfinish(session):
+    if session.config.duration_history is not None:
+        session.config.duration_history.save()
+    cache = getattr(session.config, 'sdc_cache', None)
+    if cache is not None:
+        cache.close()
+    pool = getattr(session.config, 'sdc_warm_pool', None)
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,144 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Run the same set of benchmarks against several SDC versions and report the results side by side.
+
+Every version gets its own pytest process (with ``--sdc-version``), so ``sdc_min_version`` markers and
+version-dependent hooks behave exactly as they do in a regular run. The runs share datasets through a
+:py:class:`performance.utils.utils_datasets.DatasetRegistry` file in the output directory
+(``--dataset-registry``): a dataset is built by the first run that needs it and reused by the following ones, and
+every run but the last keeps its datasets (``--keep-datasets``) so that the last one drops them. Example::
+
+    python -m performance.compare_versions --sdc-versions 3.15.0 3.16.0 --report report.txt \\
+        -- performance/test_fields.py -s
+
+The first version is the reference for the percentage deltas; the exit code is the highest of all runs.
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from performance.utils.utils_datasets import DatasetRegistry
+
+logger = logging.getLogger(__name__)
+
+# (extra_info key, column title, format) of the metrics in the report.
+REPORT_METRICS = [('records_per_second', 'records/s', '{:.0f}'),
+                  ('start_sec', 'start-up s', '{:.2f}'),
+                  ('heap_used_mb', 'heap MB', '{:.0f}')]
+
+
+def run_versions(sdc_versions, pytest_args, output_directory):
+    """Run the benchmarks once per SDC version, each in its own pytest process.
+
+    Returns:
+        A :obj:`tuple` of a :obj:`dict` mapping each version to the pytest-benchmark results (as loaded from its JSON
+        output) and a :obj:`list` of the exit codes of the pytest runs.
+    """
+    registry_path = os.path.join(output_directory, 'datasets.json')
+    results = {}
+    exit_codes = []
+    for index, sdc_version in enumerate(sdc_versions):
+        json_path = os.path.join(output_directory, f'{sdc_version}.json')
+        command = [sys.executable, '-m', 'pytest', *pytest_args, '--sdc-version', sdc_version,
+                   f'--benchmark-json={json_path}', f'--dataset-registry={registry_path}']
+        if index < len(sdc_versions) - 1:
+            command.append('--keep-datasets')
+        logger.info('Running benchmarks against SDC %s: %s', sdc_version, ' '.join(command))
+        exit_code = subprocess.run(command).returncode
+        exit_codes.append(exit_code)
+        if exit_code not in (pytest.ExitCode.OK, pytest.ExitCode.TESTS_FAILED):
+            logger.error('Benchmarks against SDC %s exited with %s', sdc_version, exit_code)
+        if os.path.exists(json_path):
+            with open(json_path) as f:
+                results[sdc_version] = json.load(f)
+        else:
+            results[sdc_version] = {'benchmarks': []}
+
+    # Datasets only used by earlier versions (e.g. because of sdc_min_version) are not dropped by the last run.
+    for key_id in DatasetRegistry(registry_path).stored():
+        logger.warning('Dataset %s was left in place and must be dropped by hand', key_id)
+    return results, exit_codes
+
+
+def build_report(results):
+    """Format benchmark results of several SDC versions as a side-by-side text table.
+
+    Each row is a benchmark, each metric gets a column per version and, for every version but the first, the
+    percentage change against the first. Benchmarks skipped for a version (e.g. by ``sdc_min_version``) show ``-``.
+    """
+    sdc_versions = list(results)
+    by_version = {sdc_version: {benchmark['fullname']: benchmark['extra_info']
+                                for benchmark in results[sdc_version]['benchmarks']}
+                  for sdc_version in sdc_versions}
+    names = sorted({name for benchmarks in by_version.values() for name in benchmarks})
+
+    header = ['benchmark']
+    for _, title, _ in REPORT_METRICS:
+        header.append(f'{title} {sdc_versions[0]}')
+        for sdc_version in sdc_versions[1:]:
+            header.extend([f'{title} {sdc_version}', 'delta'])
+
+    rows = [header]
+    for name in names:
+        row = [name]
+        for key, _, value_format in REPORT_METRICS:
+            reference = by_version[sdc_versions[0]].get(name, {}).get(key)
+            row.append(_format(value_format, reference))
+            for sdc_version in sdc_versions[1:]:
+                value = by_version[sdc_version].get(name, {}).get(key)
+                row.append(_format(value_format, value))
+                row.append(f'{(value - reference) / reference:+.1%}' if value is not None and reference else '-')
+        rows.append(row)
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+    return '\n'.join('  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
+
+
+def _format(value_format, value):
+    return value_format.format(value) if value is not None else '-'
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sdc-versions', nargs='+', required=True, help='SDC versions to compare, reference first')
+    parser.add_argument('--report', help='File to write the report to (it is always printed)')
+    parser.add_argument('--output-directory', help='Directory for the per-version pytest-benchmark JSON files')
+    parser.add_argument('pytest_args', nargs=argparse.REMAINDER, help='Arguments for pytest, after --')
+    args = parser.parse_args(argv)
+    pytest_args = args.pytest_args[1:] if args.pytest_args[:1] == ['--'] else args.pytest_args
+
+    output_directory = args.output_directory or tempfile.mkdtemp(prefix='sdc_version_comparison_')
+    os.makedirs(output_directory, exist_ok=True)
+    results, exit_codes = run_versions(args.sdc_versions, pytest_args or ['performance'], output_directory)
+    report = build_report(results)
+
+    print(report)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(report + '\n')
+    return max(exit_codes)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import warnings
+
+import pytest
+
+from performance.utils.utils_baseline import (BaselineStore, BenchmarkKey, compare, DEFAULT_BASELINE_RUNS,
+                                              DEFAULT_BASELINE_STORE, DEFAULT_REGRESSION_THRESHOLD)
+from performance.utils.utils_datasets import DatasetRegistry
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope='session')
+def dataset_registry(request):
+    """Session-wide :py:class:`performance.utils.utils_datasets.DatasetRegistry`. Datasets are dropped at the end
+    of the session, unless ``--keep-datasets`` leaves them to later runs sharing the ``--dataset-registry`` file
+    (see ``performance.compare_versions``)."""
+    registry = DatasetRegistry(request.config.getoption('dataset_registry', None),
+                               keep=request.config.getoption('keep_datasets', False))
+    try:
+        yield registry
+    finally:
+        registry.drop_all()
+
+
+@pytest.fixture(scope='session')
+def baseline_store(request):
+    store = BaselineStore(request.config.getoption('baseline_store', DEFAULT_BASELINE_STORE))
+    try:
+        yield store
+    finally:
+        store.close()
+
+
+@pytest.fixture(autouse=True)
+def benchmark_baseline(baseline_store):
+    """Store the result of every benchmark and compare it against the previous runs of the same benchmark.
+
+    The comparison happens in :py:func:`pytest_runtest_makereport`, once the test has run, so that a regression
+    fails the test itself rather than its teardown. Regressions are logged, flagged in the benchmark's
+    ``extra_info`` and, with ``--fail-on-regression``, fail the test.
+    """
+    return baseline_store
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if call.when != 'call' or not report.passed:
+        return
+
+    regression = _compare_with_baseline(item)
+    if regression is not None and item.config.getoption('fail_on_regression', False):
+        report.outcome = 'failed'
+        report.longrepr = f'Performance regression: {regression}'
+
+
+def _compare_with_baseline(item):
+    """Store the benchmark result of ``item`` and compare it against the baseline.
+
+    Returns:
+        A message describing the regression if the result is one, else ``None``.
+    """
+    baseline_store = item.funcargs.get('benchmark_baseline')
+    benchmark = item.funcargs.get('benchmark')
+    if baseline_store is None or benchmark is None or getattr(benchmark, 'disabled', False) \
+            or not getattr(benchmark, 'stats', None):
+        return None
+    # Only records/s are comparable across benchmarks and runs; rounds/s would mix units in the history.
+    throughput = benchmark.extra_info.get('records_per_second')
+    if not throughput:
+        logger.debug('No records_per_second for %s, not comparing it against a baseline', item.nodeid)
+        return None
+
+    sdc = item.funcargs.get('sdc_builder') or item.funcargs.get('sdc_executor')
+    callspec = getattr(item, 'callspec', None)
+    key = BenchmarkKey(test_id=item.nodeid,
+                       params=callspec.params if callspec else {},
+                       sdc_version=getattr(sdc, 'version', None),
+                       jvm_opts=getattr(sdc, 'SDC_JAVA_OPTS', None))
+
+    history = baseline_store.history(key, item.config.getoption('baseline_runs', DEFAULT_BASELINE_RUNS))
+    comparison = compare(throughput, history,
+                         threshold=item.config.getoption('regression_threshold', DEFAULT_REGRESSION_THRESHOLD))
+    baseline_store.add(key, throughput, benchmark.extra_info)
+
+    benchmark.extra_info['baseline_median'] = comparison.baseline_median
+    benchmark.extra_info['baseline_delta'] = comparison.delta
+    benchmark.extra_info['regression'] = comparison.regression
+    if comparison.delta is None:
+        logger.info('No baseline yet for %s (%s previous runs)', key.test_id, comparison.baseline_runs)
+        return None
+
+    message = (f'{key.test_id}: throughput {comparison.throughput:.2f} vs. baseline median '
+               f'{comparison.baseline_median:.2f} (MAD {comparison.baseline_mad:.2f}, '
+               f'{comparison.baseline_runs} runs): {comparison.delta:+.1%}')
+    if not comparison.regression:
+        logger.info(message)
+        return None
+    if not item.config.getoption('fail_on_regression', False):
+        logger.warning('Performance regression: %s', message)
+        warnings.warn(f'Performance regression: {message}')
+    return message
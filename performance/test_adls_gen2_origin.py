@@ -18,6 +18,8 @@ import os
 from streamsets.testframework.markers import azure, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from performance.utils.utils_object_store import AdlsGen2Store, delete_prefix, populate
+
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -27,7 +29,7 @@ ADLS_GEN2_ORIGIN = 'com_streamsets_pipeline_stage_origin_datalake_gen2_DataLakeG
 
 @azure('datalake')
 @sdc_min_version('3.9.0')
-def test_initial_scan(sdc_builder, sdc_executor, azure, benchmark):
+def test_initial_scan(sdc_builder, sdc_executor, azure, dataset_registry, benchmark):
     """Performance test for ADLS Gen2 origin.
 
     The test populates a random ADLS folder with a total of 1000 random files evenly distributed in 100
@@ -38,36 +40,42 @@ def test_initial_scan(sdc_builder, sdc_executor, azure, benchmark):
     Pipeline: adls_orig >> trash
 
     """
-    directory_name = f'stf_perf_{get_random_string()}'
     fs = azure.datalake.file_system
+    directory_name = dataset_registry.get(('adls_gen2', 'text', 100, 10),
+                                          create=lambda: _adls_create_dataset(fs),
+                                          drop=lambda directory_name: _adls_drop_dataset(fs, directory_name))
+
+    # Build the origin pipeline
+    builder = sdc_builder.get_pipeline_builder()
+    trash = builder.add_stage('Trash')
+    adls_orig = builder.add_stage(name=ADLS_GEN2_ORIGIN)
+    adls_orig.set_attributes(data_format='TEXT',
+                             files_directory=f'/{directory_name}',
+                             file_name_pattern='*',
+                             read_order='TIMESTAMP',
+                             process_subdirectories=True)
+    adls_orig >> trash
+    pipeline = builder.build().configure_for_environment(azure)
+
+    def benchmark_pipeline(executor, pipeline):
+        executor.add_pipeline(pipeline)
+        executor.start_pipeline(pipeline).wait_for_status('RUNNING', timeout_sec=1200)
+        executor.stop_pipeline(pipeline).wait_for_stopped()
+        executor.remove_pipeline(pipeline)
+
+    benchmark.pedantic(benchmark_pipeline, args=(sdc_executor, pipeline), rounds=5)
+
+
+def _adls_create_dataset(adls_client):
+    """Populate a random directory with 100 subdirectories of 10 files each and return its name."""
+    directory_name = f'stf_perf_{get_random_string()}'
+    _adls_populate_dir(adls_client, directory_name, num_dirs=100, num_files=10)
+    return directory_name
 
-    try:
-        # Build the origin pipeline
-        builder = sdc_builder.get_pipeline_builder()
-        trash = builder.add_stage('Trash')
-        adls_orig = builder.add_stage(name=ADLS_GEN2_ORIGIN)
-        adls_orig.set_attributes(data_format='TEXT',
-                                 files_directory=f'/{directory_name}',
-                                 file_name_pattern='*',
-                                 read_order='TIMESTAMP',
-                                 process_subdirectories=True)
-        adls_orig >> trash
-        pipeline = builder.build().configure_for_environment(azure)
-
-        # Populate the Azure directory employed in the test.
-        _adls_populate_dir(fs, directory_name, num_dirs=100, num_files=10)
-
-        def benchmark_pipeline(executor, pipeline):
-            executor.add_pipeline(pipeline)
-            executor.start_pipeline(pipeline).wait_for_status('RUNNING', timeout_sec=1200)
-            executor.stop_pipeline(pipeline).wait_for_stopped()
-            executor.remove_pipeline(pipeline)
-
-        benchmark.pedantic(benchmark_pipeline, args=(sdc_executor, pipeline), rounds=5)
 
-    finally:
-        logger.info('Azure Data Lake directory %s and underlying files will be deleted.', directory_name)
-        fs.rmdir(directory_name, recursive=True)
+def _adls_drop_dataset(adls_client, directory_name):
+    logger.info('Azure Data Lake directory %s and underlying files will be deleted.', directory_name)
+    delete_prefix(AdlsGen2Store(adls_client), directory_name)
 
 
 def _adls_populate_dir(adls_client, path, num_dirs=100, num_files=10):
@@ -78,24 +86,7 @@ def _adls_populate_dir(adls_client, path, num_dirs=100, num_files=10):
     """
     adls_client.mkdir(path)
 
-    for _ in range(num_dirs):
-        folder_name = get_random_string(length=10)
-        for _ in range(num_files):
-            file_name = "{}.txt".format(get_random_string(length=10))
-            file_path = os.path.join(path, folder_name, file_name)
-            try:
-                logger.info("Creating new file: %s...", file_path)
-                _adls_create_file(adls_client, file_path, file_path)
-            except Exception as e:
-                logger.error("Could not create blob: %s: %s", file_path, str(e))
-
-
-def _adls_create_file(adls_client, file_content, file_path):
-    """Create a file in ADLS with the specified content.  If the file already exist, overrite content with
-    `file_content`.
-
-    """
-    res1 = adls_client.touch(file_path)
-    res2 = adls_client.write(file_path, file_content)
-    if not (res1.response.ok and res2.response.ok):
-        raise RuntimeError(f'Could not create file: {file_path}')
+    file_paths = (os.path.join(path, folder_name, f'{get_random_string(length=10)}.txt')
+                  for folder_name in (get_random_string(length=10) for _ in range(num_dirs))
+                  for _ in range(num_files))
+    populate(AdlsGen2Store(adls_client), ((file_path, file_path) for file_path in file_paths))
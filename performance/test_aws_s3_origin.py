@@ -18,6 +18,8 @@ import os
 from streamsets.testframework.markers import aws, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from performance.utils.utils_object_store import delete_prefix, populate, S3Store
+
 import json
 
 S3_SANDBOX_PREFIX = 'sandbox'
@@ -26,7 +28,7 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 @aws('s3')
-def test_startup(sdc_builder, sdc_executor, aws, benchmark):
+def test_startup(sdc_builder, sdc_executor, aws, dataset_registry, benchmark):
     """Performance test for AWS S3 Origin.
 
     The test populates a random AWS S3 directory in the bucket specified by the aws instance with a total of
@@ -35,42 +37,44 @@ def test_startup(sdc_builder, sdc_executor, aws, benchmark):
 
     Pipeline: s3_origin >> trash
     """
-    s3_key = f'{S3_SANDBOX_PREFIX}/{get_random_string()}/sdc'
     num_files = 1000
-    data = dict(f1=get_random_string(), f2=get_random_string())
-
-    try:
-        # Build the pipeline
-        builder = sdc_builder.get_pipeline_builder()
-        builder.add_error_stage('Discard')
-
-        s3_origin = builder.add_stage('Amazon S3', type='origin')
-        s3_origin.set_attributes(bucket=aws.s3_bucket_name,
-                                 data_format='JSON',
-                                 prefix_pattern=f'{s3_key}/*',
-                                 number_of_threads=5,
-                                 read_order='LEXICOGRAPHICAL')
-
-        trash = builder.add_stage('Trash')
-
-        s3_origin >> trash
-
-        s3_origin_pipeline = builder.build(title='Amazon S3 origin startup performance').configure_for_environment(aws)
-
-        # Populate the directory
-        for i in range(num_files):
-            aws.s3.put_object(Bucket=aws.s3_bucket_name, Key=f'{s3_key}/{i}', Body=json.dumps(data))
-
-        def benchmark_pipeline(executor, pipeline):
-            executor.add_pipeline(pipeline)
-            executor.start_pipeline(pipeline).wait_for_status('RUNNING', timeout_sec=1000)
-            executor.stop_pipeline(pipeline).wait_for_stopped()
-            executor.remove_pipeline(pipeline)
-
-        benchmark.pedantic(benchmark_pipeline, args=(sdc_executor, s3_origin_pipeline), rounds=5)
-    finally:
-        # Clean up S3.
-        delete_keys = {'Objects': [{'Key': k['Key']}
-                                   for k in
-                                   aws.s3.list_objects_v2(Bucket=aws.s3_bucket_name, Prefix=s3_key)['Contents']]}
-        aws.s3.delete_objects(Bucket=aws.s3_bucket_name, Delete=delete_keys)
+    s3_key = dataset_registry.get(('s3', aws.s3_bucket_name, 'json_f1_f2', num_files),
+                                  create=lambda: _s3_populate_prefix(aws, num_files),
+                                  drop=lambda s3_key: _s3_delete_prefix(aws, s3_key))
+
+    # Build the pipeline
+    builder = sdc_builder.get_pipeline_builder()
+    builder.add_error_stage('Discard')
+
+    s3_origin = builder.add_stage('Amazon S3', type='origin')
+    s3_origin.set_attributes(bucket=aws.s3_bucket_name,
+                             data_format='JSON',
+                             prefix_pattern=f'{s3_key}/*',
+                             number_of_threads=5,
+                             read_order='LEXICOGRAPHICAL')
+
+    trash = builder.add_stage('Trash')
+
+    s3_origin >> trash
+
+    s3_origin_pipeline = builder.build(title='Amazon S3 origin startup performance').configure_for_environment(aws)
+
+    def benchmark_pipeline(executor, pipeline):
+        executor.add_pipeline(pipeline)
+        executor.start_pipeline(pipeline).wait_for_status('RUNNING', timeout_sec=1000)
+        executor.stop_pipeline(pipeline).wait_for_stopped()
+        executor.remove_pipeline(pipeline)
+
+    benchmark.pedantic(benchmark_pipeline, args=(sdc_executor, s3_origin_pipeline), rounds=5)
+
+
+def _s3_populate_prefix(aws, num_files):
+    """Populate a random S3 prefix with `num_files` small JSON objects and return the prefix."""
+    s3_key = f'{S3_SANDBOX_PREFIX}/{get_random_string()}/sdc'
+    body = json.dumps(dict(f1=get_random_string(), f2=get_random_string()))
+    populate(S3Store(aws.s3, aws.s3_bucket_name), ((f'{s3_key}/{i}', body) for i in range(num_files)))
+    return s3_key
+
+
+def _s3_delete_prefix(aws, s3_key):
+    delete_prefix(S3Store(aws.s3, aws.s3_bucket_name), s3_key)
@@ -0,0 +1,152 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Performance tests for the evaluation cost of Expression Language functions, using the
+dev_data_generator >> expression_evaluator >> trash pipeline of the EL correctness tests.
+Every expression of the catalogue is evaluated several times per record; its cost per evaluation is the difference
+with the constant expression, measured once per module, so that the cost of the pipeline itself cancels out (the
+``record:value`` depth expressions also carry the cost of creating their nested fields, once per record). At the end
+of the module, the costs are logged as a table, sorted from the most expensive, and written to the CSV file given by
+``--el-cost-table``.
+"""
+
+import csv
+import logging
+
+import pytest
+
+from performance.utils.utils_benchmark import benchmark_pipeline, measure_pipeline
+from pipeline.utils.utils_expressions import get_random_expression_pipeline_builder
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+RECORDS_PER_TEST = 1_000_000
+# Copies of the expression evaluated per record, to make its cost stand out from the pipeline overhead.
+EVALUATIONS_PER_RECORD = 10
+BASELINE = 'constant'
+
+
+def _nested_path(depth):
+    return ''.join(f'/level{level}' for level in range(1, depth + 1))
+
+
+def _nested_record_setup(depth):
+    """Field expressions creating a string at ``depth`` levels of nested maps."""
+    return ([{'fieldToSet': _nested_path(level), 'expression': '${emptyMap()}'} for level in range(1, depth)]
+            + [{'fieldToSet': _nested_path(depth), 'expression': '${record:value("/text")}'}])
+
+
+def _nested_conditional(depth):
+    """``depth`` nested ternary operators, all but the last of which go to the else branch for most records."""
+    expression = '"other"'
+    for level in range(depth, 0, -1):
+        expression = f'(record:value("/number") % {level + 100} == 0 ? "divisible{level}" : {expression})'
+    return f'${{{expression}}}'
+
+
+# Name: (expression, field expressions setting up the record).
+EXPRESSIONS = {
+    BASELINE: ('${"constant"}', []),
+    'str_concat': ('${str:concat(record:value("/text"), "-suffix")}', []),
+    'str_to_upper': ('${str:toUpper(record:value("/text"))}', []),
+    'str_substring': ('${str:substring(record:value("/text"), 0, 3)}', []),
+    'str_index_of': ('${str:indexOf(record:value("/text"), "a")}', []),
+    'str_unescape_java': ('${str:unescapeJava(str:concat(record:value("/text"), "\\\\t\\\\n"))}', []),
+    'regex_matches': ('${str:matches(record:value("/text"), "^[a-zA-Z0-9]+$")}', []),
+    'regex_replace_all': ('${str:replaceAll(record:value("/text"), "[aeiou]", "_")}', []),
+    'regex_capture': ('${str:regExCapture(record:value("/text"), "([a-zA-Z]+)([0-9]*)", 1)}', []),
+    'record_value_depth_1': (f'${{record:value("{_nested_path(1)}")}}', _nested_record_setup(1)),
+    'record_value_depth_4': (f'${{record:value("{_nested_path(4)}")}}', _nested_record_setup(4)),
+    'record_value_depth_16': (f'${{record:value("{_nested_path(16)}")}}', _nested_record_setup(16)),
+    'time_now': ('${time:now()}', []),
+    'time_to_millis': ('${time:dateTimeToMillis(record:value("/timestamp"))}', []),
+    'time_format': ('${time:extractStringFromDate(record:value("/timestamp"), "yyyy-MM-dd HH:mm:ss")}', []),
+    'conditional_depth_1': (_nested_conditional(1), []),
+    'conditional_depth_5': (_nested_conditional(5), []),
+    'conditional_depth_20': (_nested_conditional(20), []),
+}
+
+
+def _el_cost_pipeline(sdc_builder, name):
+    expression, setup = EXPRESSIONS[name]
+    random_expression_pipeline_builder = get_random_expression_pipeline_builder(sdc_builder)
+    random_expression_pipeline_builder.dev_data_generator.set_attributes(
+        batch_size=1000,
+        delay_between_batches=0,
+        fields_to_generate=[{'field': 'text', 'type': 'STRING'},
+                            {'field': 'number', 'type': 'LONG'},
+                            {'field': 'timestamp', 'type': 'DATETIME'}])
+    random_expression_pipeline_builder.expression_evaluator.field_expressions = setup + [
+        {'fieldToSet': f'/result{index}', 'expression': expression} for index in range(EVALUATIONS_PER_RECORD)]
+    return random_expression_pipeline_builder.pipeline_builder.build(f'EL cost performance ({name})')
+
+
+def _wait_for_run(command):
+    command.wait_for_pipeline_output_records_count(RECORDS_PER_TEST)
+
+
+@pytest.fixture(scope='module')
+def baseline_records_per_second(sdc_builder, sdc_executor):
+    """Records/sec of the constant expression, which every cost is relative to, whichever tests are selected."""
+    extra_info = measure_pipeline(sdc_executor, _el_cost_pipeline(sdc_builder, BASELINE), _wait_for_run)
+    logger.info('EL cost baseline %r: %.0f records/s', BASELINE, extra_info['records_per_second'] or 0)
+    return extra_info['records_per_second']
+
+
+@pytest.fixture(scope='module')
+def el_cost_table(request, baseline_records_per_second):
+    """Records/sec per expression name; turned into a table of costs once all expressions ran."""
+    records_per_second = {BASELINE: baseline_records_per_second}
+    yield records_per_second
+
+    rows = _cost_rows(records_per_second)
+    if not rows:
+        return
+    logger.info('EL evaluation cost, in microseconds per evaluation above %r:\n%s', BASELINE,
+                '\n'.join(f'{name:<28} {cost:>10.3f}  {expression}' for name, cost, expression in rows))
+    path = request.config.getoption('el_cost_table', None)
+    if path:
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['name', 'microseconds_per_evaluation', 'expression'])
+            writer.writerows(rows)
+
+
+@pytest.mark.parametrize('name', [name for name in EXPRESSIONS if name != BASELINE])
+def test_el_cost(sdc_builder, sdc_executor, benchmark, el_cost_table, name):
+    """Cost of evaluating an EL expression in an Expression Evaluator."""
+    pipeline = _el_cost_pipeline(sdc_builder, name)
+
+    extra_info = benchmark_pipeline(benchmark, sdc_executor, pipeline, wait_for_run=_wait_for_run)
+
+    el_cost_table[name] = extra_info['records_per_second']
+    benchmark.extra_info['expression'] = EXPRESSIONS[name][0]
+    benchmark.extra_info[f'{BASELINE}_records_per_second'] = el_cost_table[BASELINE]
+    benchmark.extra_info['microseconds_per_evaluation'] = _cost(el_cost_table, name)
+
+
+def _cost(records_per_second, name):
+    """Microseconds per evaluation of the expression above the baseline, or ``None`` if either is missing."""
+    rate, baseline_rate = records_per_second.get(name), records_per_second.get(BASELINE)
+    if not rate or not baseline_rate:
+        return None
+    return (1 / rate - 1 / baseline_rate) / EVALUATIONS_PER_RECORD * 1_000_000
+
+
+def _cost_rows(records_per_second):
+    rows = [(name, _cost(records_per_second, name), EXPRESSIONS[name][0])
+            for name in records_per_second if name != BASELINE]
+    return sorted((row for row in rows if row[1] is not None), key=lambda row: row[1], reverse=True)
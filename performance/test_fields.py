@@ -20,10 +20,11 @@ Output values will not be validated since the purpose of this test is to test pe
 
 import json
 import logging
-import uuid
 
 import pytest
 
+from performance.utils.utils_benchmark import benchmark_pipeline
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
@@ -112,14 +113,8 @@ def test_field_path_stress_pipeline(sdc_builder, sdc_executor, benchmark, number
     source >> remover >> value_replacer >> type_converter >> hasher >> masker >> trash
     pipeline = pipeline_builder.build('Field Path Stress Test Pipeline - Many Stages')
 
-    def benchmark_pipeline(executor, pipeline):
-        pipeline.id = str(uuid.uuid4())
-        executor.add_pipeline(pipeline)
-        executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(number_of_records)
-        executor.stop_pipeline(pipeline)
-        executor.remove_pipeline(pipeline)
-
-    benchmark.pedantic(benchmark_pipeline, args=(sdc_executor, pipeline), rounds=2)
+    benchmark_pipeline(benchmark, sdc_executor, pipeline, rounds=2,
+                       wait_for_run=lambda command: command.wait_for_pipeline_output_records_count(number_of_records))
 
 
 @pytest.mark.parametrize('number_of_records', (50_000, 100_000))
@@ -143,11 +138,5 @@ def test_large_number_of_fields_stress_pipeline(sdc_builder, sdc_executor, bench
     source >> remover >> trash
     pipeline = pipeline_builder.build('Field Path Stress Test Pipeline - Many Fields')
 
-    def benchmark_pipeline(executor, pipeline):
-        pipeline.id = str(uuid.uuid4())
-        executor.add_pipeline(pipeline)
-        executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(number_of_records)
-        executor.stop_pipeline(pipeline)
-        executor.remove_pipeline(pipeline)
-
-    benchmark.pedantic(benchmark_pipeline, args=(sdc_executor, pipeline), rounds=2)
+    benchmark_pipeline(benchmark, sdc_executor, pipeline, rounds=2,
+                       wait_for_run=lambda command: command.wait_for_pipeline_output_records_count(number_of_records))
@@ -0,0 +1,118 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Performance tests for the HTTP Server origin under an open-loop load, i.e. requests are sent at a fixed rate whether
+or not the origin keeps up. Sweeping the rate shows the saturation point: achieved requests/sec flattens while the
+latency percentiles (corrected for coordinated omission) climb. Results are stored in ``extra_info``.
+"""
+
+import logging
+
+import pytest
+from streamsets.sdk.utils import Version
+from streamsets.testframework.markers import sdc_min_version
+
+from performance.utils.utils_benchmark import benchmark_pipeline
+from performance.utils.utils_histogram import LatencyHistogram
+from performance.utils.utils_http import json_body, run_http_load
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+HTTP_PORT = 18645
+APPLICATION_ID = 'perf'
+LOAD_DURATION_SEC = 30
+# Keystore file path relative to $SDC_RESOURCES.
+KEYSTORE_FILE_PATH = 'resources/tls/keystore.jks'
+KEYSTORE_TYPE = 'JKS'
+KEYSTORE_PASSWORD = 'password'
+
+
+@sdc_min_version('3.0.0.0')
+@pytest.mark.parametrize('requests_per_second', (500, 2_000, 5_000, 10_000))
+@pytest.mark.parametrize('max_concurrent_requests', (1, 10, 50))
+def test_http_server_request_rate(sdc_builder, sdc_executor, benchmark, requests_per_second,
+                                  max_concurrent_requests):
+    """Latency and achieved rate against the offered rate and the number of origin threads.
+
+    Pipeline: http_server >> trash
+    """
+    pipeline = _http_server_pipeline(sdc_builder, max_concurrent_requests)
+    _benchmark_http_load(benchmark, sdc_executor, pipeline, f'http://{sdc_executor.server_host}:{HTTP_PORT}/',
+                         requests_per_second)
+
+
+@sdc_min_version('3.0.0.0')
+@pytest.mark.parametrize('body_size', (256, 64 * 1024))
+def test_http_server_body_size(sdc_builder, sdc_executor, benchmark, body_size):
+    """Latency and achieved rate for small and large request bodies.
+
+    Pipeline: http_server >> trash
+    """
+    pipeline = _http_server_pipeline(sdc_builder, max_concurrent_requests=10)
+    _benchmark_http_load(benchmark, sdc_executor, pipeline, f'http://{sdc_executor.server_host}:{HTTP_PORT}/',
+                         1_000, body=json_body(body_size))
+
+
+@sdc_min_version('3.0.0.0')
+@pytest.mark.parametrize('requests_per_second', (500, 2_000, 5_000))
+def test_http_server_tls(sdc_builder, sdc_executor, benchmark, requests_per_second):
+    """Latency and achieved rate with TLS, using resources/tls/keystore.jks.
+
+    Pipeline: http_server >> trash
+    """
+    pipeline = _http_server_pipeline(sdc_builder, max_concurrent_requests=10, use_tls=True)
+    _benchmark_http_load(benchmark, sdc_executor, pipeline, f'https://{sdc_executor.server_host}:{HTTP_PORT}/',
+                         requests_per_second)
+
+
+def _http_server_pipeline(sdc_builder, max_concurrent_requests, use_tls=False):
+    builder = sdc_builder.get_pipeline_builder()
+    http_server = builder.add_stage('HTTP Server')
+    http_server.set_attributes(data_format='JSON',
+                               http_listening_port=HTTP_PORT,
+                               max_concurrent_requests=max_concurrent_requests)
+    if Version(sdc_builder.version) >= Version('3.14.0'):
+        http_server.list_of_application_ids = [{'appId': APPLICATION_ID}]
+    else:
+        http_server.application_id = APPLICATION_ID
+    if use_tls:
+        http_server.set_attributes(use_tls=True,
+                                   keystore_file=KEYSTORE_FILE_PATH,
+                                   keystore_type=KEYSTORE_TYPE,
+                                   keystore_password=KEYSTORE_PASSWORD)
+
+    trash = builder.add_stage('Trash')
+    http_server >> trash
+    return builder.build(f'HTTP Server origin performance{" (TLS)" if use_tls else ""}')
+
+
+def _benchmark_http_load(benchmark, sdc_executor, pipeline, url, requests_per_second, body=None):
+    results = []
+
+    def run_load(command):
+        results.append(run_http_load(url, requests_per_second, LOAD_DURATION_SEC, body=body,
+                                     application_id=APPLICATION_ID))
+
+    benchmark_pipeline(benchmark, sdc_executor, pipeline, run_load)
+
+    histogram = LatencyHistogram()
+    for result in results:
+        histogram.merge(result.histogram)
+    benchmark.extra_info['target_requests_per_second'] = requests_per_second
+    benchmark.extra_info['achieved_requests_per_second'] = (sum(result.requests - result.errors for result in results)
+                                                            / sum(result.seconds for result in results))
+    benchmark.extra_info['failed_requests'] = sum(result.errors for result in results)
+    benchmark.extra_info.update(histogram.summary())
@@ -18,14 +18,12 @@ The tests in this module are for running high-volume pipelines, for the purpose
 
 import logging
 import random
-import string
-import uuid
 from time import sleep
 
 import pytest
-import sqlalchemy
 from streamsets.testframework.markers import database, sdc_min_version
-from streamsets.testframework.utils import get_random_string
+
+from performance.utils.utils_benchmark import benchmark_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -39,15 +37,14 @@ def sdc_builder_hook():
 
 @pytest.mark.parametrize('number_of_rows', (500_000, 1_000_000, 5_000_000))
 @database
-def test_jdbc_multitable_consumer_origin_default(sdc_builder, database, benchmark, number_of_rows):
+def test_jdbc_multitable_consumer_origin_default(sdc_builder, database, dataset_registry, benchmark, number_of_rows):
     """Performance benchmark a simple JDBC mutli-table consumer to trash pipeline."""
-    src_table_prefix = get_random_string(string.ascii_lowercase, 6)
-    table_name = '{}_{}'.format(src_table_prefix, get_random_string(string.ascii_lowercase, 20))
+    table = dataset_registry.jdbc_table(database, number_of_rows)
 
     pipeline_builder = sdc_builder.get_pipeline_builder()
 
     jdbc_multitable_consumer = pipeline_builder.add_stage('JDBC Multitable Consumer')
-    jdbc_multitable_consumer.set_attributes(table_configs=[{"tablePattern": f'{src_table_prefix}%'}])
+    jdbc_multitable_consumer.set_attributes(table_configs=[{"tablePattern": table.name}])
 
     trash = pipeline_builder.add_stage('Trash')
 
@@ -55,48 +52,25 @@ def test_jdbc_multitable_consumer_origin_default(sdc_builder, database, benchmar
 
     pipeline = pipeline_builder.build().configure_for_environment(database)
 
-    metadata = sqlalchemy.MetaData()
-    table = sqlalchemy.Table(table_name,
-                             metadata,
-                             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
-                             sqlalchemy.Column('name', sqlalchemy.String(40)))
-    try:
-        logger.info('Creating table %s in %s database ...', table_name, database.type)
-        table.create(database.engine)
-
-        logger.info('Adding %s rows into %s database ...', number_of_rows, database.type)
-        connection = database.engine.connect()
-        connection.execute(table.insert(),
-                           [{'id': i, 'name': str(uuid.uuid4())} for i in range(1, number_of_rows+1)])
-
-        def benchmark_pipeline(executor, pipeline):
-            pipeline.id = str(uuid.uuid4())
-            executor.add_pipeline(pipeline)
-            executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(number_of_rows, timeout_sec=3600)
-            executor.stop_pipeline(pipeline).wait_for_stopped()
-            executor.remove_pipeline(pipeline)
-
-        benchmark.pedantic(benchmark_pipeline, args=(sdc_builder, pipeline), rounds=2)
-    finally:
-        logger.info('Dropping table %s in %s database...', table_name, database.type)
-        table.drop(database.engine)
+    benchmark_pipeline(benchmark, sdc_builder, pipeline, rounds=2,
+                       wait_for_run=lambda command: command.wait_for_pipeline_output_records_count(number_of_rows,
+                                                                                                   timeout_sec=3600))
 
 
 @sdc_min_version('2.7.0.0')
 @pytest.mark.parametrize('number_of_threads', (2, 4, 8, 16))
 @pytest.mark.parametrize('number_of_rows', (500_000, 1_000_000, 5_000_000))
 @database
-def test_jdbc_multitable_consumer_origin_multithreaded(sdc_builder, database, benchmark,
+def test_jdbc_multitable_consumer_origin_multithreaded(sdc_builder, database, dataset_registry, benchmark,
                                                        number_of_rows, number_of_threads):
     """Performance benchmark a simple JDBC mutli-table consumer to trash pipeline."""
-    src_table_prefix = get_random_string(string.ascii_lowercase, 6)
-    table_name = '{}_{}'.format(src_table_prefix, get_random_string(string.ascii_lowercase, 20))
+    table = dataset_registry.jdbc_table(database, number_of_rows)
     partition_size = str(int(number_of_rows / number_of_threads))
 
     pipeline_builder = sdc_builder.get_pipeline_builder()
 
     jdbc_multitable_consumer = pipeline_builder.add_stage('JDBC Multitable Consumer')
-    jdbc_multitable_consumer.set_attributes(table_configs=[{'tablePattern': f'{src_table_prefix}%',
+    jdbc_multitable_consumer.set_attributes(table_configs=[{'tablePattern': table.name,
                                                             'partitionSize': partition_size}],
                                             number_of_threads=number_of_threads,
                                             maximum_pool_size=number_of_threads)
@@ -107,45 +81,23 @@ def test_jdbc_multitable_consumer_origin_multithreaded(sdc_builder, database, be
 
     pipeline = pipeline_builder.build().configure_for_environment(database)
 
-    metadata = sqlalchemy.MetaData()
-    table = sqlalchemy.Table(table_name,
-                             metadata,
-                             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
-                             sqlalchemy.Column('name', sqlalchemy.String(40)))
-    try:
-        logger.info('Creating table %s in %s database ...', table_name, database.type)
-        table.create(database.engine)
-
-        logger.info('Adding %s rows into %s database ...', number_of_rows, database.type)
-        connection = database.engine.connect()
-        connection.execute(table.insert(),
-                           [{'id': i, 'name': str(uuid.uuid4())} for i in range(1, number_of_rows+1)])
-
-        def benchmark_pipeline(executor, pipeline):
-            pipeline.id = str(uuid.uuid4())
-            executor.add_pipeline(pipeline)
-            executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(number_of_rows, timeout_sec=3600)
-            executor.stop_pipeline(pipeline).wait_for_stopped()
-            executor.remove_pipeline(pipeline)
-
-        benchmark.pedantic(benchmark_pipeline, args=(sdc_builder, pipeline), rounds=2)
-    finally:
-        logger.info('Dropping table %s in %s database...', table_name, database.type)
-        table.drop(database.engine)
+    benchmark_pipeline(benchmark, sdc_builder, pipeline, rounds=2,
+                       wait_for_run=lambda command: command.wait_for_pipeline_output_records_count(number_of_rows,
+                                                                                                   timeout_sec=3600))
 
 
 @sdc_min_version('2.7.0.0')
 @pytest.mark.parametrize('number_of_rows', (500_000, 1_000_000, 5_000_000))
 @database
-def test_jdbc_multitable_consumer_origin_partitioning_disabled(sdc_builder, database, benchmark, number_of_rows):
+def test_jdbc_multitable_consumer_origin_partitioning_disabled(sdc_builder, database, dataset_registry, benchmark,
+                                                               number_of_rows):
     """Performance benchmark a simple JDBC mutli-table consumer to trash pipeline."""
-    src_table_prefix = get_random_string(string.ascii_lowercase, 6)
-    table_name = '{}_{}'.format(src_table_prefix, get_random_string(string.ascii_lowercase, 20))
+    table = dataset_registry.jdbc_table(database, number_of_rows)
 
     pipeline_builder = sdc_builder.get_pipeline_builder()
 
     jdbc_multitable_consumer = pipeline_builder.add_stage('JDBC Multitable Consumer')
-    jdbc_multitable_consumer.set_attributes(table_configs=[{'tablePattern': f'{src_table_prefix}%',
+    jdbc_multitable_consumer.set_attributes(table_configs=[{'tablePattern': table.name,
                                                             'partitioningMode': 'DISABLED'}])
 
     trash = pipeline_builder.add_stage('Trash')
@@ -154,28 +106,6 @@ def test_jdbc_multitable_consumer_origin_partitioning_disabled(sdc_builder, data
 
     pipeline = pipeline_builder.build().configure_for_environment(database)
 
-    metadata = sqlalchemy.MetaData()
-    table = sqlalchemy.Table(table_name,
-                             metadata,
-                             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
-                             sqlalchemy.Column('name', sqlalchemy.String(40)))
-    try:
-        logger.info('Creating table %s in %s database ...', table_name, database.type)
-        table.create(database.engine)
-
-        logger.info('Adding %s rows into %s database ...', number_of_rows, database.type)
-        connection = database.engine.connect()
-        connection.execute(table.insert(),
-                           [{'id': i, 'name': str(uuid.uuid4())} for i in range(1, number_of_rows+1)])
-
-        def benchmark_pipeline(executor, pipeline):
-            pipeline.id = str(uuid.uuid4())
-            executor.add_pipeline(pipeline)
-            executor.start_pipeline(pipeline).wait_for_pipeline_output_records_count(number_of_rows, timeout_sec=3600)
-            executor.stop_pipeline(pipeline).wait_for_stopped()
-            executor.remove_pipeline(pipeline)
-
-        benchmark.pedantic(benchmark_pipeline, args=(sdc_builder, pipeline), rounds=2)
-    finally:
-        logger.info('Dropping table %s in %s database...', table_name, database.type)
-        table.drop(database.engine)
+    benchmark_pipeline(benchmark, sdc_builder, pipeline, rounds=2,
+                       wait_for_run=lambda command: command.wait_for_pipeline_output_records_count(number_of_rows,
+                                                                                                   timeout_sec=3600))
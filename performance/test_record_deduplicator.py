@@ -0,0 +1,136 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Performance tests for the Record Deduplicator at millions of keys. Records carry a key cycling through
+``cardinality`` values, so that a stream of ``cardinality / (1 - duplicate_ratio)`` records has the requested share
+of duplicates. Throughput, the heap after the run and the time spent in GC are stored in ``extra_info``, as are the
+unique and duplicate lane counts; those are checked to be exact whenever the settings let the processor remember
+every key.
+"""
+
+import logging
+
+import pytest
+
+from performance.utils.utils_benchmark import benchmark_pipeline, get_gc_time, get_heap_used
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+ALL_FIELDS = 'ALL_FIELDS'
+SPECIFIED_FIELDS = 'SPECIFIED_FIELDS'
+
+
+@pytest.mark.parametrize('cardinality', (100_000, 1_000_000, 5_000_000))
+@pytest.mark.parametrize('duplicate_ratio', (0.5, 0.9))
+@pytest.mark.parametrize('compare', (ALL_FIELDS, SPECIFIED_FIELDS))
+def test_record_deduplicator_cardinality(sdc_builder, sdc_executor, benchmark, cardinality, duplicate_ratio,
+                                         compare):
+    """Throughput and heap against the number of distinct keys, with a cache large enough for all of them.
+
+    Pipeline: dev_data_generator >> expression_evaluator >> field_remover >> record_deduplicator >> trash (unique)
+                                                                                                >> trash (duplicates)
+    """
+    _benchmark_deduplicator(sdc_builder, sdc_executor, benchmark, cardinality, duplicate_ratio, compare,
+                            max_records_to_compare=cardinality, time_to_compare_in_secs=0)
+
+
+@pytest.mark.parametrize('max_records_to_compare', (100_000, 1_000_000, 5_000_000))
+@pytest.mark.parametrize('time_to_compare_in_secs', (0, 10, 60))
+def test_record_deduplicator_cache_settings(sdc_builder, sdc_executor, benchmark, max_records_to_compare,
+                                            time_to_compare_in_secs):
+    """Throughput and heap against the cache size and time window, for a million keys.
+
+    A cache smaller than the number of keys, or a time window shorter than a key's cycle, forgets keys before they
+    come back, which turns duplicates into unique records; lane counts are then reported but not checked.
+
+    Pipeline: dev_data_generator >> expression_evaluator >> field_remover >> record_deduplicator >> trash (unique)
+                                                                                                >> trash (duplicates)
+    """
+    _benchmark_deduplicator(sdc_builder, sdc_executor, benchmark, 1_000_000, 0.5, SPECIFIED_FIELDS,
+                            max_records_to_compare, time_to_compare_in_secs)
+
+
+def _benchmark_deduplicator(sdc_builder, sdc_executor, benchmark, cardinality, duplicate_ratio, compare,
+                            max_records_to_compare, time_to_compare_in_secs):
+    number_of_records = int(cardinality / (1 - duplicate_ratio))
+
+    builder = sdc_builder.get_pipeline_builder()
+    dev_data_generator = builder.add_stage('Dev Data Generator')
+    dev_data_generator.set_attributes(batch_size=1000,
+                                      delay_between_batches=0,
+                                      fields_to_generate=[{'field': 'sequence', 'type': 'LONG_SEQUENCE'}])
+
+    # Only fields derived from the key remain, so that comparing all fields is equivalent to comparing the key.
+    expression_evaluator = builder.add_stage('Expression Evaluator')
+    expression_evaluator.field_expressions = [{'fieldToSet': '/key',
+                                               'expression': f'${{record:value("/sequence") % {cardinality}}}'},
+                                              {'fieldToSet': '/payload',
+                                               'expression': '${str:concat("payload-", record:value("/key"))}'}]
+    field_remover = builder.add_stage('Field Remover')
+    field_remover.set_attributes(fields=['/sequence'], action='REMOVE')
+
+    record_deduplicator = builder.add_stage('Record Deduplicator')
+    record_deduplicator.set_attributes(compare=compare,
+                                       max_records_to_compare=max_records_to_compare,
+                                       time_to_compare_in_secs=time_to_compare_in_secs)
+    if compare == SPECIFIED_FIELDS:
+        record_deduplicator.fields_to_compare = ['/key']
+
+    unique_trash = builder.add_stage('Trash')
+    duplicate_trash = builder.add_stage('Trash')
+    dev_data_generator >> expression_evaluator >> field_remover >> record_deduplicator >> unique_trash
+    record_deduplicator >> duplicate_trash
+    pipeline = builder.build(f'Record Deduplicator performance ({cardinality} keys)')
+
+    runs = []
+
+    def wait_for_records(command):
+        gc_time = get_gc_time(sdc_executor)
+        command.wait_for_pipeline_output_records_count(number_of_records)
+        heap_used = get_heap_used(sdc_executor)
+        gc_time = get_gc_time(sdc_executor) - gc_time if gc_time is not None else None
+        # Stop here, so that the lane counts are final.
+        sdc_executor.stop_pipeline(pipeline).wait_for_stopped()
+
+        metrics = sdc_executor.get_pipeline_history(pipeline).latest.metrics
+        runs.append(dict(records=metrics.counter('pipeline.batchInputRecords.counter').count,
+                         unique=metrics.counter(f'stage.{unique_trash.instance_name}.inputRecords.counter').count,
+                         duplicates=metrics.counter(
+                             f'stage.{duplicate_trash.instance_name}.inputRecords.counter').count,
+                         heap_used=heap_used,
+                         gc_time=gc_time))
+
+    benchmark_pipeline(benchmark, sdc_executor, pipeline, wait_for_records)
+
+    last_run = runs[-1]
+    benchmark.extra_info['cardinality'] = cardinality
+    benchmark.extra_info['duplicate_ratio'] = duplicate_ratio
+    benchmark.extra_info['compare'] = compare
+    benchmark.extra_info['max_records_to_compare'] = max_records_to_compare
+    benchmark.extra_info['time_to_compare_in_secs'] = time_to_compare_in_secs
+    benchmark.extra_info['heap_after_run_mb'] = (max(run['heap_used'] for run in runs) / 1024 ** 2
+                                                 if all(run['heap_used'] is not None for run in runs) else None)
+    benchmark.extra_info['gc_sec'] = (max(run['gc_time'] for run in runs)
+                                      if all(run['gc_time'] is not None for run in runs) else None)
+    benchmark.extra_info['unique_records'] = last_run['unique']
+    benchmark.extra_info['duplicate_records'] = last_run['duplicates']
+
+    for run in runs:
+        assert run['unique'] + run['duplicates'] == run['records']
+        # The stream is sequence % cardinality, so that with every key remembered, the first `cardinality` records
+        # are unique and every later one is a duplicate.
+        if max_records_to_compare >= cardinality and time_to_compare_in_secs == 0:
+            assert run['unique'] == min(run['records'], cardinality)
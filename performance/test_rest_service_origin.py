@@ -0,0 +1,105 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Performance tests for SDC as a synchronous microservice: REST Service >> processors >> Send Response to Origin.
+Concurrent clients send a request as soon as they get the response to the previous one; every benchmark records
+the end-to-end response latency percentiles and, once concurrency exceeds the runner pool, the error and timeout
+rates in ``extra_info``.
+"""
+
+import logging
+
+import pytest
+from streamsets.testframework.markers import sdc_min_version
+
+from performance.utils.utils_benchmark import benchmark_pipeline
+from performance.utils.utils_histogram import LatencyHistogram
+from performance.utils.utils_http import run_http_concurrency
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+REST_SERVICE_PORT = 18640
+APPLICATION_ID = 'perf'
+LOAD_DURATION_SEC = 30
+# Client-side timeout; requests still waiting for a runner by then count as timed out.
+REQUEST_TIMEOUT_SEC = 10
+
+
+@sdc_min_version('3.8.0')
+@pytest.mark.parametrize('concurrency', (1, 10, 50, 200))
+@pytest.mark.parametrize('max_concurrent_requests', (10, 50))
+def test_rest_service_concurrency(sdc_builder, sdc_executor, benchmark, concurrency, max_concurrent_requests):
+    """Response latency against the number of concurrent clients and the size of the runner pool.
+
+    Pipeline: rest_service >> expression_evaluator >> send_response_to_origin
+    """
+    pipeline = _rest_service_pipeline(sdc_builder, max_concurrent_requests, processor_depth=1)
+    _benchmark_round_trips(benchmark, sdc_executor, pipeline, concurrency)
+
+
+@sdc_min_version('3.8.0')
+@pytest.mark.parametrize('processor_depth', (0, 1, 5, 20))
+def test_rest_service_processor_depth(sdc_builder, sdc_executor, benchmark, processor_depth):
+    """Response latency against the number of processors between REST Service and Send Response to Origin.
+
+    Pipeline: rest_service >> expression_evaluator * processor_depth >> send_response_to_origin
+    """
+    pipeline = _rest_service_pipeline(sdc_builder, max_concurrent_requests=10, processor_depth=processor_depth)
+    _benchmark_round_trips(benchmark, sdc_executor, pipeline, concurrency=10)
+
+
+def _rest_service_pipeline(sdc_builder, max_concurrent_requests, processor_depth):
+    builder = sdc_builder.get_pipeline_builder()
+    rest_service = builder.add_stage('REST Service')
+    rest_service.set_attributes(application_id=APPLICATION_ID,
+                                data_format='JSON',
+                                http_listening_port=REST_SERVICE_PORT,
+                                max_concurrent_requests=max_concurrent_requests)
+
+    stage = rest_service
+    for index in range(processor_depth):
+        expression_evaluator = builder.add_stage('Expression Evaluator')
+        expression_evaluator.field_expressions = [{'fieldToSet': f'/field{index}',
+                                                   'expression': '${record:value("/payload")}'}]
+        stage >> expression_evaluator
+        stage = expression_evaluator
+
+    send_response_to_origin = builder.add_stage('Send Response to Origin')
+    send_response_to_origin.status_code = 200
+    stage >> send_response_to_origin
+    return builder.build(f'REST Service round trip performance ({processor_depth} processors)')
+
+
+def _benchmark_round_trips(benchmark, sdc_executor, pipeline, concurrency):
+    results = []
+
+    def run_load(command):
+        results.append(run_http_concurrency(f'http://{sdc_executor.server_host}:{REST_SERVICE_PORT}/', concurrency,
+                                            LOAD_DURATION_SEC, application_id=APPLICATION_ID,
+                                            request_timeout_sec=REQUEST_TIMEOUT_SEC))
+
+    benchmark_pipeline(benchmark, sdc_executor, pipeline, run_load)
+
+    histogram = LatencyHistogram()
+    for result in results:
+        histogram.merge(result.histogram)
+    requests = sum(result.requests for result in results)
+    benchmark.extra_info['concurrency'] = concurrency
+    benchmark.extra_info['responses_per_second'] = (sum(result.requests - result.errors for result in results)
+                                                    / sum(result.seconds for result in results))
+    benchmark.extra_info['error_rate'] = sum(result.errors for result in results) / requests if requests else None
+    benchmark.extra_info['timeout_rate'] = sum(result.timeouts for result in results) / requests if requests else None
+    benchmark.extra_info.update(histogram.summary())
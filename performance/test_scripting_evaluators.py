@@ -0,0 +1,259 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Comparative performance tests for the Jython, Groovy and JavaScript Evaluators. Each evaluator runs equivalent scripts
+for the same workloads (field manipulation, event creation and direct ``sdcRecord`` access), in BATCH and RECORD
+processing mode and at several record widths. Besides records/sec, the SDC process CPU time per record is stored in
+``extra_info``; the start-up benchmark isolates the cost of the init and destroy scripts, which shows up in
+``start_sec`` and ``stop_sec``.
+"""
+
+import json
+import logging
+import statistics
+import textwrap
+
+import pytest
+from streamsets.sdk.utils import Version
+
+from performance.utils.utils_benchmark import benchmark_pipeline, get_process_cpu_time
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+RECORDS_PER_TEST = 500_000
+# Records of the Dev Raw Data Source, replayed in every batch.
+RECORDS_PER_BATCH = 1000
+
+JYTHON = 'Jython Evaluator'
+GROOVY = 'Groovy Evaluator'
+JAVASCRIPT = 'JavaScript Evaluator'
+EVALUATORS = (JYTHON, GROOVY, JAVASCRIPT)
+
+FIELD_MANIPULATION = 'field_manipulation'
+EVENT_CREATION = 'event_creation'
+SDC_RECORD = 'sdc_record'
+
+# Equivalent scripts per workload and evaluator. Records have fields field0, field1, ... holding strings.
+SCRIPTS = {
+    FIELD_MANIPULATION: {
+        JYTHON: """
+            for record in records:
+                try:
+                    record.value['field0'] = record.value['field0'].upper()
+                    record.value['width'] = len(record.value)
+                    del record.value['field1']
+                    output.write(record)
+                except Exception as e:
+                    error.write(record, str(e))
+        """,
+        GROOVY: """
+            for (record in records) {
+                try {
+                    record.value['field0'] = record.value['field0'].toUpperCase()
+                    record.value['width'] = record.value.size()
+                    record.value.remove('field1')
+                    output.write(record)
+                } catch (e) {
+                    error.write(record, e.toString())
+                }
+            }
+        """,
+        JAVASCRIPT: """
+            for (var i = 0; i < records.length; i++) {
+                try {
+                    records[i].value['field0'] = records[i].value['field0'].toUpperCase();
+                    records[i].value['width'] = Object.keys(records[i].value).length;
+                    delete records[i].value['field1'];
+                    output.write(records[i]);
+                } catch (e) {
+                    error.write(records[i], e);
+                }
+            }
+        """,
+    },
+    EVENT_CREATION: {
+        JYTHON: """
+            for record in records:
+                event = sdcFunctions.createEvent('record-seen', 1)
+                event.value = sdcFunctions.createMap(True)
+                event.value['field0'] = record.value['field0']
+                sdcFunctions.toEvent(event)
+                output.write(record)
+        """,
+        GROOVY: """
+            for (record in records) {
+                event = sdcFunctions.createEvent('record-seen', 1)
+                event.value = sdcFunctions.createMap(true)
+                event.value['field0'] = record.value['field0']
+                sdcFunctions.toEvent(event)
+                output.write(record)
+            }
+        """,
+        JAVASCRIPT: """
+            for (var i = 0; i < records.length; i++) {
+                var event = sdcFunctions.createEvent('record-seen', 1);
+                event.value = sdcFunctions.createMap(true);
+                event.value['field0'] = records[i].value['field0'];
+                sdcFunctions.toEvent(event);
+                output.write(records[i]);
+            }
+        """,
+    },
+    SDC_RECORD: {
+        JYTHON: """
+            from com.streamsets.pipeline.api import Field
+            for record in records:
+                value = record.sdcRecord.get('/field0').getValueAsString()
+                record.sdcRecord.set('/copy', Field.create(Field.Type.STRING, value))
+                output.write(record)
+        """,
+        GROOVY: """
+            import com.streamsets.pipeline.api.Field
+            for (record in records) {
+                value = record.sdcRecord.get('/field0').getValueAsString()
+                record.sdcRecord.set('/copy', Field.create(Field.Type.STRING, value))
+                output.write(record)
+            }
+        """,
+        JAVASCRIPT: """
+            var Field = Java.type('com.streamsets.pipeline.api.Field');
+            for (var i = 0; i < records.length; i++) {
+                var value = records[i].sdcRecord.get('/field0').getValueAsString();
+                records[i].sdcRecord.set('/copy', Field.create(Field.Type.STRING, value));
+                output.write(records[i]);
+            }
+        """,
+    },
+}
+
+# Init and destroy scripts that set up and tear down some state, for the start-up benchmark.
+INIT_SCRIPTS = {
+    JYTHON: """
+        import re
+        state['pattern'] = re.compile('[0-9]+')
+        state['lookup'] = dict(('key%d' % index, index) for index in range(10000))
+    """,
+    GROOVY: """
+        state['pattern'] = ~/[0-9]+/
+        state['lookup'] = (0..<10000).collectEntries { ["key${it}".toString(), it] }
+    """,
+    JAVASCRIPT: """
+        state.pattern = /[0-9]+/;
+        state.lookup = {};
+        for (var index = 0; index < 10000; index++) {
+            state.lookup['key' + index] = index;
+        }
+    """,
+}
+DESTROY_SCRIPTS = {
+    JYTHON: """
+        state.clear()
+    """,
+    GROOVY: """
+        state.clear()
+    """,
+    JAVASCRIPT: """
+        delete state.pattern;
+        delete state.lookup;
+    """,
+}
+
+
+@pytest.fixture(scope='module')
+def sdc_common_hook():
+    def hook(data_collector):
+        data_collector.add_stage_lib('streamsets-datacollector-jython_2_7-lib')
+        data_collector.add_stage_lib('streamsets-datacollector-groovy_2_4-lib')
+
+    return hook
+
+
+@pytest.mark.parametrize('evaluator', EVALUATORS)
+@pytest.mark.parametrize('workload', (FIELD_MANIPULATION, EVENT_CREATION, SDC_RECORD))
+@pytest.mark.parametrize('record_processing_mode', ('BATCH', 'RECORD'))
+@pytest.mark.parametrize('record_width', (5, 50, 500))
+def test_scripting_evaluator(sdc_builder, sdc_executor, benchmark, evaluator, workload, record_processing_mode,
+                             record_width):
+    """Records/sec and CPU per record of a scripting evaluator.
+
+    Pipeline: dev_raw_data_source >> evaluator >> trash
+                                     evaluator >= trash (events)
+    """
+    if workload == SDC_RECORD and Version(sdc_builder.version) < Version('3.9.0'):
+        pytest.skip('Direct access to SDC records in scripting evaluators was added in SDC 3.9.0')
+
+    pipeline = _scripting_pipeline(sdc_builder, evaluator, SCRIPTS[workload][evaluator], record_processing_mode,
+                                   record_width, sdc_records=workload == SDC_RECORD)
+    cpu_seconds = []
+
+    def wait_for_records(command):
+        cpu_time = get_process_cpu_time(sdc_executor)
+        command.wait_for_pipeline_output_records_count(RECORDS_PER_TEST)
+        if cpu_time is not None:
+            cpu_seconds.append(get_process_cpu_time(sdc_executor) - cpu_time)
+
+    benchmark_pipeline(benchmark, sdc_executor, pipeline, wait_for_records)
+
+    benchmark.extra_info['evaluator'] = evaluator
+    benchmark.extra_info['workload'] = workload
+    benchmark.extra_info['record_processing_mode'] = record_processing_mode
+    benchmark.extra_info['record_width'] = record_width
+    # The whole process is measured, so this includes the origin, the framework and any other pipeline running.
+    benchmark.extra_info['cpu_microseconds_per_record'] = (statistics.median(cpu_seconds) / RECORDS_PER_TEST * 1_000_000
+                                                           if cpu_seconds else None)
+
+
+@pytest.mark.parametrize('evaluator', EVALUATORS)
+@pytest.mark.parametrize('with_state', (False, True))
+def test_scripting_evaluator_startup(sdc_builder, sdc_executor, benchmark, evaluator, with_state):
+    """Start-up and stop cost of a scripting evaluator, with empty init and destroy scripts and with scripts setting
+    up and tearing down some state; see ``start_sec`` and ``stop_sec``.
+
+    Pipeline: dev_raw_data_source >> evaluator >> trash
+    """
+    pipeline = _scripting_pipeline(sdc_builder, evaluator, SCRIPTS[FIELD_MANIPULATION][evaluator], 'BATCH',
+                                   record_width=5,
+                                   init_script=INIT_SCRIPTS[evaluator] if with_state else '',
+                                   destroy_script=DESTROY_SCRIPTS[evaluator] if with_state else '')
+    benchmark_pipeline(benchmark, sdc_executor, pipeline, rounds=5,
+                       wait_for_run=lambda command: command.wait_for_pipeline_output_records_count(1))
+    benchmark.extra_info['evaluator'] = evaluator
+    benchmark.extra_info['with_state'] = with_state
+
+
+def _scripting_pipeline(sdc_builder, evaluator, script, record_processing_mode, record_width, sdc_records=False,
+                        init_script='', destroy_script=''):
+    builder = sdc_builder.get_pipeline_builder()
+    dev_raw_data_source = builder.add_stage('Dev Raw Data Source')
+    dev_raw_data_source.set_attributes(data_format='JSON',
+                                       json_content='ARRAY_OBJECTS',
+                                       raw_data=json.dumps([{f'field{field}': f'value-{index}-{field}'
+                                                             for field in range(record_width)}
+                                                            for index in range(RECORDS_PER_BATCH)]))
+
+    scripting_evaluator = builder.add_stage(evaluator, type='processor')
+    scripting_evaluator.set_attributes(init_script=textwrap.dedent(init_script),
+                                       script=textwrap.dedent(script),
+                                       destroy_script=textwrap.dedent(destroy_script),
+                                       record_processing_mode=record_processing_mode)
+    if sdc_records:
+        scripting_evaluator.record_type = 'SDC_RECORDS'
+
+    trash = builder.add_stage('Trash')
+    event_trash = builder.add_stage('Trash')
+    dev_raw_data_source >> scripting_evaluator >> trash
+    scripting_evaluator >= event_trash
+    return builder.build(f'{evaluator} performance')
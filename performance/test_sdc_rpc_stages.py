@@ -0,0 +1,226 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Performance tests for pipeline-to-pipeline transfer over SDC RPC, with the SDC RPC and the SDC RPC with Buffering
+origins. One or more sender pipelines (dev_data_generator >> expression_evaluator >> sdc_rpc_destination) feed the
+benchmarked receiver pipeline (sdc_rpc_origin >> expression_evaluator >> trash). Every record is stamped when sent
+and the receiver computes its end-to-end lag; records/sec, payload bytes/sec and the lag of the last batch are
+stored in ``extra_info``.
+"""
+
+import logging
+import statistics
+import string
+import time
+
+import pytest
+from streamsets.testframework.utils import get_random_string
+
+from performance.utils.utils_benchmark import benchmark_pipeline, get_counter
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+SDC_RPC_LISTENING_PORT = 20010
+RECORDS_PER_TEST = 1_000_000
+OUTPUT_RECORDS_COUNTER = 'pipeline.batchOutputRecords.counter'
+# Duration and sampling interval of the buffer growth benchmark.
+THROTTLED_DURATION_SEC = 60
+THROTTLED_SAMPLE_INTERVAL_SEC = 5
+
+
+@pytest.mark.parametrize('buffered', (False, True))
+@pytest.mark.parametrize('batch_size', (100, 1_000, 10_000))
+@pytest.mark.parametrize('compression', (False, True))
+def test_sdc_rpc_batch_size(sdc_builder, sdc_executor, benchmark, buffered, batch_size, compression):
+    """Throughput and lag against the batch size of the sender, with and without compression."""
+    _benchmark_transfer(sdc_builder, sdc_executor, benchmark, buffered, batch_size=batch_size,
+                        compression=compression, connections=1, record_size=256)
+
+
+@pytest.mark.parametrize('buffered', (False, True))
+@pytest.mark.parametrize('connections', (1, 2, 4, 8))
+def test_sdc_rpc_connections(sdc_builder, sdc_executor, benchmark, buffered, connections):
+    """Throughput and lag against the number of sender pipelines, each with its own connection."""
+    _benchmark_transfer(sdc_builder, sdc_executor, benchmark, buffered, batch_size=1_000, compression=True,
+                        connections=connections, record_size=256)
+
+
+@pytest.mark.parametrize('buffered', (False, True))
+@pytest.mark.parametrize('record_size', (64, 1024, 16 * 1024))
+def test_sdc_rpc_record_size(sdc_builder, sdc_executor, benchmark, buffered, record_size):
+    """Throughput and lag against the size of the records' payload."""
+    _benchmark_transfer(sdc_builder, sdc_executor, benchmark, buffered, batch_size=1_000, compression=True,
+                        connections=1, record_size=record_size)
+
+
+@pytest.mark.parametrize('delay_between_batches', (10, 100))
+def test_sdc_rpc_with_buffering_throttled(sdc_builder, sdc_executor, benchmark, delay_between_batches):
+    """Growth of the buffer of the SDC RPC with Buffering origin when a Delay stage keeps its pipeline from keeping up
+    with the sender.
+
+    The origin buffers what its pipeline hasn't consumed yet, so the buffer holds the records sent minus the records
+    read by the receiver pipeline; its growth rate is reported in records and payload megabytes per second.
+    """
+    record_size = 1024
+    sdc_rpc_id = get_random_string(string.ascii_letters, 10)
+    receiver, _ = _receiver_pipeline(sdc_builder, sdc_rpc_id, buffered=True,
+                                     delay_between_batches=delay_between_batches)
+    senders = _sender_pipelines(sdc_builder, sdc_executor, sdc_rpc_id, 1, batch_size=1_000, compression=True,
+                                record_size=record_size)
+    backlogs = []
+
+    def run_senders(command):
+        samples = []
+        _start(sdc_executor, senders)
+        try:
+            start = time.time()
+            while time.time() - start < THROTTLED_DURATION_SEC:
+                time.sleep(THROTTLED_SAMPLE_INTERVAL_SEC)
+                sent = sum(get_counter(sdc_executor, sender, OUTPUT_RECORDS_COUNTER) for sender in senders)
+                samples.append((time.time() - start, sent - get_counter(sdc_executor, receiver)))
+        finally:
+            _stop(sdc_executor, senders)
+        backlogs.append(samples)
+
+    try:
+        benchmark_pipeline(benchmark, sdc_executor, receiver, run_senders)
+    finally:
+        for sender in senders:
+            sdc_executor.remove_pipeline(sender)
+
+    growth_rates = [_slope(samples) for samples in backlogs if len(samples) >= 2]
+    growth_rate = statistics.median(growth_rates) if growth_rates else None
+    final_backlogs = [samples[-1][1] for samples in backlogs if samples]
+    benchmark.extra_info['delay_between_batches'] = delay_between_batches
+    benchmark.extra_info['buffered_records'] = statistics.median(final_backlogs) if final_backlogs else None
+    benchmark.extra_info['buffer_growth_records_per_second'] = growth_rate
+    benchmark.extra_info['buffer_growth_megabytes_per_second'] = (growth_rate * record_size / 1024 ** 2
+                                                                  if growth_rate is not None else None)
+
+
+def _benchmark_transfer(sdc_builder, sdc_executor, benchmark, buffered, batch_size, compression, connections,
+                        record_size):
+    sdc_rpc_id = get_random_string(string.ascii_letters, 10)
+    receiver, lag_stage = _receiver_pipeline(sdc_builder, sdc_rpc_id, buffered)
+    senders = _sender_pipelines(sdc_builder, sdc_executor, sdc_rpc_id, connections, batch_size, compression,
+                                record_size)
+    lags = []
+
+    def run_senders(command):
+        _start(sdc_executor, senders)
+        try:
+            command.wait_for_pipeline_output_records_count(RECORDS_PER_TEST)
+            lags.extend(_last_batch_lags(sdc_executor, receiver, lag_stage))
+        finally:
+            _stop(sdc_executor, senders)
+
+    try:
+        extra_info = benchmark_pipeline(benchmark, sdc_executor, receiver, run_senders)
+    finally:
+        for sender in senders:
+            sdc_executor.remove_pipeline(sender)
+
+    records_per_second = extra_info['records_per_second']
+    benchmark.extra_info['buffered'] = buffered
+    benchmark.extra_info['batch_size'] = batch_size
+    benchmark.extra_info['compression'] = compression
+    benchmark.extra_info['connections'] = connections
+    benchmark.extra_info['record_size'] = record_size
+    benchmark.extra_info['payload_bytes_per_second'] = (records_per_second * record_size
+                                                        if records_per_second is not None else None)
+    benchmark.extra_info['lag_p50_sec'] = statistics.median(lags) / 1000 if lags else None
+    benchmark.extra_info['lag_max_sec'] = max(lags) / 1000 if lags else None
+
+
+def _receiver_pipeline(sdc_builder, sdc_rpc_id, buffered, delay_between_batches=None):
+    """Return the receiver pipeline and its stage computing the lag."""
+    builder = sdc_builder.get_pipeline_builder()
+    if buffered:
+        sdc_rpc_origin = builder.add_stage('Dev SDC RPC with Buffering')
+    else:
+        sdc_rpc_origin = builder.add_stage('SDC RPC', type='origin')
+    sdc_rpc_origin.set_attributes(sdc_rpc_id=sdc_rpc_id,
+                                  sdc_rpc_listening_port=SDC_RPC_LISTENING_PORT)
+
+    expression_evaluator = builder.add_stage('Expression Evaluator')
+    expression_evaluator.field_expressions = [{'fieldToSet': '/lag_ms',
+                                               'expression': ('${time:dateTimeToMillis(time:now()) - '
+                                                              'record:value("/sent_ms")}')}]
+    sdc_rpc_origin >> expression_evaluator
+    stage = expression_evaluator
+
+    if delay_between_batches is not None:
+        delay = builder.add_stage('Delay')
+        delay.delay_between_batches = delay_between_batches
+        stage >> delay
+        stage = delay
+
+    stage >> builder.add_stage('Trash')
+    return (builder.build(f'SDC RPC{" with Buffering" if buffered else ""} receiver performance'),
+            expression_evaluator)
+
+
+def _sender_pipelines(sdc_builder, sdc_executor, sdc_rpc_id, connections, batch_size, compression, record_size):
+    """Build and add ``connections`` sender pipelines."""
+    senders = []
+    for index in range(connections):
+        builder = sdc_builder.get_pipeline_builder()
+        dev_data_generator = builder.add_stage('Dev Data Generator')
+        dev_data_generator.set_attributes(batch_size=batch_size,
+                                          delay_between_batches=0,
+                                          fields_to_generate=[{'field': 'id', 'type': 'LONG'}])
+
+        expression_evaluator = builder.add_stage('Expression Evaluator')
+        # An expression without ${} is a constant, which makes for a payload of exactly record_size characters.
+        expression_evaluator.field_expressions = [{'fieldToSet': '/sent_ms',
+                                                   'expression': '${time:dateTimeToMillis(time:now())}'},
+                                                  {'fieldToSet': '/payload',
+                                                   'expression': 'x' * record_size}]
+
+        sdc_rpc_destination = builder.add_stage(name='com_streamsets_pipeline_stage_destination_sdcipc_SdcIpcDTarget')
+        sdc_rpc_destination.set_attributes(sdc_rpc_connection=[f'{sdc_executor.server_host}:{SDC_RPC_LISTENING_PORT}'],
+                                           sdc_rpc_id=sdc_rpc_id,
+                                           compression=compression)
+
+        dev_data_generator >> expression_evaluator >> sdc_rpc_destination
+        senders.append(builder.build(f'SDC RPC sender performance {index}'))
+    sdc_executor.add_pipeline(*senders)
+    return senders
+
+
+def _start(sdc_executor, pipelines):
+    for pipeline in pipelines:
+        sdc_executor.start_pipeline(pipeline)
+
+
+def _stop(sdc_executor, pipelines):
+    for pipeline in pipelines:
+        if sdc_executor.get_pipeline_status(pipeline).response.json().get('status') == 'RUNNING':
+            sdc_executor.stop_pipeline(pipeline)
+
+
+def _last_batch_lags(sdc_executor, receiver, lag_stage):
+    """Lag in milliseconds of the records of a batch captured from the running receiver pipeline."""
+    snapshot = sdc_executor.capture_snapshot(receiver, start_pipeline=False).snapshot
+    return [record.field['lag_ms'].value for record in snapshot[lag_stage.instance_name].output]
+
+
+def _slope(samples):
+    """Least-squares slope of ``(x, y)`` samples."""
+    mean_x = statistics.mean(x for x, _ in samples)
+    mean_y = statistics.mean(y for _, y in samples)
+    return (sum((x - mean_x) * (y - mean_y) for x, y in samples)
+            / sum((x - mean_x) ** 2 for x, _ in samples))
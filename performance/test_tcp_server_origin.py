@@ -0,0 +1,115 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Performance tests for the TCP Server origin under many concurrent producers. Every benchmark records the throughput
+and the ack latency percentiles seen by the clients in ``extra_info``, so that they can be charted against the
+number of connections and the origin's thread settings.
+"""
+
+import logging
+import statistics
+
+import pytest
+from streamsets.testframework.markers import sdc_min_version
+
+from performance.utils.utils_benchmark import benchmark_pipeline
+from performance.utils.utils_tcp import (BATCH_ACK_MESSAGE, CHARACTER_BASED_LENGTH_FIELD, DELIMITED_RECORDS,
+                                         record_ack_message, run_tcp_load, SYSLOG)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+TCP_PORT = 17892
+RECORDS_PER_TEST = 200_000
+
+
+@sdc_min_version('3.0.0.0')
+@pytest.mark.parametrize('connections', (1, 10, 100, 500))
+@pytest.mark.parametrize('number_of_receiver_threads', (1, 4, 8))
+def test_tcp_server_connections(sdc_builder, sdc_executor, benchmark, connections, number_of_receiver_threads):
+    """Throughput and per-record ack latency against the number of connections and receiver threads.
+
+    Pipeline: tcp_server >> trash
+    """
+    pipeline = _tcp_server_pipeline(sdc_builder, DELIMITED_RECORDS, number_of_receiver_threads, ack='record')
+    _benchmark_tcp_load(benchmark, sdc_executor, pipeline, connections, DELIMITED_RECORDS, ack='record')
+
+
+@sdc_min_version('3.0.0.0')
+@pytest.mark.parametrize('tcp_mode', (DELIMITED_RECORDS, CHARACTER_BASED_LENGTH_FIELD, SYSLOG))
+@pytest.mark.parametrize('ack', ('record', 'batch'))
+def test_tcp_server_framing(sdc_builder, sdc_executor, benchmark, tcp_mode, ack):
+    """Throughput and ack latency of each framing with 100 connections, acknowledged per record or per batch.
+
+    Pipeline: tcp_server >> trash
+    """
+    pipeline = _tcp_server_pipeline(sdc_builder, tcp_mode, number_of_receiver_threads=4, ack=ack)
+    _benchmark_tcp_load(benchmark, sdc_executor, pipeline, 100, tcp_mode, ack=ack)
+
+
+@sdc_min_version('3.0.0.0')
+@pytest.mark.parametrize('records_per_second', (10_000, 50_000))
+def test_tcp_server_target_rate(sdc_builder, sdc_executor, benchmark, records_per_second):
+    """Ack latency at a fixed offered load, spread over 100 connections.
+
+    Pipeline: tcp_server >> trash
+    """
+    pipeline = _tcp_server_pipeline(sdc_builder, DELIMITED_RECORDS, number_of_receiver_threads=4, ack='record')
+    _benchmark_tcp_load(benchmark, sdc_executor, pipeline, 100, DELIMITED_RECORDS, ack='record',
+                        records_per_second=records_per_second)
+
+
+def _tcp_server_pipeline(sdc_builder, tcp_mode, number_of_receiver_threads, ack):
+    builder = sdc_builder.get_pipeline_builder()
+    tcp_server = builder.add_stage('TCP Server')
+    tcp_server.set_attributes(port=[str(TCP_PORT)],
+                              tcp_mode=tcp_mode,
+                              number_of_receiver_threads=number_of_receiver_threads,
+                              max_batch_size_in_messages=1000,
+                              batch_wait_time_in_ms=100)
+    if tcp_mode != SYSLOG:
+        tcp_server.set_attributes(data_format='TEXT')
+    if ack == 'record':
+        tcp_server.set_attributes(record_processed_ack_message=record_ack_message(tcp_mode))
+    elif ack == 'batch':
+        tcp_server.set_attributes(batch_completed_ack_message=BATCH_ACK_MESSAGE)
+
+    trash = builder.add_stage('Trash')
+    tcp_server >> trash
+    return builder.build(f'TCP Server origin {tcp_mode} performance')
+
+
+def _benchmark_tcp_load(benchmark, sdc_executor, pipeline, connections, tcp_mode, ack, records_per_second=None):
+    results = []
+
+    def run_load(command):
+        results.append(run_tcp_load(sdc_executor.server_host, TCP_PORT, connections, RECORDS_PER_TEST // connections,
+                                    records_per_second=records_per_second, tcp_mode=tcp_mode, ack=ack))
+
+    benchmark_pipeline(benchmark, sdc_executor, pipeline, run_load)
+
+    benchmark.extra_info['connections'] = connections
+    benchmark.extra_info['client_records_per_second'] = _median([result.records_per_second for result in results])
+    for name in ('ack_latency_p50', 'ack_latency_p99', 'ack_latency_max'):
+        benchmark.extra_info[f'{name}_sec'] = _median([getattr(result, name) for result in results])
+    benchmark.extra_info['records_acked_ratio'] = (sum(result.records_acked for result in results)
+                                                   / sum(result.records_sent for result in results))
+    if ack:
+        assert all(result.records_acked == result.records_sent for result in results)
+
+
+def _median(values):
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else None
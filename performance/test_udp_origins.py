@@ -0,0 +1,117 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Performance tests for the UDP Source and UDP Multithreaded Source origins. UDP has no back pressure, so instead of
+timing a fixed amount of data, every benchmark replays pre-encoded syslog, NetFlow or collectd packets at increasing
+rates and compares the records sent at each rate with ``pipeline.batchInputRecords.counter``. The loss rate per
+rate and the highest rate without loss are stored in ``extra_info``.
+"""
+
+import logging
+
+import pytest
+from streamsets.testframework.markers import sdc_min_version
+
+from performance.utils.utils_benchmark import benchmark_pipeline, wait_for_counter_to_settle
+from performance.utils.utils_udp import (COLLECTD, DATA_FORMATS, NETFLOW_V5, NETFLOW_V9, PACKET_FACTORIES, SYSLOG,
+                                         blast_udp, max_lossless_packets_per_second)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+UDP_PORT = 17893
+PACKETS_PER_SECOND = (1_000, 5_000, 10_000, 25_000, 50_000)
+STEP_DURATION_SEC = 10
+# Highest loss rate still counted as lossless; a handful of records may be lost at start-up.
+LOSS_TOLERANCE = 0.0001
+
+
+@sdc_min_version('3.0.0.0')
+@pytest.mark.parametrize('packet_format', (SYSLOG, NETFLOW_V5, NETFLOW_V9, COLLECTD))
+@pytest.mark.parametrize('number_of_receiver_threads', (1, 4))
+def test_udp_source_loss_rate(sdc_builder, sdc_executor, benchmark, packet_format, number_of_receiver_threads):
+    """Loss rate of the UDP Source origin against the packet rate.
+
+    Pipeline: udp_source >> trash
+    """
+    builder = sdc_builder.get_pipeline_builder()
+    udp_source = builder.add_stage('UDP Source')
+    udp_source.set_attributes(port=[str(UDP_PORT)],
+                              data_format=DATA_FORMATS[packet_format],
+                              max_batch_size_in_messages=1000,
+                              batch_wait_time_in_ms=100,
+                              # Several receiver threads need native transports to share the port.
+                              use_native_transports_in_epoll=number_of_receiver_threads > 1,
+                              number_of_receiver_threads=number_of_receiver_threads)
+    trash = builder.add_stage('Trash')
+    udp_source >> trash
+    pipeline = builder.build(f'UDP Source performance ({packet_format})')
+
+    _benchmark_loss_rate(benchmark, sdc_executor, pipeline, packet_format)
+    benchmark.extra_info['number_of_receiver_threads'] = number_of_receiver_threads
+
+
+@sdc_min_version('3.0.0.0')
+@pytest.mark.parametrize('packet_format', (SYSLOG, NETFLOW_V5, NETFLOW_V9, COLLECTD))
+@pytest.mark.parametrize('number_of_worker_threads', (1, 4, 8))
+@pytest.mark.parametrize('packet_queue_size', (20_000, 200_000))
+def test_udp_multithreaded_source_loss_rate(sdc_builder, sdc_executor, benchmark, packet_format,
+                                            number_of_worker_threads, packet_queue_size):
+    """Loss rate of the UDP Multithreaded Source origin against the packet rate, the number of worker threads and
+    the size of the queue buffering packets between receiver and worker threads.
+
+    Pipeline: udp_multithreaded_source >> trash
+    """
+    builder = sdc_builder.get_pipeline_builder()
+    udp_source = builder.add_stage('UDP Multithreaded Source')
+    udp_source.set_attributes(port=[str(UDP_PORT)],
+                              data_format=DATA_FORMATS[packet_format],
+                              max_batch_size_in_messages=1000,
+                              batch_wait_time_in_ms=100,
+                              number_of_worker_threads=number_of_worker_threads,
+                              packet_queue_size=packet_queue_size)
+    trash = builder.add_stage('Trash')
+    udp_source >> trash
+    pipeline = builder.build(f'UDP Multithreaded Source performance ({packet_format})')
+
+    _benchmark_loss_rate(benchmark, sdc_executor, pipeline, packet_format)
+    benchmark.extra_info['number_of_worker_threads'] = number_of_worker_threads
+    benchmark.extra_info['packet_queue_size'] = packet_queue_size
+
+
+def _benchmark_loss_rate(benchmark, sdc_executor, pipeline, packet_format):
+    packets = PACKET_FACTORIES[packet_format]()
+    # Loss rates of every round, per packet rate.
+    loss_rates = {rate: [] for rate in PACKETS_PER_SECOND}
+
+    def sweep_rates(command):
+        for rate in PACKETS_PER_SECOND:
+            records_before = wait_for_counter_to_settle(sdc_executor, pipeline)
+            result = blast_udp(sdc_executor.server_host, UDP_PORT, packets, rate, STEP_DURATION_SEC)
+            records_received = wait_for_counter_to_settle(sdc_executor, pipeline) - records_before
+            loss_rate = max(0, 1 - records_received / result.records_sent) if result.records_sent else None
+            logger.info('%s packets/s (%.0f achieved): %s of %s records received, loss rate %s', rate,
+                        result.packets_per_second, records_received, result.records_sent, loss_rate)
+            loss_rates[rate].append(loss_rate)
+
+    benchmark_pipeline(benchmark, sdc_executor, pipeline, sweep_rates)
+
+    # A rate only counts as lossless if it was in every round.
+    worst_loss_rates = {rate: max((loss for loss in losses if loss is not None), default=None)
+                        for rate, losses in loss_rates.items()}
+    benchmark.extra_info['packet_format'] = packet_format
+    benchmark.extra_info['loss_rates'] = {str(rate): loss for rate, loss in worst_loss_rates.items()}
+    benchmark.extra_info['max_lossless_packets_per_second'] = max_lossless_packets_per_second(worst_loss_rates,
+                                                                                              LOSS_TOLERANCE)
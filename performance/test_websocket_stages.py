@@ -0,0 +1,171 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Performance tests for the WebSocket stages, in plain and TLS modes.
+The WebSocket Server origin is fed by many concurrent client sessions at a controlled rate; its benchmarks record the
+sustained messages/sec, the per-message latency (when the pipeline answers every message) and the heap growth of SDC
+in ``extra_info``. The WebSocket Client destination sends to a local WebSocket sink, which measures the receive rate.
+"""
+
+import logging
+import os
+
+import pytest
+from streamsets.testframework.markers import sdc_min_version
+
+from performance.utils.utils_benchmark import benchmark_pipeline
+from performance.utils.utils_histogram import LatencyHistogram
+from performance.utils.utils_websocket import WebSocketSink, json_message, run_websocket_load, server_ssl_context
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+WEBSOCKET_PORT = 18650
+APPLICATION_ID = 'perf'
+MESSAGES_PER_TEST = 200_000
+RAW_DATA_SIZE = 1024 ** 2
+# Keystore and truststore file paths relative to $SDC_RESOURCES; the sink reads the keystore from this repository.
+KEYSTORE_FILE_PATH = 'resources/websocket/websocket_keystore.p12'
+TRUSTSTORE_FILE_PATH = 'resources/websocket/websocket_truststore.jks'
+STORE_PASSWORD = 'streamsets'
+LOCAL_KEYSTORE_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', KEYSTORE_FILE_PATH)
+
+
+@sdc_min_version('3.0.0.0')
+@pytest.mark.parametrize('sessions', (1, 10, 100))
+@pytest.mark.parametrize('messages_per_second', (None, 20_000))
+@pytest.mark.parametrize('use_tls', (False, True))
+def test_websocket_server_throughput(sdc_builder, sdc_executor, benchmark, sessions, messages_per_second, use_tls):
+    """Sustained messages/sec and heap growth against the number of sessions and the offered rate
+    (``None`` meaning as fast as possible).
+
+    Pipeline: websocket_server >> trash
+    """
+    pipeline = _websocket_server_pipeline(sdc_builder, use_tls)
+    _benchmark_websocket_load(benchmark, sdc_executor, pipeline, sessions, messages_per_second, use_tls)
+
+
+@sdc_min_version('3.8.0')
+@pytest.mark.parametrize('sessions', (1, 10, 100))
+def test_websocket_server_latency(sdc_builder, sdc_executor, benchmark, sessions):
+    """Per-message latency, from sending a message to getting its response, at a fixed rate.
+
+    Pipeline: websocket_server >> send_response_to_origin
+    """
+    pipeline = _websocket_server_pipeline(sdc_builder, use_tls=False, send_responses=True)
+    _benchmark_websocket_load(benchmark, sdc_executor, pipeline, sessions, messages_per_second=5_000,
+                              use_tls=False, expect_responses=True)
+
+
+@sdc_min_version('3.0.0.0')
+@pytest.mark.parametrize('message_size', (256, 16 * 1024))
+@pytest.mark.parametrize('use_tls', (False, True))
+def test_websocket_client_throughput(sdc_builder, sdc_executor, benchmark, message_size, use_tls):
+    """Send throughput of the WebSocket Client destination to a local WebSocket sink.
+
+    Pipeline: dev_raw_data_source >> websocket_client
+    """
+    sink = WebSocketSink(sdc_executor.server_host,
+                         ssl_context=_sink_ssl_context() if use_tls else None)
+    sink.start()
+    try:
+        builder = sdc_builder.get_pipeline_builder()
+        dev_raw_data_source = builder.add_stage('Dev Raw Data Source')
+        # Dev Raw Data Source produces its raw data over and over again; make it about 1 MB worth of messages.
+        dev_raw_data_source.set_attributes(data_format='JSON',
+                                           raw_data='\n'.join(json_message(index, message_size).decode()
+                                                              for index in range(RAW_DATA_SIZE // message_size)))
+
+        websocket_client = builder.add_stage('WebSocket Client', type='destination')
+        websocket_client.set_attributes(resource_url=sink.url,
+                                        headers=[{'key': 'X-SDC-APPLICATION-ID', 'value': APPLICATION_ID}],
+                                        data_format='JSON')
+        if use_tls:
+            websocket_client.set_attributes(use_tls=True,
+                                            truststore_file=TRUSTSTORE_FILE_PATH,
+                                            truststore_type='JKS',
+                                            truststore_password=STORE_PASSWORD)
+
+        dev_raw_data_source >> websocket_client
+        pipeline = builder.build(f'WebSocket Client destination performance{" (TLS)" if use_tls else ""}')
+
+        rates = []
+
+        def wait_for_messages(command):
+            command.wait_for_pipeline_output_records_count(MESSAGES_PER_TEST)
+            rates.append(sink.messages_per_second)
+
+        # Reset before the start, so that messages sent as soon as the pipeline runs are counted.
+        benchmark_pipeline(benchmark, sdc_executor, pipeline, wait_for_messages, before_start=sink.reset)
+    finally:
+        sink.stop()
+
+    rates = [rate for rate in rates if rate is not None]
+    benchmark.extra_info['message_size'] = message_size
+    benchmark.extra_info['received_messages_per_second'] = sum(rates) / len(rates) if rates else None
+    benchmark.extra_info['received_megabytes'] = sink.bytes / 1024 ** 2
+
+
+def _websocket_server_pipeline(sdc_builder, use_tls, send_responses=False):
+    builder = sdc_builder.get_pipeline_builder()
+    websocket_server = builder.add_stage('WebSocket Server')
+    websocket_server.set_attributes(websocket_listening_port=WEBSOCKET_PORT,
+                                    application_id=APPLICATION_ID,
+                                    data_format='JSON')
+    if use_tls:
+        websocket_server.set_attributes(use_tls=True,
+                                        keystore_file=KEYSTORE_FILE_PATH,
+                                        keystore_type='PKCS12',
+                                        keystore_password=STORE_PASSWORD)
+
+    if send_responses:
+        destination = builder.add_stage('Send Response to Origin')
+        destination.status_code = 200
+    else:
+        destination = builder.add_stage('Trash')
+    websocket_server >> destination
+    return builder.build(f'WebSocket Server origin performance{" (TLS)" if use_tls else ""}')
+
+
+def _benchmark_websocket_load(benchmark, sdc_executor, pipeline, sessions, messages_per_second, use_tls,
+                              expect_responses=False):
+    results = []
+
+    def run_load(command):
+        results.append(run_websocket_load(f'{"wss" if use_tls else "ws"}://{sdc_executor.server_host}:'
+                                          f'{WEBSOCKET_PORT}/',
+                                          sessions, MESSAGES_PER_TEST // sessions,
+                                          messages_per_second=messages_per_second,
+                                          application_id=APPLICATION_ID,
+                                          expect_responses=expect_responses))
+        command.wait_for_pipeline_output_records_count(results[-1].messages_sent)
+
+    benchmark_pipeline(benchmark, sdc_executor, pipeline, run_load)
+
+    benchmark.extra_info['sessions'] = sessions
+    benchmark.extra_info['target_messages_per_second'] = messages_per_second
+    benchmark.extra_info['sent_messages_per_second'] = (sum(result.messages_sent for result in results)
+                                                        / sum(result.seconds for result in results))
+    if expect_responses:
+        histogram = LatencyHistogram()
+        for result in results:
+            histogram.merge(result.histogram)
+        benchmark.extra_info.update(histogram.summary())
+
+
+def _sink_ssl_context():
+    # Reading the PKCS12 keystore needs the cryptography package, which isn't required by the rest of the tests.
+    pytest.importorskip('cryptography')
+    return server_ssl_context(LOCAL_KEYSTORE_FILE_PATH, STORE_PASSWORD)
@@ -0,0 +1,110 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for storing benchmark results and detecting regressions against them
+
+import json
+import logging
+import os
+import sqlite3
+import statistics
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINE_STORE = os.path.join('.benchmarks', 'baselines.sqlite')
+DEFAULT_BASELINE_RUNS = 10
+DEFAULT_MIN_BASELINE_RUNS = 3
+DEFAULT_REGRESSION_THRESHOLD = 0.1
+# Scale factor that makes the MAD a consistent estimator of the standard deviation for normally distributed data.
+MAD_SCALE = 1.4826
+# A drop must also exceed this many (scaled) MADs to count as a regression, so that noisy benchmarks don't flap.
+MAD_TOLERANCE = 3
+
+BenchmarkKey = namedtuple('BenchmarkKey', ['test_id', 'params', 'sdc_version', 'jvm_opts'])
+Comparison = namedtuple('Comparison', ['throughput', 'baseline_median', 'baseline_mad', 'baseline_runs',
+                                       'delta', 'regression'])
+
+
+class BaselineStore:
+    """SQLite-backed store of benchmark results.
+
+    Results are keyed by :py:class:`BenchmarkKey`, i.e. test id, parameters, SDC version and the ``SDC_JAVA_OPTS``
+    set by ``sdc_builder_hook``. Throughput is stored as records/sec, so benchmarks that do not report
+    ``records_per_second`` in their ``extra_info`` are not stored.
+
+    Args:
+        path (:obj:`str`, optional): Path of the SQLite database. Default: :py:const:`DEFAULT_BASELINE_STORE`
+    """
+    def __init__(self, path=DEFAULT_BASELINE_STORE):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results ('
+                                'test_id TEXT NOT NULL, '
+                                'params TEXT NOT NULL, '
+                                'sdc_version TEXT NOT NULL, '
+                                'jvm_opts TEXT NOT NULL, '
+                                'timestamp REAL NOT NULL, '
+                                'throughput REAL NOT NULL, '
+                                'extra_info TEXT)')
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def add(self, key, throughput, extra_info=None, timestamp=None):
+        """Store the result of one benchmark run."""
+        self.connection.execute('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                (*_normalize(key), timestamp or time.time(), throughput,
+                                 json.dumps(extra_info or {}, default=str)))
+        self.connection.commit()
+
+    def history(self, key, runs=DEFAULT_BASELINE_RUNS):
+        """Throughput of the last ``runs`` runs stored under ``key``, most recent first."""
+        cursor = self.connection.execute('SELECT throughput FROM results '
+                                         'WHERE test_id = ? AND params = ? AND sdc_version = ? AND jvm_opts = ? '
+                                         'ORDER BY timestamp DESC LIMIT ?',
+                                         (*_normalize(key), runs))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def compare(throughput, history, threshold=DEFAULT_REGRESSION_THRESHOLD, min_runs=DEFAULT_MIN_BASELINE_RUNS):
+    """Compare a throughput against previous runs using their median and median absolute deviation (MAD).
+
+    A run is a regression when its throughput is more than ``threshold`` (a fraction) below the baseline median
+    *and* the drop is larger than :py:const:`MAD_TOLERANCE` scaled MADs. With fewer than ``min_runs`` previous
+    runs there is no baseline yet and nothing is flagged.
+
+    Returns:
+        A :py:class:`Comparison`. ``delta`` is the relative change against the baseline median, e.g. ``-0.25`` for a
+        25% drop, or ``None`` without a baseline.
+    """
+    if len(history) < min_runs:
+        return Comparison(throughput, None, None, len(history), None, False)
+
+    median = statistics.median(history)
+    mad = statistics.median(abs(value - median) for value in history)
+    delta = (throughput - median) / median if median else 0
+    regression = delta < -threshold and (median - throughput) > MAD_TOLERANCE * MAD_SCALE * mad
+    return Comparison(throughput, median, mad, len(history), delta, regression)
+
+
+def _normalize(key):
+    return (key.test_id,
+            json.dumps(key.params or {}, sort_keys=True, default=str),
+            str(key.sdc_version or ''),
+            str(key.jvm_opts or ''))
@@ -0,0 +1,268 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for benchmarking pipelines phase by phase
+
+import logging
+import statistics
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+INPUT_RECORDS_COUNTER = 'pipeline.batchInputRecords.counter'
+BATCH_PROCESSING_TIMER = 'pipeline.batchProcessing.timer'
+
+PHASES = ('add', 'start', 'run', 'stop', 'remove')
+
+MetricsSample = namedtuple('MetricsSample', ['timestamp', 'input_records', 'batch_p50', 'batch_p99', 'heap_used'])
+
+
+def get_heap_used(executor):
+    """Return the JVM heap in use by SDC, in bytes, as reported by its JMX endpoint, or ``None``."""
+    memory = _get_jmx_bean(executor, 'java.lang:type=Memory')
+    return memory['HeapMemoryUsage']['used'] if memory else None
+
+
+def get_process_cpu_time(executor):
+    """Return the CPU time used by the SDC process so far, in seconds, as reported by its JMX endpoint, or ``None``."""
+    operating_system = _get_jmx_bean(executor, 'java.lang:type=OperatingSystem')
+    return operating_system['ProcessCpuTime'] / 1e9 if operating_system else None
+
+
+def get_gc_time(executor):
+    """Return the time SDC spent in garbage collection so far, in seconds, over all collectors, or ``None``."""
+    collectors = _get_jmx_beans(executor, 'java.lang:type=GarbageCollector,*')
+    return sum(collector['CollectionTime'] for collector in collectors) / 1000 if collectors else None
+
+
+def _get_jmx_bean(executor, query):
+    beans = _get_jmx_beans(executor, query)
+    return beans[0] if beans else None
+
+
+def _get_jmx_beans(executor, query):
+    try:
+        response = executor.api_client.session.get(f'{executor.api_client.server_url}/rest/v1/system/jmx',
+                                                   params={'qry': query})
+        response.raise_for_status()
+        return response.json()['beans']
+    except Exception as e:
+        logger.debug('Could not read JMX beans %s: %s', query, e)
+        return None
+
+
+def get_counter(executor, pipeline, name=INPUT_RECORDS_COUNTER):
+    """Return the current count of a pipeline counter, ``0`` if the pipeline has no metrics yet."""
+    metrics_json = executor.api_client.get_pipeline_metrics(pipeline.id) or {}
+    return metrics_json.get('counters', {}).get(name, {}).get('count', 0)
+
+
+def wait_for_counter_to_settle(executor, pipeline, name=INPUT_RECORDS_COUNTER, interval_sec=1, timeout_sec=60):
+    """Wait until a pipeline counter stops changing between two polls and return its count.
+
+    Useful after pushing data to an origin that cannot tell the sender how much it received, e.g. UDP.
+    """
+    count = get_counter(executor, pipeline, name)
+    deadline = time.time() + timeout_sec
+    while time.time() < deadline:
+        time.sleep(interval_sec)
+        previous, count = count, get_counter(executor, pipeline, name)
+        if count == previous:
+            break
+    else:
+        logger.warning('Counter %s of pipeline %s still changing after %s seconds', name, pipeline.id, timeout_sec)
+    return count
+
+
+class MetricsSampler(threading.Thread):
+    """Polls the metrics of a running pipeline in the background.
+
+    Args:
+        executor: The SDC running the pipeline.
+        pipeline: The pipeline to sample.
+        interval_sec (:obj:`float`, optional): Time between samples. Default: ``1``
+    """
+    def __init__(self, executor, pipeline, interval_sec=1):
+        super().__init__(daemon=True)
+        self.executor = executor
+        self.pipeline = pipeline
+        self.interval_sec = interval_sec
+        self.samples = []
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            self.sample()
+            self._stopped.wait(self.interval_sec)
+
+    def sample(self):
+        try:
+            metrics_json = self.executor.api_client.get_pipeline_metrics(self.pipeline.id)
+        except Exception as e:
+            logger.debug('Could not sample metrics of pipeline %s: %s', self.pipeline.id, e)
+            return
+        if not metrics_json:
+            return
+        counter = metrics_json.get('counters', {}).get(INPUT_RECORDS_COUNTER, {})
+        timer = metrics_json.get('timers', {}).get(BATCH_PROCESSING_TIMER, {})
+        self.samples.append(MetricsSample(time.time(),
+                                          counter.get('count', 0),
+                                          timer.get('p50'),
+                                          timer.get('p99'),
+                                          get_heap_used(self.executor)))
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        # Take one last sample so that the tail of the run is accounted for.
+        self.sample()
+
+    @property
+    def max_heap_used(self):
+        """Highest heap usage seen while sampling, in bytes, or ``None``."""
+        return max((sample.heap_used for sample in self.samples if sample.heap_used is not None), default=None)
+
+    @property
+    def heap_growth(self):
+        """Heap usage of the last sample minus that of the first one, in bytes, or ``None``."""
+        heap_used = [sample.heap_used for sample in self.samples if sample.heap_used is not None]
+        return heap_used[-1] - heap_used[0] if len(heap_used) >= 2 else None
+
+    @property
+    def steady_state_records_per_second(self):
+        """Input records/sec between the first sample with records and the last sample, or ``None``."""
+        samples = [sample for sample in self.samples if sample.input_records]
+        if len(samples) < 2 or samples[-1].timestamp == samples[0].timestamp:
+            return None
+        return ((samples[-1].input_records - samples[0].input_records)
+                / (samples[-1].timestamp - samples[0].timestamp))
+
+
+def benchmark_pipeline(benchmark, executor, pipeline, wait_for_run, rounds=2, sample_interval_sec=1,
+                       before_start=None):
+    """Benchmark a pipeline with ``benchmark.pedantic``, timing each phase of its lifecycle separately.
+
+    Every round adds, starts, runs, stops (if still running) and removes the pipeline. The overall timing is what
+    pytest-benchmark reports as usual; on top of that, ``benchmark.extra_info`` gets the median duration of each
+    phase across rounds (``<phase>_sec``; ``start_sec`` is the start-up latency), the steady-state input
+    records/sec, the p50/p99 batch processing time as reported by SDC and the peak heap usage and heap growth during
+    the run, so that runner regressions can be told apart from REST and import overhead.
+
+    Args:
+        benchmark: The pytest-benchmark fixture.
+        executor: The SDC to run the pipeline on.
+        pipeline: The pipeline to benchmark. Its id is changed for every round.
+        wait_for_run (:obj:`callable`): Called with the command returned by ``start_pipeline``; must block until
+            the run is over, e.g. ``lambda command: command.wait_for_pipeline_output_records_count(1000)``.
+        rounds (:obj:`int`, optional): Number of rounds. Default: ``2``
+        sample_interval_sec (:obj:`float`, optional): Time between metric samples. Default: ``1``
+        before_start (:obj:`callable`, optional): Called without arguments right before every start of the pipeline,
+            e.g. to reset what the run is measured with.
+
+    Returns:
+        The ``extra_info`` :obj:`dict`.
+    """
+    extra_info = measure_pipeline(executor, pipeline, wait_for_run, rounds, sample_interval_sec,
+                                  run_rounds=lambda run_round, rounds: benchmark.pedantic(run_round, rounds=rounds),
+                                  before_start=before_start)
+    benchmark.extra_info.update(extra_info)
+    return extra_info
+
+
+def measure_pipeline(executor, pipeline, wait_for_run, rounds=2, sample_interval_sec=1, run_rounds=None,
+                     before_start=None):
+    """Run a pipeline for several rounds and return the metrics :py:func:`benchmark_pipeline` reports, without
+    pytest-benchmark, e.g. for a baseline measured once per module by a fixture.
+
+    Args:
+        executor: The SDC to run the pipeline on.
+        pipeline: The pipeline to run. Its id is changed for every round.
+        wait_for_run (:obj:`callable`): See :py:func:`benchmark_pipeline`.
+        rounds (:obj:`int`, optional): Number of rounds. Default: ``2``
+        sample_interval_sec (:obj:`float`, optional): Time between metric samples. Default: ``1``
+        run_rounds (:obj:`callable`, optional): Called with the function running one round and ``rounds``, to run
+            them. Default: ``None``, i.e. run them one after the other
+        before_start (:obj:`callable`, optional): See :py:func:`benchmark_pipeline`.
+
+    Returns:
+        A :obj:`dict` of metrics, as added to ``extra_info`` by :py:func:`benchmark_pipeline`.
+    """
+    results = []
+
+    def run_round():
+        phases = {}
+        pipeline.id = str(uuid.uuid4())
+
+        start = time.time()
+        executor.add_pipeline(pipeline)
+        phases['add'] = time.time() - start
+
+        if before_start is not None:
+            before_start()
+        start = time.time()
+        command = executor.start_pipeline(pipeline)
+        phases['start'] = time.time() - start
+
+        sampler = MetricsSampler(executor, pipeline, sample_interval_sec)
+        sampler.start()
+        start = time.time()
+        try:
+            wait_for_run(command)
+        finally:
+            phases['run'] = time.time() - start
+            sampler.stop()
+
+        start = time.time()
+        if executor.get_pipeline_status(pipeline).response.json().get('status') == 'RUNNING':
+            executor.stop_pipeline(pipeline).wait_for_stopped()
+        phases['stop'] = time.time() - start
+
+        start = time.time()
+        executor.remove_pipeline(pipeline)
+        phases['remove'] = time.time() - start
+
+        last_timer_sample = next((sample for sample in reversed(sampler.samples) if sample.batch_p50 is not None),
+                                 None)
+        results.append(dict(phases=phases,
+                            records_per_second=sampler.steady_state_records_per_second,
+                            batch_p50=last_timer_sample.batch_p50 if last_timer_sample else None,
+                            batch_p99=last_timer_sample.batch_p99 if last_timer_sample else None,
+                            heap_used=sampler.max_heap_used,
+                            heap_growth=sampler.heap_growth))
+        logger.info('Pipeline %s phases: %s', pipeline.id, ', '.join(f'{phase}={phases[phase]:.2f}s'
+                                                                      for phase in PHASES))
+
+    if run_rounds is None:
+        for _ in range(rounds):
+            run_round()
+    else:
+        run_rounds(run_round, rounds)
+
+    extra_info = {f'{phase}_sec': _median([result['phases'][phase] for result in results]) for phase in PHASES}
+    extra_info['records_per_second'] = _median([result['records_per_second'] for result in results])
+    extra_info['batch_p50_sec'] = _median([result['batch_p50'] for result in results])
+    extra_info['batch_p99_sec'] = _median([result['batch_p99'] for result in results])
+    heap_used = _median([result['heap_used'] for result in results])
+    extra_info['heap_used_mb'] = heap_used / 1024 ** 2 if heap_used is not None else None
+    heap_growth = _median([result['heap_growth'] for result in results])
+    extra_info['heap_growth_mb'] = heap_growth / 1024 ** 2 if heap_growth is not None else None
+    return extra_info
+
+
+def _median(values):
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else None
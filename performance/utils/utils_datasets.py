@@ -0,0 +1,159 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for sharing benchmark datasets between tests
+
+import json
+import logging
+import os
+import string
+import tempfile
+from collections import namedtuple
+
+import sqlalchemy
+from streamsets.testframework.utils import get_random_string
+
+from performance.utils.utils_jdbc import bulk_load, generate_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED = 0
+
+Dataset = namedtuple('Dataset', ['key', 'value', 'drop'])
+
+
+class DatasetRegistry:
+    """Builds benchmark datasets once and hands the same dataset to every benchmark that asks for it.
+
+    Datasets are identified by a key made of the environment they live in, their schema, their size and the seed
+    of the generator that filled them. Benchmarks must treat shared datasets as read-only. Everything the registry
+    built or reused is dropped by :py:meth:`drop_all`, which the ``dataset_registry`` fixture calls at the end of the
+    session.
+
+    With a ``path``, datasets are also recorded in a JSON file, so that pytest processes run one after the other
+    (see ``performance.compare_versions``) reuse the datasets built by the previous ones. All processes but the last
+    one should then be created with ``keep``.
+
+    Args:
+        path (:obj:`str`, optional): JSON file shared with the other processes. Default: ``None``, i.e. in memory only
+        keep (:obj:`bool`, optional): Leave the datasets in place in :py:meth:`drop_all`. Default: ``False``
+    """
+    def __init__(self, path=None, keep=False):
+        self.path = path
+        self.keep = keep
+        self._datasets = {}
+
+    def get(self, key, create, drop, dump=None, load=None):
+        """Return the dataset registered under ``key``, building it with ``create`` on first use.
+
+        Args:
+            key (:obj:`tuple`): Dataset identifier of strings and numbers, e.g. ``(environment, schema, size, seed)``.
+            create (:obj:`callable`): Called without arguments to build the dataset. Its return value is what
+                :py:meth:`get` returns.
+            drop (:obj:`callable`): Called with the value returned by ``create`` to drop the dataset.
+            dump (:obj:`callable`, optional): Turns the value returned by ``create`` into something JSON can store
+                in the registry file. Default: the value itself
+            load (:obj:`callable`, optional): Turns what ``dump`` returned back into the value. Default: the stored
+                value itself
+        """
+        if key in self._datasets:
+            logger.info('Reusing dataset %s ...', key)
+            return self._datasets[key].value
+
+        stored = self.stored().get(_key_id(key))
+        if stored is not None:
+            logger.info('Reusing dataset %s built by a previous run ...', key)
+            value = load(stored) if load else stored
+        else:
+            logger.info('Building dataset %s ...', key)
+            value = create()
+            if self.path:
+                self._save(dict(self.stored(), **{_key_id(key): dump(value) if dump else value}))
+        self._datasets[key] = Dataset(key, value, drop)
+        return value
+
+    def jdbc_table(self, database, number_of_rows, seed=DEFAULT_SEED):
+        """Return a table with ``number_of_rows`` rows of ``(id INTEGER PRIMARY KEY, name VARCHAR(40))``, as
+        generated by :py:func:`performance.utils.utils_jdbc.generate_rows`.
+
+        Returns:
+            A :py:class:`sqlalchemy.Table`. Its name is unique, so it can also be used as a table pattern.
+        """
+        def drop(table):
+            logger.info('Dropping table %s in %s database...', table.name, database.type)
+            table.drop(database.engine)
+
+        def create():
+            table = _id_name_table(f'perf_{number_of_rows}_{seed}_{get_random_string(string.ascii_lowercase, 10)}')
+            logger.info('Creating table %s in %s database ...', table.name, database.type)
+            table.create(database.engine)
+            try:
+                logger.info('Adding %s rows into %s database ...', number_of_rows, database.type)
+                bulk_load(database, table, generate_rows(number_of_rows, seed=seed))
+            except Exception:
+                # The registry only drops what create returned, so don't leave a half-filled table behind.
+                drop(table)
+                raise
+            return table
+
+        # The key is logged, and str() of a URL includes its password; repr() hides it.
+        return self.get((database.type, repr(database.engine.url), 'id_name', number_of_rows, seed), create, drop,
+                        dump=lambda table: table.name, load=_id_name_table)
+
+    def drop_all(self):
+        """Drop every dataset built or reused by the registry, in reverse order of creation, and remove them from
+        the registry file. With ``keep``, datasets are left in place for the next processes."""
+        if self.keep:
+            logger.info('Keeping %s datasets for the next runs', len(self._datasets))
+            self._datasets.clear()
+            return
+
+        dropped = set()
+        for dataset in reversed(list(self._datasets.values())):
+            try:
+                dataset.drop(dataset.value)
+                dropped.add(_key_id(dataset.key))
+            except Exception as e:
+                logger.error('Could not drop dataset %s: %s', dataset.key, e)
+        self._datasets.clear()
+        if self.path and dropped:
+            self._save({key_id: value for key_id, value in self.stored().items() if key_id not in dropped})
+
+    def stored(self):
+        """Datasets of the registry file, as a :obj:`dict` of stored values by JSON-encoded key."""
+        if not self.path:
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save(self, datasets):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as f:
+            json.dump(datasets, f, indent=1, sort_keys=True)
+        os.replace(f.name, self.path)
+
+
+def _key_id(key):
+    return json.dumps(list(key))
+
+
+def _id_name_table(table_name):
+    return sqlalchemy.Table(table_name,
+                            sqlalchemy.MetaData(),
+                            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
+                            sqlalchemy.Column('name', sqlalchemy.String(40)))
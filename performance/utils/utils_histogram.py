@@ -0,0 +1,93 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for recording latency distributions
+
+import math
+from collections import defaultdict
+
+DEFAULT_SIGNIFICANT_DIGITS = 3
+# Percentiles reported by LatencyHistogram.summary.
+SUMMARY_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Latency histogram in the style of HdrHistogram.
+
+    Values are recorded as integer microseconds in log-linear buckets that keep ``significant_digits`` decimal digits
+    of precision at every magnitude, so memory depends on the range of values rather than on their number. Buckets are
+    kept sparse, in a :obj:`dict`.
+
+    Args:
+        significant_digits (:obj:`int`, optional): Precision of recorded values. Default:
+            :py:const:`DEFAULT_SIGNIFICANT_DIGITS`
+    """
+    def __init__(self, significant_digits=DEFAULT_SIGNIFICANT_DIGITS):
+        self.significant_digits = significant_digits
+        # Values below 2 * 10 ** digits are stored exactly; above that, the lowest bits are dropped.
+        self._sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._counts = defaultdict(int)
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._total = 0
+
+    def record(self, seconds, count=1):
+        """Record a latency given in seconds."""
+        value = max(0, int(round(seconds * 1_000_000)))
+        shift = max(0, value.bit_length() - self._sub_bucket_bits)
+        self._counts[(shift, value >> shift)] += count
+        self.count += count
+        self._total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Add all values recorded by another histogram with the same precision."""
+        if other.significant_digits != self.significant_digits:
+            raise ValueError('Cannot merge histograms of different precision')
+        for key, count in other._counts.items():
+            self._counts[key] += count
+        self.count += other.count
+        self._total += other._total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent):
+        """Latency in seconds at the given percentile, as the highest value equivalent to its bucket, or ``None``."""
+        if not self.count:
+            return None
+        target = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for shift, sub_bucket in sorted(self._counts):
+            seen += self._counts[(shift, sub_bucket)]
+            if seen >= target:
+                highest_equivalent = ((sub_bucket + 1) << shift) - 1
+                return min(highest_equivalent, self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    @property
+    def mean(self):
+        return self._total / self.count / 1_000_000 if self.count else None
+
+    def summary(self, prefix='latency', percentiles=SUMMARY_PERCENTILES):
+        """Return count, mean, max and percentiles in seconds, keyed for ``benchmark.extra_info``."""
+        summary = {f'{prefix}_count': self.count,
+                   f'{prefix}_mean_sec': self.mean,
+                   f'{prefix}_max_sec': self.max / 1_000_000 if self.max is not None else None}
+        for percent in percentiles:
+            summary[f'{prefix}_p{str(percent).replace(".", "_")}_sec'] = self.percentile(percent)
+        return summary
@@ -0,0 +1,312 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for load testing HTTP-based origins
+
+import asyncio
+import json
+import logging
+import ssl
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from performance.utils.utils_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+APPLICATION_ID_HEADER = 'X-SDC-APPLICATION-ID'
+DEFAULT_CONNECTIONS = 50
+# Upper bound on the connections of an open-loop load, to stay below the open file limit.
+DEFAULT_MAX_CONNECTIONS = 1000
+DEFAULT_BODY_SIZE = 256
+DEFAULT_REQUEST_TIMEOUT_SEC = 30
+
+HttpLoadResult = namedtuple('HttpLoadResult', ['requests', 'errors', 'timeouts', 'seconds', 'requests_per_second',
+                                               'histogram'])
+
+
+def json_body(size=DEFAULT_BODY_SIZE):
+    """JSON object of roughly ``size`` bytes."""
+    return json.dumps({'payload': 'x' * max(0, size - len('{"payload": ""}'))}).encode()
+
+
+def insecure_ssl_context():
+    """TLS context trusting any certificate, for the self-signed keystores in ``resources/``."""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def run_http_load(url, requests_per_second, duration_sec, connections=DEFAULT_CONNECTIONS, body=None,
+                  headers=None, application_id=None, method='POST', ssl_context=None,
+                  request_timeout_sec=DEFAULT_REQUEST_TIMEOUT_SEC, max_connections=DEFAULT_MAX_CONNECTIONS):
+    """Send requests at a fixed rate over keep-alive connections and record their latency.
+
+    The load is open-loop: request ``k`` is sent ``k / requests_per_second`` after the start, whether or not earlier
+    requests have completed. It goes over an idle connection if there is one, else over a new connection, so a slow
+    server doesn't lower the offered rate; only when ``max_connections`` requests are in flight does a request wait
+    for a connection. Latency is measured from the time the request was due, not from when it was actually written,
+    so a stalled server is charged for any request it delayed (coordinated omission).
+
+    Args:
+        url (:obj:`str`): ``http`` or ``https`` URL to send requests to.
+        requests_per_second (:obj:`float`): Target rate.
+        duration_sec (:obj:`float`): How long to send requests for.
+        connections (:obj:`int`, optional): Number of keep-alive connections opened before the load starts.
+            Default: :py:const:`DEFAULT_CONNECTIONS`
+        body (:obj:`bytes`, optional): Request body. Default: :py:func:`json_body` of
+            :py:const:`DEFAULT_BODY_SIZE` bytes
+        headers (:obj:`dict`, optional): Additional request headers.
+        application_id (:obj:`str`, optional): Value of the ``X-SDC-APPLICATION-ID`` header.
+        method (:obj:`str`, optional): HTTP method. Default: ``'POST'``
+        ssl_context (:py:class:`ssl.SSLContext`, optional): Context for ``https`` URLs. Default:
+            :py:func:`insecure_ssl_context`
+        request_timeout_sec (:obj:`float`, optional): Time after which a request counts as failed and its
+            connection is closed.
+        max_connections (:obj:`int`, optional): Maximum number of requests in flight, i.e. of open connections.
+            Default: :py:const:`DEFAULT_MAX_CONNECTIONS`
+
+    Returns:
+        An :py:class:`HttpLoadResult` whose ``histogram`` is a
+        :py:class:`performance.utils.utils_histogram.LatencyHistogram` of the successful requests.
+    """
+    endpoint, request = _prepare(url, body, headers, application_id, method, ssl_context)
+    return asyncio.run(_run_open_loop(endpoint, request, requests_per_second, duration_sec,
+                                      min(connections, max_connections), max_connections, request_timeout_sec))
+
+
+def run_http_concurrency(url, concurrency, duration_sec, body=None, headers=None, application_id=None, method='POST',
+                         ssl_context=None, request_timeout_sec=DEFAULT_REQUEST_TIMEOUT_SEC):
+    """Keep ``concurrency`` requests in flight for ``duration_sec`` and record their latency.
+
+    The load is closed-loop: each of the ``concurrency`` clients sends its next request as soon as the previous one
+    completed, which is how synchronous callers of a service behave. Latency is measured from when a request is sent.
+    Failed requests count as errors. Requests that get no response within ``request_timeout_sec`` also count as
+    timeouts.
+
+    Takes the same arguments as :py:func:`run_http_load`, but for ``connections`` and ``max_connections``.
+
+    Returns:
+        An :py:class:`HttpLoadResult`.
+    """
+    endpoint, request = _prepare(url, body, headers, application_id, method, ssl_context)
+    start = time.perf_counter()
+    schedules = [_closed_loop_schedule(start + duration_sec) for _ in range(concurrency)]
+    return asyncio.run(_run_load(endpoint, request, schedules, start, request_timeout_sec))
+
+
+def _prepare(url, body, headers, application_id, method, ssl_context):
+    """Return the endpoint to connect to and the raw request to send."""
+    parts = urlsplit(url)
+    secure = parts.scheme == 'https'
+    request_headers = {'Host': parts.netloc, 'Connection': 'keep-alive', 'Content-Type': 'application/json'}
+    if application_id is not None:
+        request_headers[APPLICATION_ID_HEADER] = application_id
+    request_headers.update(headers or {})
+    body = json_body() if body is None else body
+    request_headers['Content-Length'] = str(len(body))
+    request = (f'{method} {parts.path or "/"}{"?" + parts.query if parts.query else ""} HTTP/1.1\r\n'
+               + ''.join(f'{name}: {value}\r\n' for name, value in request_headers.items())
+               + '\r\n').encode() + body
+
+    endpoint = (parts.hostname, parts.port or (443 if secure else 80),
+                (ssl_context or insecure_ssl_context()) if secure else None)
+    return endpoint, request
+
+
+async def _run_load(endpoint, request, schedules, start, request_timeout_sec):
+    histogram = LatencyHistogram()
+    results = await asyncio.gather(*[_run_connection(endpoint, request, histogram, schedule, request_timeout_sec)
+                                     for schedule in schedules])
+    return _load_result(histogram, results, start)
+
+
+async def _run_open_loop(endpoint, request, requests_per_second, duration_sec, connections, max_connections,
+                         request_timeout_sec):
+    histogram = LatencyHistogram()
+    pool = _ConnectionPool(endpoint, max_connections)
+    try:
+        await pool.open(connections)
+        start = time.perf_counter()
+        requests = []
+        for due in _schedule(start, 1 / requests_per_second, start + duration_sec):
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            requests.append(asyncio.ensure_future(_send_request(pool, request, histogram, due, request_timeout_sec)))
+        results = await asyncio.gather(*requests)
+    finally:
+        pool.close()
+    logger.debug('Open-loop load used %s connections', pool.opened)
+    return _load_result(histogram, results, start)
+
+
+def _load_result(histogram, results, start):
+    """Sum the (sent, failed, timed out) counts of ``results`` into an :py:class:`HttpLoadResult`."""
+    seconds = time.perf_counter() - start
+    requests, errors, timeouts = (sum(counts) for counts in zip(*results))
+    result = HttpLoadResult(requests=requests,
+                            errors=errors,
+                            timeouts=timeouts,
+                            seconds=seconds,
+                            requests_per_second=(requests - errors) / seconds,
+                            histogram=histogram)
+    logger.info('Sent %s requests (%s failed, %s timed out) in %.1f s: %.0f/s, latency p50=%s p99=%s max=%s',
+                requests, errors, timeouts, seconds, result.requests_per_second,
+                histogram.percentile(50), histogram.percentile(99),
+                histogram.max / 1_000_000 if histogram.max is not None else None)
+    return result
+
+
+async def _run_connection(endpoint, request, histogram, schedule, request_timeout_sec):
+    """Send a request at every time ``schedule`` yields, over one keep-alive connection that is reopened on errors.
+    Latency is measured from the scheduled time."""
+    host, port, ssl_context = endpoint
+    sent = failed = timed_out = 0
+    reader = writer = None
+    try:
+        for due in schedule:
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent += 1
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+                writer.write(request)
+                status, keep_alive = await asyncio.wait_for(_read_response(reader), timeout=request_timeout_sec)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                logger.debug('Request failed: %s', e)
+                failed += 1
+                timed_out += isinstance(e, asyncio.TimeoutError)
+                writer = _close(writer)
+                continue
+            if 200 <= status < 300:
+                histogram.record(time.perf_counter() - due)
+            else:
+                failed += 1
+            if not keep_alive:
+                writer = _close(writer)
+    finally:
+        _close(writer)
+    return sent, failed, timed_out
+
+
+async def _send_request(pool, request, histogram, due, request_timeout_sec):
+    """Send one request over a connection of the pool. Latency is measured from ``due``."""
+    connection = None
+    try:
+        connection = await pool.acquire()
+        reader, writer = connection
+        writer.write(request)
+        status, keep_alive = await asyncio.wait_for(_read_response(reader), timeout=request_timeout_sec)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+        logger.debug('Request failed: %s', e)
+        if connection is not None:
+            pool.release(connection, reusable=False)
+        return 1, 1, int(isinstance(e, asyncio.TimeoutError))
+    pool.release(connection, reusable=keep_alive)
+    if 200 <= status < 300:
+        histogram.record(time.perf_counter() - due)
+        return 1, 0, 0
+    return 1, 1, 0
+
+
+class _ConnectionPool:
+    """Keep-alive connections, opened on demand up to ``max_connections``."""
+    def __init__(self, endpoint, max_connections):
+        self.endpoint = endpoint
+        self.opened = 0
+        self._idle = []
+        self._available = asyncio.Semaphore(max_connections)
+
+    async def open(self, count):
+        """Open ``count`` idle connections, so that the load doesn't start with their handshakes."""
+        self._idle.extend(await asyncio.gather(*[self._connect() for _ in range(count)]))
+
+    async def acquire(self):
+        await self._available.acquire()
+        if self._idle:
+            return self._idle.pop()
+        try:
+            return await self._connect()
+        except BaseException:
+            self._available.release()
+            raise
+
+    def release(self, connection, reusable):
+        if reusable:
+            self._idle.append(connection)
+        else:
+            _close(connection[1])
+        self._available.release()
+
+    def close(self):
+        for _, writer in self._idle:
+            _close(writer)
+        self._idle = []
+
+    async def _connect(self):
+        host, port, ssl_context = self.endpoint
+        connection = await asyncio.open_connection(host, port, ssl=ssl_context)
+        self.opened += 1
+        return connection
+
+
+def _schedule(first, interval, end):
+    due = first
+    while due < end:
+        yield due
+        due += interval
+
+
+def _closed_loop_schedule(end):
+    while True:
+        now = time.perf_counter()
+        if now >= end:
+            return
+        yield now
+
+
+async def _read_response(reader):
+    """Read one response; return its status and whether the connection can be reused."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise asyncio.IncompleteReadError(b'', None)
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+def _close(writer):
+    if writer is not None:
+        writer.close()
+    return None
@@ -0,0 +1,174 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for loading large volumes of data into JDBC databases
+
+import csv
+import io
+import itertools
+import logging
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections import namedtuple
+
+import sqlalchemy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+LoadStats = namedtuple('LoadStats', ['rows', 'seconds', 'rows_per_second', 'method'])
+
+
+def generate_rows(number_of_rows, seed=None):
+    """Lazily generate ``{'id': ..., 'name': ...}`` rows, as used by the JDBC benchmarks.
+
+    Args:
+        number_of_rows (:obj:`int`): Number of rows to generate. Ids go from 1 to ``number_of_rows``.
+        seed (:obj:`int`, optional): Seed for the generated names. Default: ``None`` (random)
+    """
+    rng = random.Random(seed)
+    for i in range(1, number_of_rows + 1):
+        yield {'id': i, 'name': str(uuid.UUID(int=rng.getrandbits(128), version=4))}
+
+
+def bulk_load(database, table, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream rows into a table in chunks of bounded size, using the fastest path available for the database.
+
+    PostgreSQL uses ``COPY ... FROM STDIN``, MySQL ``LOAD DATA LOCAL INFILE``, SQL Server the driver's bulk copy
+    and anything else (or a fast path that turns out to be unavailable) falls back to ``executemany``. Only one
+    chunk is held in memory at a time, regardless of how many rows ``rows`` yields.
+
+    Args:
+        database: The STF database environment.
+        table (:py:class:`sqlalchemy.Table`): Table to load. It must already exist.
+        rows (:obj:`iterable`): Rows as :obj:`dict` instances keyed by column name, e.g. from
+            :py:func:`generate_rows`.
+        chunk_size (:obj:`int`, optional): Rows per chunk. Default: :py:const:`DEFAULT_CHUNK_SIZE`
+
+    Returns:
+        A :py:class:`LoadStats` describing the load.
+    """
+    dialect = database.engine.dialect.name
+    loader = _LOADERS.get(dialect, _load_executemany)
+    columns = [column.name for column in table.columns]
+    rows = iter(rows)
+
+    start = time.time()
+    total_rows = 0
+    method = _method_name(loader)
+    engine = _get_engine(database, dialect)
+    try:
+        with engine.connect() as connection:
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                try:
+                    loader(connection, table, columns, chunk)
+                except Exception as e:
+                    if loader is _load_executemany:
+                        raise
+                    logger.warning('Bulk loading into %s failed with %s (%s); falling back to executemany ...',
+                                   dialect, loader.__name__, e)
+                    connection.connection.rollback()
+                    loader = _load_executemany
+                    method = _method_name(loader)
+                    loader(connection, table, columns, chunk)
+                total_rows += len(chunk)
+                logger.debug('Loaded %s rows into %s ...', total_rows, table.name)
+    finally:
+        if engine is not database.engine:
+            engine.dispose()
+
+    seconds = time.time() - start
+    stats = LoadStats(total_rows, seconds, total_rows / seconds if seconds else float('inf'), method)
+    logger.info('Loaded %s rows into %s in %.2f s (%.0f rows/s) using %s',
+                stats.rows, table.name, stats.seconds, stats.rows_per_second, stats.method)
+    return stats
+
+
+def _method_name(loader):
+    return loader.__name__[len('_load_'):]
+
+
+def _get_engine(database, dialect):
+    # LOAD DATA LOCAL INFILE must be enabled explicitly on the client side.
+    if dialect == 'mysql':
+        return sqlalchemy.create_engine(database.engine.url, connect_args={'local_infile': True})
+    return database.engine
+
+
+def _write_csv(stream, columns, chunk, null=''):
+    writer = csv.writer(stream, lineterminator='\n')
+    for row in chunk:
+        writer.writerow([null if row.get(column) is None else row[column] for column in columns])
+
+
+def _load_executemany(connection, table, columns, chunk):
+    connection.execute(table.insert(), chunk)
+
+
+def _load_postgresql(connection, table, columns, chunk):
+    stream = io.StringIO()
+    _write_csv(stream, columns, chunk)
+    stream.seek(0)
+    raw_connection = connection.connection
+    with raw_connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY {table.name} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', stream)
+    raw_connection.commit()
+
+
+def _load_mysql(connection, table, columns, chunk):
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+        _write_csv(f, columns, chunk, null='\\N')
+    try:
+        raw_connection = connection.connection
+        cursor = raw_connection.cursor()
+        try:
+            cursor.execute(f"LOAD DATA LOCAL INFILE %s INTO TABLE {table.name} "
+                           f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+                           f"({', '.join(columns)})", (f.name, ))
+        finally:
+            cursor.close()
+        raw_connection.commit()
+    finally:
+        os.remove(f.name)
+
+
+def _load_mssql(connection, table, columns, chunk):
+    raw_connection = connection.connection
+    if hasattr(raw_connection, 'bulk_copy'):
+        # pymssql >= 2.2
+        raw_connection.bulk_copy(table.name, [tuple(row[column] for column in columns) for row in chunk])
+    else:
+        cursor = raw_connection.cursor()
+        try:
+            # pyodbc only; other drivers silently ignore the attribute.
+            cursor.fast_executemany = True
+            placeholder = '?' if connection.dialect.paramstyle == 'qmark' else '%s'
+            cursor.executemany(f'INSERT INTO {table.name} ({", ".join(columns)}) '
+                               f'VALUES ({", ".join(placeholder for _ in columns)})',
+                               [tuple(row[column] for column in columns) for row in chunk])
+        finally:
+            cursor.close()
+    raw_connection.commit()
+
+
+_LOADERS = {'postgresql': _load_postgresql,
+            'mysql': _load_mysql,
+            'mssql': _load_mssql}
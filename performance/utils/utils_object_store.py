@@ -0,0 +1,162 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for populating and cleaning up object stores (S3, ADLS Gen1/Gen2) concurrently
+
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# Uploads are small and latency-bound, so many more threads than cores pay off.
+DEFAULT_MAX_WORKERS = 32
+# Maximum number of uploads submitted but not finished, per worker; bounds memory for lazily generated objects.
+MAX_PENDING_PER_WORKER = 4
+# Maximum number of keys per S3 DeleteObjects request.
+S3_DELETE_BATCH_SIZE = 1000
+
+UploadStats = namedtuple('UploadStats', ['objects', 'bytes', 'seconds', 'objects_per_second',
+                                         'megabytes_per_second'])
+
+
+class S3Store:
+    """Bucket of an S3 client (e.g. ``aws.s3``)."""
+    def __init__(self, client, bucket):
+        self.client = client
+        self.bucket = bucket
+
+    def put(self, name, body):
+        self.client.put_object(Bucket=self.bucket, Key=name, Body=body)
+
+    def list(self, prefix):
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for content in page.get('Contents', []):
+                yield content['Key']
+
+    def delete_prefix(self, prefix):
+        deleted = 0
+        for keys in _batches(self.list(prefix), S3_DELETE_BATCH_SIZE):
+            response = self.client.delete_objects(Bucket=self.bucket,
+                                                  Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True})
+            for error in response.get('Errors', []):
+                logger.error('Could not delete s3://%s/%s: %s', self.bucket, error['Key'], error['Message'])
+            deleted += len(keys) - len(response.get('Errors', []))
+        return deleted
+
+
+class AdlsGen1Store:
+    """Azure Data Lake Storage Gen1 file system (e.g. ``azure.datalake.file_system``)."""
+    def __init__(self, file_system):
+        self.file_system = file_system
+
+    def put(self, name, body):
+        with self.file_system.open(name, 'wb') as f:
+            f.write(body.encode() if isinstance(body, str) else body)
+
+    def delete_prefix(self, prefix):
+        # Directories are deleted recursively in a single call.
+        if not self.file_system.exists(prefix):
+            return 0
+        self.file_system.rm(prefix, recursive=True)
+        return 1
+
+
+class AdlsGen2Store:
+    """Azure Data Lake Storage Gen2 file system (e.g. ``azure.datalake.file_system``)."""
+    def __init__(self, file_system):
+        self.file_system = file_system
+
+    def put(self, name, body):
+        touch_response = self.file_system.touch(name)
+        write_response = self.file_system.write(name, body)
+        if not (touch_response.response.ok and write_response.response.ok):
+            raise RuntimeError(f'Could not create file: {name}')
+
+    def delete_prefix(self, prefix):
+        # Directories are deleted recursively in a single call.
+        self.file_system.rmdir(prefix, recursive=True)
+        return 1
+
+
+def populate(store, objects, max_workers=DEFAULT_MAX_WORKERS):
+    """Upload objects to a store concurrently.
+
+    At most ``max_workers`` uploads run at the same time and ``objects`` is consumed lazily, so it can be a generator
+    of any size. The first failed upload stops the population and is raised.
+
+    Args:
+        store: One of :py:class:`S3Store`, :py:class:`AdlsGen1Store` or :py:class:`AdlsGen2Store`.
+        objects (:obj:`iterable`): ``(name, body)`` pairs, ``body`` being :obj:`str` or :obj:`bytes`.
+        max_workers (:obj:`int`, optional): Number of concurrent uploads. Default: :py:const:`DEFAULT_MAX_WORKERS`
+
+    Returns:
+        An :py:class:`UploadStats`.
+    """
+    count = 0
+    total_bytes = 0
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        try:
+            for name, body in objects:
+                if len(pending) >= max_workers * MAX_PENDING_PER_WORKER:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(executor.submit(store.put, name, body))
+                count += 1
+                total_bytes += len(body.encode() if isinstance(body, str) else body)
+            for future in pending:
+                future.result()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    seconds = time.time() - start
+    stats = UploadStats(objects=count,
+                        bytes=total_bytes,
+                        seconds=seconds,
+                        objects_per_second=count / seconds if seconds else None,
+                        megabytes_per_second=total_bytes / 1024 ** 2 / seconds if seconds else None)
+    logger.info('Uploaded %s objects (%s bytes) with %s in %.1f s: %.0f objects/s, %.2f MB/s',
+                count, total_bytes, type(store).__name__, seconds, stats.objects_per_second or 0,
+                stats.megabytes_per_second or 0)
+    return stats
+
+
+def delete_prefix(store, prefix):
+    """Delete everything under a prefix, listing it page by page and deleting in batches where the store allows.
+
+    Returns:
+        The number of delete operations that succeeded (objects for S3, directories for ADLS).
+    """
+    start = time.time()
+    deleted = store.delete_prefix(prefix)
+    logger.info('Deleted %s under %s with %s in %.1f s', deleted, prefix, type(store).__name__, time.time() - start)
+    return deleted
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
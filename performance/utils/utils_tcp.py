@@ -0,0 +1,189 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for load testing the TCP Server origin with many concurrent connections
+
+import asyncio
+import logging
+import re
+import time
+from collections import namedtuple
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DELIMITED_RECORDS = 'DELIMITED_RECORDS'
+CHARACTER_BASED_LENGTH_FIELD = 'CHARACTER_BASED_LENGTH_FIELD'
+SYSLOG = 'SYSLOG'
+
+# Field of the records produced by the origin that holds what was sent, per TCP mode.
+RECORD_FIELDS = {DELIMITED_RECORDS: '/text', CHARACTER_BASED_LENGTH_FIELD: '/text', SYSLOG: '/message'}
+
+# Every record carries its sequence number between markers, so that acks echoing the record can be matched to it.
+SEQUENCE_PATTERN = re.compile(rb'#(\d+)#')
+# Acks are separated by newlines (see record_ack_message and BATCH_ACK_MESSAGE).
+ACK_SEPARATOR = b'\n'
+BATCH_ACK_MESSAGE = 'batch\n'
+# Time between two rounds of sends of a rate-limited connection.
+SEND_INTERVAL_SEC = 0.01
+DEFAULT_ACK_TIMEOUT_SEC = 60
+
+LoadResult = namedtuple('LoadResult', ['connections', 'records_sent', 'records_acked', 'seconds',
+                                       'records_per_second', 'ack_latency_p50', 'ack_latency_p99',
+                                       'ack_latency_max'])
+
+
+def record_ack_message(tcp_mode=DELIMITED_RECORDS):
+    """Record processed ack message to configure on the TCP Server origin for per-record latencies."""
+    return "${record:value('" + RECORD_FIELDS[tcp_mode] + "')}\n"
+
+
+def frame(tcp_mode, text):
+    """Frame one record for the given TCP mode."""
+    if tcp_mode == DELIMITED_RECORDS:
+        return f'{text}\n'.encode()
+    if tcp_mode == CHARACTER_BASED_LENGTH_FIELD:
+        return f'{len(text)} {text}'.encode()
+    if tcp_mode == SYSLOG:
+        # RFC 5424 message with non-transparent (newline) framing.
+        return f'<34>1 {datetime.utcnow().isoformat()}Z stf-load sdc - - - {text}\n'.encode()
+    raise ValueError(f'Unsupported TCP mode: {tcp_mode}')
+
+
+def run_tcp_load(host, port, connections, records_per_connection, records_per_second=None,
+                 tcp_mode=DELIMITED_RECORDS, ack='record', record_size=64, ssl_context=None,
+                 ack_timeout_sec=DEFAULT_ACK_TIMEOUT_SEC):
+    """Send records to a TCP Server origin over many persistent connections and measure ack latency.
+
+    Each connection streams ``records_per_connection`` records, paced to its share of ``records_per_second`` (or as
+    fast as the socket takes them), while reading acks concurrently. With ``ack='record'`` the origin must echo every
+    record (see :py:func:`record_ack_message`) and latency is measured per record. With ``ack='batch'`` the origin must
+    send :py:const:`BATCH_ACK_MESSAGE` after every batch, which acknowledges all records sent on that connection so far;
+    latencies are then upper bounds. With ``ack=None`` nothing is awaited.
+
+    Args:
+        host (:obj:`str`): Host of the origin.
+        port (:obj:`int`): Port of the origin.
+        connections (:obj:`int`): Number of concurrent connections.
+        records_per_connection (:obj:`int`): Number of records each connection sends.
+        records_per_second (:obj:`int`, optional): Target rate over all connections. Default: unlimited
+        tcp_mode (:obj:`str`, optional): Framing, one of :py:const:`DELIMITED_RECORDS`,
+            :py:const:`CHARACTER_BASED_LENGTH_FIELD` or :py:const:`SYSLOG`. Default: :py:const:`DELIMITED_RECORDS`
+        ack (:obj:`str`, optional): ``'record'``, ``'batch'`` or ``None``. Default: ``'record'``
+        record_size (:obj:`int`, optional): Approximate size of a record in characters. Default: ``64``
+        ssl_context (:py:class:`ssl.SSLContext`, optional): Context for TLS connections. Default: plain TCP
+        ack_timeout_sec (:obj:`float`, optional): Time to wait for outstanding acks after the last record was sent.
+
+    Returns:
+        A :py:class:`LoadResult`; latencies are in seconds and ``None`` without acks.
+    """
+    return asyncio.run(_run_load(host, port, connections, records_per_connection, records_per_second, tcp_mode, ack,
+                                 record_size, ssl_context, ack_timeout_sec))
+
+
+async def _run_load(host, port, connections, records_per_connection, records_per_second, tcp_mode, ack, record_size,
+                    ssl_context, ack_timeout_sec):
+    connection_rate = records_per_second / connections if records_per_second else None
+    start = time.perf_counter()
+    results = await asyncio.gather(*[_run_connection(host, port, index, records_per_connection, connection_rate,
+                                                     tcp_mode, ack, record_size, ssl_context, ack_timeout_sec)
+                                     for index in range(connections)])
+    seconds = time.perf_counter() - start
+
+    records_sent = sum(sent for sent, _ in results)
+    latencies = sorted(latency for _, connection_latencies in results for latency in connection_latencies)
+    result = LoadResult(connections=connections,
+                        records_sent=records_sent,
+                        records_acked=len(latencies),
+                        seconds=seconds,
+                        records_per_second=records_sent / seconds,
+                        ack_latency_p50=percentile(latencies, 50),
+                        ack_latency_p99=percentile(latencies, 99),
+                        ack_latency_max=latencies[-1] if latencies else None)
+    logger.info('%s connections sent %s records (%s acked) in %.2f s: %.0f records/s, ack latency p50=%s p99=%s',
+                connections, records_sent, result.records_acked, seconds, result.records_per_second,
+                result.ack_latency_p50, result.ack_latency_p99)
+    return result
+
+
+async def _run_connection(host, port, index, number_of_records, records_per_second, tcp_mode, ack, record_size,
+                          ssl_context, ack_timeout_sec):
+    reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+    sent_at = {}
+    latencies = []
+    all_acked = asyncio.Event()
+    done_sending = False
+
+    async def read_acks():
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            now = time.perf_counter()
+            if ack == 'batch':
+                latencies.extend(now - timestamp for timestamp in sent_at.values())
+                sent_at.clear()
+            else:
+                match = SEQUENCE_PATTERN.search(line)
+                if match and int(match.group(1)) in sent_at:
+                    latencies.append(now - sent_at.pop(int(match.group(1))))
+            if done_sending and not sent_at:
+                all_acked.set()
+                return
+
+    ack_reader = asyncio.ensure_future(read_acks()) if ack else None
+    padding = 'x' * max(0, record_size - 24)
+    try:
+        start = time.perf_counter()
+        sequence = 0
+        while sequence < number_of_records:
+            if records_per_second:
+                # Send whatever is due according to the target rate, then yield until the next round.
+                due = min(number_of_records, int((time.perf_counter() - start) * records_per_second) + 1)
+            else:
+                due = min(number_of_records, sequence + 1000)
+            frames = []
+            now = time.perf_counter()
+            for sequence in range(sequence, due):
+                frames.append(frame(tcp_mode, f'#{index * number_of_records + sequence}#{padding}'))
+                if ack:
+                    sent_at[index * number_of_records + sequence] = now
+            sequence = due
+            writer.write(b''.join(frames))
+            await writer.drain()
+            if records_per_second and sequence < number_of_records:
+                await asyncio.sleep(SEND_INTERVAL_SEC)
+
+        done_sending = True
+        if ack_reader:
+            if not sent_at:
+                all_acked.set()
+            try:
+                await asyncio.wait_for(all_acked.wait(), timeout=ack_timeout_sec)
+            except asyncio.TimeoutError:
+                logger.warning('Connection %s: %s records were not acknowledged within %s seconds',
+                               index, len(sent_at), ack_timeout_sec)
+        return number_of_records, latencies
+    finally:
+        if ack_reader:
+            ack_reader.cancel()
+        writer.close()
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of already sorted values, or ``None`` if there are none."""
+    if not sorted_values:
+        return None
+    rank = max(0, int(round(percent / 100 * len(sorted_values))) - 1)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
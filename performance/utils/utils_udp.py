@@ -0,0 +1,221 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for replaying syslog, NetFlow and collectd packets to UDP origins at a fixed rate
+
+import logging
+import socket
+import struct
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+SYSLOG = 'SYSLOG'
+NETFLOW_V5 = 'NETFLOW_V5'
+NETFLOW_V9 = 'NETFLOW_V9'
+COLLECTD = 'COLLECTD'
+
+# Data format of the UDP origins for each packet format.
+DATA_FORMATS = {SYSLOG: 'SYSLOG', NETFLOW_V5: 'NETFLOW', NETFLOW_V9: 'NETFLOW', COLLECTD: 'COLLECTD'}
+
+# Time between two rounds of sends of a sender that is ahead of its schedule.
+SEND_INTERVAL_SEC = 0.001
+DEFAULT_SENDERS = 4
+
+NETFLOW_V5_RECORD = struct.Struct('!IIIHHIIIIHHBBBBHHBBH')
+NETFLOW_V9_TEMPLATE_ID = 256
+# (field type, length) of the NetFlow v9 template: IPV4_SRC_ADDR, IPV4_DST_ADDR, L4_SRC_PORT, L4_DST_PORT, PROTOCOL,
+# IN_PKTS, IN_BYTES, FIRST_SWITCHED, LAST_SWITCHED.
+NETFLOW_V9_FIELDS = ((8, 4), (12, 4), (7, 2), (11, 2), (4, 1), (2, 4), (1, 4), (22, 4), (21, 4))
+NETFLOW_V9_RECORD = struct.Struct('!IIHHBIIII')
+
+# collectd binary protocol part types.
+COLLECTD_HOST = 0x0000
+COLLECTD_PLUGIN = 0x0002
+COLLECTD_PLUGIN_INSTANCE = 0x0003
+COLLECTD_TYPE = 0x0004
+COLLECTD_TYPE_INSTANCE = 0x0005
+COLLECTD_VALUES = 0x0006
+COLLECTD_TIME_HIRES = 0x0008
+COLLECTD_INTERVAL_HIRES = 0x0009
+COLLECTD_DERIVE = 2
+
+# A pre-encoded packet and the number of records the origin produces for it.
+UdpPacket = namedtuple('UdpPacket', ['data', 'records'])
+UdpBlastResult = namedtuple('UdpBlastResult', ['packets_sent', 'records_sent', 'seconds', 'packets_per_second'])
+
+
+def syslog_packets(count=100, message_size=128):
+    """RFC 5424 syslog messages, one record each."""
+    timestamp = datetime.utcnow().isoformat()
+    return [UdpPacket(f'<34>1 {timestamp}Z stf-load sdc {index} - - {"x" * message_size}'.encode(), 1)
+            for index in range(count)]
+
+
+def netflow_v5_packets(count=100, flows_per_packet=30):
+    """NetFlow v5 export packets of ``flows_per_packet`` flows (at most 30), one record per flow."""
+    uptime = 3_600_000
+    unix_secs = int(time.time())
+    packets = []
+    for index in range(count):
+        header = struct.pack('!HHIIIIBBH', 5, flows_per_packet, uptime, unix_secs, 0,
+                             index * flows_per_packet, 0, 0, 0)
+        flows = b''.join(NETFLOW_V5_RECORD.pack(0x0A000000 + flow, 0x0A010000 + flow, 0, 1, 2, 10, 1500,
+                                                uptime - 1000, uptime, 1024 + flow, 443, 0, 0x18, 6, 0, 0, 0, 24, 24,
+                                                0)
+                         for flow in range(flows_per_packet))
+        packets.append(UdpPacket(header + flows, flows_per_packet))
+    return packets
+
+
+def netflow_v9_packets(count=100, flows_per_packet=30):
+    """NetFlow v9 export packets carrying their template followed by ``flows_per_packet`` flows.
+
+    The template is repeated in every packet so that no packet depends on another one having been received; the origin
+    produces one record per flow, none for the template.
+    """
+    uptime = 3_600_000
+    unix_secs = int(time.time())
+    template = struct.pack('!HH', NETFLOW_V9_TEMPLATE_ID, len(NETFLOW_V9_FIELDS)) + b''.join(
+        struct.pack('!HH', field_type, length) for field_type, length in NETFLOW_V9_FIELDS)
+    template_flowset = struct.pack('!HH', 0, 4 + len(template)) + template
+
+    packets = []
+    for index in range(count):
+        flows = b''.join(NETFLOW_V9_RECORD.pack(0x0A000000 + flow, 0x0A010000 + flow, 1024 + flow, 443, 6, 10, 1500,
+                                                uptime - 1000, uptime)
+                         for flow in range(flows_per_packet))
+        flows += b'\x00' * (-(4 + len(flows)) % 4)
+        data_flowset = struct.pack('!HH', NETFLOW_V9_TEMPLATE_ID, 4 + len(flows)) + flows
+        header = struct.pack('!HHIIII', 9, 1 + flows_per_packet, uptime, unix_secs, index, 0)
+        packets.append(UdpPacket(header + template_flowset + data_flowset, flows_per_packet))
+    return packets
+
+
+def collectd_packets(count=100, values_per_packet=20):
+    """collectd binary protocol packets of ``values_per_packet`` CPU values, one record per value."""
+    now = int(time.time()) << 30
+    packets = []
+    for index in range(count):
+        parts = [_collectd_string(COLLECTD_HOST, f'stf-load-{index}'),
+                 _collectd_number(COLLECTD_TIME_HIRES, now),
+                 _collectd_number(COLLECTD_INTERVAL_HIRES, 10 << 30),
+                 _collectd_string(COLLECTD_PLUGIN, 'cpu'),
+                 _collectd_string(COLLECTD_TYPE, 'cpu'),
+                 _collectd_string(COLLECTD_TYPE_INSTANCE, 'user')]
+        for value in range(values_per_packet):
+            parts.append(_collectd_string(COLLECTD_PLUGIN_INSTANCE, str(value)))
+            parts.append(struct.pack('!HHHBq', COLLECTD_VALUES, 15, 1, COLLECTD_DERIVE, index * value))
+        packets.append(UdpPacket(b''.join(parts), values_per_packet))
+    return packets
+
+
+PACKET_FACTORIES = {SYSLOG: syslog_packets, NETFLOW_V5: netflow_v5_packets, NETFLOW_V9: netflow_v9_packets,
+                    COLLECTD: collectd_packets}
+
+
+def blast_udp(host, port, packets, packets_per_second, duration_sec, senders=DEFAULT_SENDERS):
+    """Replay pre-encoded packets at a fixed rate from several sender sockets.
+
+    Every sender thread owns a socket and sends its share of ``packets_per_second``, cycling through ``packets``.
+    A sender that falls behind its schedule catches up with back-to-back sends, so the achieved rate tells whether the
+    senders themselves were the bottleneck.
+
+    Args:
+        host (:obj:`str`): Host to send to.
+        port (:obj:`int`): UDP port to send to.
+        packets (:obj:`list` of :py:class:`UdpPacket`): Packets to replay, e.g. from :py:const:`PACKET_FACTORIES`.
+        packets_per_second (:obj:`float`): Target rate over all senders.
+        duration_sec (:obj:`float`): How long to send for.
+        senders (:obj:`int`, optional): Number of sender sockets. Default: :py:const:`DEFAULT_SENDERS`
+
+    Returns:
+        A :py:class:`UdpBlastResult`; ``records_sent`` is the number of records the origin should produce.
+    """
+    address = (socket.gethostbyname(host), port)
+    counts = [(0, 0)] * senders
+    start = time.perf_counter()
+
+    def send(index):
+        rate = packets_per_second / senders
+        attempts = sent = records = 0
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+            while True:
+                elapsed = time.perf_counter() - start
+                if elapsed >= duration_sec:
+                    break
+                due = int(elapsed * rate) + 1
+                while attempts < due:
+                    packet = packets[(index + attempts * senders) % len(packets)]
+                    attempts += 1
+                    try:
+                        sender.sendto(packet.data, address)
+                    except OSError as e:
+                        # E.g. ENOBUFS when the local send buffer is full; such packets never left this host.
+                        logger.debug('Could not send packet: %s', e)
+                        continue
+                    sent += 1
+                    records += packet.records
+                time.sleep(SEND_INTERVAL_SEC)
+        counts[index] = (sent, records)
+
+    threads = [threading.Thread(target=send, args=(index,), daemon=True) for index in range(senders)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    packets_sent = sum(sent for sent, _ in counts)
+    result = UdpBlastResult(packets_sent=packets_sent,
+                            records_sent=sum(records for _, records in counts),
+                            seconds=seconds,
+                            packets_per_second=packets_sent / seconds)
+    logger.info('%s senders sent %s packets (%s records) in %.2f s: %.0f packets/s (target %s)', senders,
+                packets_sent, result.records_sent, seconds, result.packets_per_second, packets_per_second)
+    return result
+
+
+def max_lossless_packets_per_second(loss_rates, loss_tolerance):
+    """Highest rate of an ascending sweep below its first lossy rate.
+
+    Rates above the first one losing packets don't count even if they happened not to lose any, as the origin
+    already fell behind; a rate that couldn't be measured (``None``) ends the sweep too.
+
+    Args:
+        loss_rates (:obj:`dict`): Loss rate by packet rate.
+        loss_tolerance (:obj:`float`): Highest loss rate still counted as lossless.
+
+    Returns:
+        The rate, or ``None`` if even the lowest one lost packets.
+    """
+    lossless = None
+    for rate in sorted(loss_rates):
+        loss_rate = loss_rates[rate]
+        if loss_rate is None or loss_rate > loss_tolerance:
+            break
+        lossless = rate
+    return lossless
+
+
+def _collectd_string(part_type, value):
+    encoded = value.encode() + b'\x00'
+    return struct.pack('!HH', part_type, 4 + len(encoded)) + encoded
+
+
+def _collectd_number(part_type, value):
+    return struct.pack('!HHQ', part_type, 12, value)
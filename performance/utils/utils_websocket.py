@@ -0,0 +1,381 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for load testing WebSocket stages: a multi-session client and a local sink
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import socket
+import ssl
+import struct
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple
+from urllib.parse import urlsplit
+
+from performance.utils.utils_histogram import LatencyHistogram
+from performance.utils.utils_http import APPLICATION_ID_HEADER, insecure_ssl_context
+
+logger = logging.getLogger(__name__)
+
+# RFC 6455 constants.
+HANDSHAKE_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+# Time between two rounds of sends of a rate-limited session.
+SEND_INTERVAL_SEC = 0.01
+DEFAULT_RESPONSE_TIMEOUT_SEC = 60
+
+WebSocketLoadResult = namedtuple('WebSocketLoadResult', ['sessions', 'messages_sent', 'seconds',
+                                                         'messages_per_second', 'histogram'])
+
+
+def encode_frame(payload, opcode=OPCODE_TEXT, mask=True):
+    """Encode a single, final frame; clients must mask their frames, servers must not."""
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header.extend(struct.pack('!H', length))
+    else:
+        header.append(mask_bit | 127)
+        header.extend(struct.pack('!Q', length))
+    if not mask:
+        return bytes(header) + payload
+    key = os.urandom(4)
+    return bytes(header) + key + _apply_mask(payload, key)
+
+
+async def read_frame(reader):
+    """Read one frame and return whether it is the final frame of its message, its opcode and (unmasked) payload."""
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack('!H', await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack('!Q', await reader.readexactly(8))
+    key = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    return bool(first & 0x80), opcode, _apply_mask(payload, key) if key else payload
+
+
+async def read_message(reader, writer=None, mask=True):
+    """Read frames until a whole data message arrived, reassembling fragmented messages and answering pings on the
+    way, which may come between fragments.
+
+    Returns:
+        The message payload, or ``None`` once the peer closed the connection.
+    """
+    fragments = None
+    while True:
+        fin, opcode, payload = await read_frame(reader)
+        if opcode == OPCODE_PING and writer is not None:
+            writer.write(encode_frame(payload, OPCODE_PONG, mask=mask))
+        elif opcode == OPCODE_CLOSE:
+            return None
+        elif opcode in (OPCODE_TEXT, OPCODE_BINARY, OPCODE_CONTINUATION):
+            if (opcode == OPCODE_CONTINUATION) != (fragments is not None):
+                raise ValueError(f'Unexpected WebSocket frame with opcode {opcode:#x}')
+            if fin and fragments is None:
+                return payload
+            fragments = (fragments or []) + [payload]
+            if fin:
+                return b''.join(fragments)
+
+
+async def connect(url, headers=None, ssl_context=None):
+    """Open a WebSocket session and return its ``(reader, writer)`` streams."""
+    parts = urlsplit(url)
+    secure = parts.scheme == 'wss'
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or (443 if secure else 80),
+                                                   ssl=(ssl_context or insecure_ssl_context()) if secure else None)
+    key = base64.b64encode(os.urandom(16)).decode()
+    request_headers = {'Host': parts.netloc,
+                       'Upgrade': 'websocket',
+                       'Connection': 'Upgrade',
+                       'Sec-WebSocket-Key': key,
+                       'Sec-WebSocket-Version': '13'}
+    request_headers.update(headers or {})
+    writer.write((f'GET {parts.path or "/"}{"?" + parts.query if parts.query else ""} HTTP/1.1\r\n'
+                  + ''.join(f'{name}: {value}\r\n' for name, value in request_headers.items())
+                  + '\r\n').encode())
+
+    status_line = await reader.readline()
+    response_headers = await _read_headers(reader)
+    if b' 101 ' not in status_line:
+        writer.close()
+        raise ConnectionError(f'WebSocket handshake with {url} failed: {status_line.decode().strip()}')
+    if response_headers.get('sec-websocket-accept') != _accept_key(key):
+        writer.close()
+        raise ConnectionError(f'WebSocket handshake with {url} returned a wrong Sec-WebSocket-Accept')
+    return reader, writer
+
+
+def json_message(sequence, size):
+    """JSON message of roughly ``size`` bytes carrying a sequence number."""
+    return json.dumps({'sequence': sequence, 'payload': 'x' * max(0, size - 40)}).encode()
+
+
+def run_websocket_load(url, sessions, messages_per_session, messages_per_second=None, message_size=256,
+                       application_id=None, expect_responses=False, ssl_context=None,
+                       response_timeout_sec=DEFAULT_RESPONSE_TIMEOUT_SEC):
+    """Push JSON messages over many concurrent WebSocket sessions.
+
+    Each session sends ``messages_per_session`` messages, paced to its share of ``messages_per_second`` (or as fast as
+    the connection takes them). With ``expect_responses``, the server is expected to answer every message, in order,
+    on the same session (e.g. a WebSocket Server pipeline ending in Send Response to Origin) and the time until the
+    answer is recorded as the message's latency.
+
+    Args:
+        url (:obj:`str`): ``ws`` or ``wss`` URL.
+        sessions (:obj:`int`): Number of concurrent sessions.
+        messages_per_session (:obj:`int`): Number of messages each session sends.
+        messages_per_second (:obj:`float`, optional): Target rate over all sessions. Default: unlimited
+        message_size (:obj:`int`, optional): Approximate size of a message in bytes. Default: ``256``
+        application_id (:obj:`str`, optional): Value of the ``X-SDC-APPLICATION-ID`` header.
+        expect_responses (:obj:`bool`, optional): Wait for and time a response to every message. Default: ``False``
+        ssl_context (:py:class:`ssl.SSLContext`, optional): Context for ``wss`` URLs. Default: trust any certificate
+        response_timeout_sec (:obj:`float`, optional): Time to wait for outstanding responses after the last message
+            was sent.
+
+    Returns:
+        A :py:class:`WebSocketLoadResult`; ``histogram`` is ``None`` without responses.
+    """
+    headers = {APPLICATION_ID_HEADER: application_id} if application_id is not None else None
+    return asyncio.run(_run_load(url, sessions, messages_per_session, messages_per_second, message_size, headers,
+                                 expect_responses, ssl_context, response_timeout_sec))
+
+
+async def _run_load(url, sessions, messages_per_session, messages_per_second, message_size, headers,
+                    expect_responses, ssl_context, response_timeout_sec):
+    histogram = LatencyHistogram() if expect_responses else None
+    session_rate = messages_per_second / sessions if messages_per_second else None
+    start = time.perf_counter()
+    sent = await asyncio.gather(*[_run_session(url, messages_per_session, session_rate, message_size, headers,
+                                               histogram, ssl_context, response_timeout_sec)
+                                  for _ in range(sessions)])
+    seconds = time.perf_counter() - start
+    result = WebSocketLoadResult(sessions=sessions,
+                                 messages_sent=sum(sent),
+                                 seconds=seconds,
+                                 messages_per_second=sum(sent) / seconds,
+                                 histogram=histogram)
+    logger.info('%s sessions sent %s messages in %.2f s: %.0f messages/s%s', sessions, result.messages_sent, seconds,
+                result.messages_per_second,
+                f', latency p50={histogram.percentile(50)} p99={histogram.percentile(99)}' if histogram else '')
+    return result
+
+
+async def _run_session(url, number_of_messages, messages_per_second, message_size, headers, histogram, ssl_context,
+                       response_timeout_sec):
+    reader, writer = await connect(url, headers=headers, ssl_context=ssl_context)
+    in_flight = deque()
+    all_answered = asyncio.Event()
+    sending = [True]
+
+    async def read_responses():
+        while True:
+            message = await read_message(reader, writer)
+            if message is None:
+                return
+            if in_flight:
+                histogram.record(time.perf_counter() - in_flight.popleft())
+            if not sending[0] and not in_flight:
+                all_answered.set()
+                return
+
+    response_reader = asyncio.ensure_future(read_responses()) if histogram else None
+    try:
+        start = time.perf_counter()
+        sequence = 0
+        while sequence < number_of_messages:
+            if messages_per_second:
+                due = min(number_of_messages, int((time.perf_counter() - start) * messages_per_second) + 1)
+            else:
+                due = min(number_of_messages, sequence + 100)
+            now = time.perf_counter()
+            writer.write(b''.join(encode_frame(json_message(index, message_size)) for index in range(sequence, due)))
+            if histogram:
+                in_flight.extend([now] * (due - sequence))
+            sequence = max(sequence, due)
+            await writer.drain()
+            if messages_per_second and sequence < number_of_messages:
+                await asyncio.sleep(SEND_INTERVAL_SEC)
+
+        sending[0] = False
+        if response_reader:
+            if not in_flight:
+                all_answered.set()
+            try:
+                await asyncio.wait_for(all_answered.wait(), timeout=response_timeout_sec)
+            except asyncio.TimeoutError:
+                logger.warning('%s messages were not answered within %s seconds', len(in_flight),
+                               response_timeout_sec)
+        writer.write(encode_frame(b'', OPCODE_CLOSE))
+        return number_of_messages
+    finally:
+        if response_reader:
+            response_reader.cancel()
+        writer.close()
+
+
+class WebSocketSink:
+    """Local WebSocket server counting the messages it receives, to benchmark the WebSocket Client destination.
+
+    The server runs its own event loop in a background thread, listening on all interfaces; :py:attr:`url` uses the
+    address through which this host reaches ``peer_host`` (i.e. SDC), so that it works when SDC runs in a container or
+    on another machine.
+
+    Args:
+        peer_host (:obj:`str`): Host that will connect to the sink.
+        port (:obj:`int`, optional): Port to listen on. Default: any free port
+        ssl_context (:py:class:`ssl.SSLContext`, optional): Server-side context for ``wss``, see
+            :py:func:`server_ssl_context`. Default: plain ``ws``
+    """
+    def __init__(self, peer_host, port=0, ssl_context=None):
+        self.peer_host = peer_host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.messages = 0
+        self.bytes = 0
+        self.first_message_time = None
+        self.last_message_time = None
+        self._loop = asyncio.new_event_loop()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'{"wss" if self.ssl_context else "ws"}://{_local_address(self.peer_host)}:{self.port}/'
+
+    @property
+    def messages_per_second(self):
+        """Receive rate between the first and the last message, or ``None``."""
+        if not self.messages or self.last_message_time == self.first_message_time:
+            return None
+        return self.messages / (self.last_message_time - self.first_message_time)
+
+    def reset(self):
+        self.messages = self.bytes = 0
+        self.first_message_time = self.last_message_time = None
+
+    def start(self):
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, '0.0.0.0', self.port,
+                                                                              ssl=self.ssl_context))
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        logger.info('WebSocket sink listening on %s', self.url)
+
+    def stop(self):
+        def shutdown():
+            self._server.close()
+            self._loop.stop()
+        self._loop.call_soon_threadsafe(shutdown)
+        self._thread.join()
+
+    async def _handle(self, reader, writer):
+        try:
+            await reader.readline()
+            headers = await _read_headers(reader)
+            writer.write(('HTTP/1.1 101 Switching Protocols\r\n'
+                          'Upgrade: websocket\r\n'
+                          'Connection: Upgrade\r\n'
+                          f'Sec-WebSocket-Accept: {_accept_key(headers["sec-websocket-key"])}\r\n'
+                          '\r\n').encode())
+            while True:
+                message = await read_message(reader, writer, mask=False)
+                if message is None:
+                    writer.write(encode_frame(b'', OPCODE_CLOSE, mask=False))
+                    return
+                now = time.perf_counter()
+                self.messages += 1
+                self.bytes += len(message)
+                self.first_message_time = self.first_message_time or now
+                self.last_message_time = now
+        except (asyncio.IncompleteReadError, ConnectionError, KeyError) as e:
+            logger.debug('WebSocket sink session ended: %s', e)
+        finally:
+            writer.close()
+
+
+def server_ssl_context(pkcs12_path, password):
+    """Server-side TLS context using the key and certificate of a PKCS12 keystore.
+
+    Needs the ``cryptography`` package to read the keystore.
+    """
+    from cryptography.hazmat.primitives.serialization import (Encoding, NoEncryption, PrivateFormat,
+                                                              pkcs12)
+
+    with open(pkcs12_path, 'rb') as f:
+        key, certificate, _ = pkcs12.load_key_and_certificates(f.read(), password.encode())
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    with tempfile.TemporaryDirectory() as directory:
+        certificate_path = os.path.join(directory, 'certificate.pem')
+        key_path = os.path.join(directory, 'key.pem')
+        with open(certificate_path, 'wb') as f:
+            f.write(certificate.public_bytes(Encoding.PEM))
+        with open(key_path, 'wb') as f:
+            f.write(key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()))
+        context.load_cert_chain(certificate_path, key_path)
+    return context
+
+
+def _apply_mask(payload, key):
+    # XOR with the key repeated over the whole payload, done on big integers for speed.
+    repeated = (key * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(len(payload), 'big')
+
+
+def _accept_key(key):
+    return base64.b64encode(hashlib.sha1((key + HANDSHAKE_GUID).encode()).digest()).decode()
+
+
+async def _read_headers(reader):
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+
+def _local_address(peer_host):
+    """Address of the local interface used to reach ``peer_host``."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.connect((peer_host, 9))
+        return probe.getsockname()[0]
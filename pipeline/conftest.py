@@ -13,25 +13,14 @@
 # limitations under the License.
 
 import logging
-from collections import namedtuple
 
 import pytest
 
+from pipeline.utils.utils_expressions import get_random_expression_pipeline_builder
+
 logger = logging.getLogger(__name__)
 
 
 @pytest.fixture(scope='function')
 def random_expression_pipeline_builder(sdc_builder):
-    pipeline_builder = sdc_builder.get_pipeline_builder()
-
-    dev_data_generator = pipeline_builder.add_stage('Dev Data Generator')
-    expression_evaluator = pipeline_builder.add_stage('Expression Evaluator')
-    trash = pipeline_builder.add_stage('Trash')
-
-    dev_data_generator >> expression_evaluator >> trash
-
-    yield namedtuple('PipelineBuilder', ['pipeline_builder',
-                                         'dev_data_generator',
-                                         'expression_evaluator'])(pipeline_builder,
-                                                                  dev_data_generator,
-                                                                  expression_evaluator)
+    yield get_random_expression_pipeline_builder(sdc_builder)
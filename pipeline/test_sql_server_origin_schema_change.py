@@ -21,37 +21,36 @@ import sqlalchemy
 from streamsets.testframework.markers import database, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from stage.utils.utils_jdbc import create_tables, drop_tables
+from stage.utils.utils_replication import assert_table_contains
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_SCHEMA_NAME = 'dbo'
 
 
-def setup_table(database, schema_name, table_name, sample_data):
-    """Create table and insert the sample data into the table"""
-    table = create_table(database, schema_name, table_name)
-    connection = database.engine.connect()
-
-    logger.info('Enabling CDC on %s.%s...', schema_name, table_name)
+def enable_cdc(connection, table):
+    logger.info('Enabling CDC on %s.%s...', table.schema, table.name)
     connection.execute(f'EXEC sys.sp_cdc_enable_table '
-                       f'@source_schema=N\'{schema_name}\', '
-                       f'@source_name=N\'{table_name}\','
+                       f'@source_schema=N\'{table.schema}\', '
+                       f'@source_name=N\'{table.name}\','
                        f'@role_name = NULL, '
-                       f'@capture_instance={schema_name}_{table_name}')
+                       f'@capture_instance={table.schema}_{table.name}')
 
-    logger.info('Adding %s rows into %s.%s...', len(sample_data), schema_name, table_name)
-    connection.execute(table.insert(), sample_data)
 
-    return table
+def table_definition(schema_name, table_name):
+    """Table with the following schema: id int primary key, name varchar(25), dt datetime"""
+    return sqlalchemy.Table(table_name, sqlalchemy.MetaData(),
+                            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True, autoincrement=False),
+                            sqlalchemy.Column('name', sqlalchemy.String(25)),
+                            sqlalchemy.Column('dt', sqlalchemy.String(25)),
+                            schema=schema_name)
 
 
 def create_table(database, schema_name, table_name):
     """Create table with the folloiwng scheam: id int primary key, name varchar(25), dt datetime"""
     logger.info('Creating table %s.%s...', schema_name, table_name)
-    table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(),
-                             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True, autoincrement=False),
-                             sqlalchemy.Column('name', sqlalchemy.String(25)),
-                             sqlalchemy.Column('dt', sqlalchemy.String(25)),
-                             schema=schema_name)
+    table = table_definition(schema_name, table_name)
 
     table.create(database.engine)
 
@@ -60,18 +59,7 @@ def create_table(database, schema_name, table_name):
 
 def assert_table_replicated(database, sample_data, schema_name, table_name):
     """Assert the sample data matches with the desitnation table data wrote using JDBC Producer"""
-    db_engine = database.engine
-
-    target_table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(),
-                                    autoload=True, autoload_with=db_engine,
-                                    schema=schema_name)
-    target_result = db_engine.execute(target_table.select().order_by(target_table.c['id']))
-    target_result_list = target_result.fetchall()
-    target_result.close()
-
-    input_values = [tuple(data.values()) for data in sample_data]
-
-    assert sorted(input_values) == sorted(target_result_list)
+    assert_table_contains(database, table_name, sample_data, key='id', schema=schema_name)
 
 
 def setup_sample_data(no_of_records):
@@ -154,18 +142,21 @@ def test_sql_server_cdc_with_cdc_schema_name(sdc_builder, sdc_executor, database
         no_of_records = 5
         rows_in_database = setup_sample_data(no_of_threads * no_of_records)
 
+        sample_data = {}
         for index in range(0, no_of_threads):
             table_name = get_random_string(string.ascii_lowercase, 20)
             # split the rows_in_database into no_of_records for each table
             # e.g. for no_of_records=5, the first table inserts rows_in_database[0:5]
             # and the secord table inserts rows_in_database[5:10]
-            table = setup_table(database, DEFAULT_SCHEMA_NAME, table_name,
-                                rows_in_database[(index*no_of_records): ((index+1)*no_of_records)])
-            tables.append(table)
+            sample_data[table_name] = rows_in_database[(index*no_of_records): ((index+1)*no_of_records)]
+            tables.append(table_definition(DEFAULT_SCHEMA_NAME, table_name))
+        create_tables(database, tables, sample_data, after_create=enable_cdc)
 
-        # wait for data captured by cdc jobs in sql server before starting the pipeline
-        ct_table_name = f'{DEFAULT_SCHEMA_NAME}_{table_name}_CT'
-        wait_for_data_in_table(ct_table_name, no_of_records, 'cdc', database)
+        # wait for data captured by cdc jobs in sql server before starting the pipeline; tables are created
+        # concurrently, so every capture instance has to be waited on
+        for table in tables:
+            ct_table_name = f'{DEFAULT_SCHEMA_NAME}_{table.name}_CT'
+            wait_for_data_in_table(ct_table_name, no_of_records, 'cdc', database)
 
         sdc_executor.start_pipeline(pipeline)
 
@@ -229,8 +220,4 @@ def test_sql_server_cdc_with_cdc_schema_name(sdc_builder, sdc_executor, database
 
         assert_table_replicated(database, rows_in_database, DEFAULT_SCHEMA_NAME, dest_table_name)
     finally:
-        logger.info('Dropping table %s in %s database...', table, database.type)
-        tables.append(dest_table)
-        for table in tables:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
+        drop_tables(database, tables + [dest_table])
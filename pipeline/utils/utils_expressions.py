@@ -0,0 +1,39 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for building pipelines that evaluate expressions on random records
+
+from collections import namedtuple
+
+RandomExpressionPipelineBuilder = namedtuple('PipelineBuilder', ['pipeline_builder',
+                                                                 'dev_data_generator',
+                                                                 'expression_evaluator'])
+
+
+def get_random_expression_pipeline_builder(sdc_builder):
+    """Return a pipeline builder with a dev_data_generator >> expression_evaluator >> trash pipeline, along with the
+    stages to configure.
+
+    Returns:
+        A :py:class:`RandomExpressionPipelineBuilder`.
+    """
+    pipeline_builder = sdc_builder.get_pipeline_builder()
+
+    dev_data_generator = pipeline_builder.add_stage('Dev Data Generator')
+    expression_evaluator = pipeline_builder.add_stage('Expression Evaluator')
+    trash = pipeline_builder.add_stage('Trash')
+
+    dev_data_generator >> expression_evaluator >> trash
+
+    return RandomExpressionPipelineBuilder(pipeline_builder, dev_data_generator, expression_evaluator)
@@ -0,0 +1,78 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Run a set of tests as several shards in parallel, each in its own pytest process against its own Data Collector.
+
+Modules are split with ``--shard-count``/``--shard-index`` (see the root conftest.py), which balance shards by the
+durations recorded in ``--duration-history``; the first run without history splits them by test count. Example::
+
+    python -m session.run_shards --shards 4 -- stage/test_jdbc_stages.py pipeline/test_drift_synchonization.py
+
+Each shard logs to its own file in the output directory; the exit code is the highest of all shards.
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def run_shards(shards, pytest_args, output_directory):
+    """Start one pytest process per shard and wait for all of them.
+
+    Returns:
+        A :obj:`list` of the exit codes of the shards.
+    """
+    processes = []
+    for shard_index in range(shards):
+        log_path = os.path.join(output_directory, f'shard-{shard_index}.log')
+        command = [sys.executable, '-m', 'pytest', *pytest_args,
+                   '--shard-count', str(shards), '--shard-index', str(shard_index)]
+        logger.info('Starting shard %s (log in %s): %s', shard_index, log_path, ' '.join(command))
+        log = open(log_path, 'w')
+        processes.append((subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT), log, time.time()))
+
+    exit_codes = []
+    for shard_index, (process, log, start) in enumerate(processes):
+        exit_codes.append(process.wait())
+        log.close()
+        logger.info('Shard %s exited with %s after %.0f s', shard_index, exit_codes[-1], time.time() - start)
+    return exit_codes
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--shards', type=int, required=True, help='Number of shards run in parallel')
+    parser.add_argument('--output-directory', help='Directory for the logs of the shards')
+    parser.add_argument('pytest_args', nargs=argparse.REMAINDER, help='Arguments for pytest, after --')
+    args = parser.parse_args(argv)
+    pytest_args = args.pytest_args[1:] if args.pytest_args[:1] == ['--'] else args.pytest_args
+
+    output_directory = args.output_directory or tempfile.mkdtemp(prefix='sdc_test_shards_')
+    os.makedirs(output_directory, exist_ok=True)
+    exit_codes = run_shards(args.shards, pytest_args, output_directory)
+    print('\n'.join(f'shard {index}: exit code {exit_code}, log {os.path.join(output_directory, f"shard-{index}.log")}'
+                    for index, exit_code in enumerate(exit_codes)))
+    return max(exit_codes)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
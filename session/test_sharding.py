@@ -0,0 +1,91 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the shard partitioning, which need no Data Collector."""
+
+from collections import namedtuple
+
+import pytest
+
+from session.utils.utils_sharding import DEFAULT_TEST_DURATION_SEC, DurationHistory, partition, shard_units, ShardUnit
+
+Item = namedtuple('Item', ['nodeid'])
+
+
+def history(tmp_path, durations):
+    history = DurationHistory(str(tmp_path / 'durations.json'))
+    for nodeid, seconds in durations.items():
+        history.record(nodeid, seconds)
+    history.save()
+    return history
+
+
+def test_shard_units_group_items_by_module(tmp_path):
+    items = [Item('stage/test_a.py::test_1'), Item('stage/test_b.py::test_1'), Item('stage/test_a.py::test_2')]
+    units = shard_units(items, history(tmp_path, {'stage/test_a.py::test_1': 3, 'stage/test_a.py::test_2': 4,
+                                                  'stage/test_b.py::test_1': 10}))
+
+    assert [unit.name for unit in units] == ['stage/test_a.py', 'stage/test_b.py']
+    assert [[item.nodeid for item in unit.items] for unit in units] == [
+        ['stage/test_a.py::test_1', 'stage/test_a.py::test_2'], ['stage/test_b.py::test_1']]
+    assert [unit.duration for unit in units] == [7, 10]
+
+
+def test_shard_units_estimate_unknown_tests_at_median(tmp_path):
+    items = [Item('test_a.py::test_1'), Item('test_a.py::test_2'), Item('test_b.py::test_1'),
+             Item('test_c.py::test_1')]
+    units = shard_units(items, history(tmp_path, {'test_a.py::test_1': 2, 'test_a.py::test_2': 4,
+                                                  'test_b.py::test_1': 9}))
+
+    assert [unit.duration for unit in units] == [6, 9, 4]
+
+
+def test_shard_units_without_history(tmp_path):
+    items = [Item('test_a.py::test_1'), Item('test_a.py::test_2'), Item('test_b.py::test_1')]
+    units = shard_units(items, history(tmp_path, {}))
+
+    assert [unit.duration for unit in units] == [2 * DEFAULT_TEST_DURATION_SEC, DEFAULT_TEST_DURATION_SEC]
+
+
+@pytest.mark.parametrize('durations, count, expected', [
+    # The longest unit goes first, then each one goes to the least loaded shard.
+    ([('a', 5), ('b', 4), ('c', 3), ('d', 3), ('e', 2)], 2, [['a', 'd'], ['b', 'c', 'e']]),
+    ([('a', 1), ('b', 10), ('c', 1), ('d', 1)], 2, [['b'], ['a', 'c', 'd']]),
+    # More shards than units leaves shards empty.
+    ([('a', 1), ('b', 2)], 3, [['b'], ['a'], []]),
+    ([], 2, [[], []]),
+])
+def test_partition(durations, count, expected):
+    shards = partition([ShardUnit(name, [], duration) for name, duration in durations], count)
+
+    assert [[unit.name for unit in shard] for shard in shards] == expected
+
+
+def test_partition_keeps_every_unit_once_in_collection_order():
+    units = [ShardUnit(f'test_{index}.py', [], (index * 7) % 11 + 1) for index in range(20)]
+    shards = partition(units, 4)
+
+    assert sorted(unit.name for shard in shards for unit in shard) == sorted(unit.name for unit in units)
+    order = [unit.name for unit in units]
+    for shard in shards:
+        assert [unit.name for unit in shard] == [name for name in order if name in {unit.name for unit in shard}]
+    loads = [sum(unit.duration for unit in shard) for shard in shards]
+    assert max(loads) - min(loads) <= max(unit.duration for unit in units)
+
+
+def test_partition_does_not_depend_on_collection_order():
+    units = [ShardUnit(name, [], 1) for name in ('c', 'a', 'b', 'd')]
+
+    assert [set(unit.name for unit in shard) for shard in partition(units, 2)] == \
+        [set(unit.name for unit in shard) for shard in partition(list(reversed(units)), 2)]
@@ -0,0 +1,139 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for collecting stub and skipped tests without importing or parametrizing them
+
+import ast
+import logging
+import os
+
+import pytest
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'sdc/stub_index'
+STUB_REASON = 'Stub'
+
+
+def _decorator_skip_reason(decorator):
+    """Reason of a decorator that always skips the test (``@stub``, ``@pytest.mark.skip(...)``), or ``None``."""
+    call = decorator if isinstance(decorator, ast.Call) else None
+    target = call.func if call else decorator
+    name = target.attr if isinstance(target, ast.Attribute) else getattr(target, 'id', None)
+    if name == 'stub' and call is None:
+        return STUB_REASON
+    if name == 'skip' and isinstance(target, ast.Attribute) and isinstance(target.value, ast.Attribute) \
+            and target.value.attr == 'mark':
+        if call is None:
+            return 'unconditional skip'
+        arguments = call.args[:1] + [keyword.value for keyword in call.keywords if keyword.arg == 'reason']
+        if not arguments:
+            return 'unconditional skip'
+        if isinstance(arguments[0], ast.Constant) and isinstance(arguments[0].value, str):
+            return arguments[0].value
+    return None
+
+
+def index_source(source):
+    """Index the test functions of a module's source.
+
+    Returns:
+        A :obj:`dict` with ``tests``, mapping each module-level test function to ``[line number, skip reason]`` (the
+        reason is ``None`` for tests that may run), and ``lazy``, true if the module can be collected without being
+        imported: every test always skips, and nothing (test classes, ``pytestmark``, ``pytest_generate_tests``)
+        changes its tests at import time.
+    """
+    tree = ast.parse(source)
+    tests = {}
+    lazy = True
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if node.name == 'pytest_generate_tests':
+                lazy = False
+            elif node.name.startswith('test'):
+                reasons = [_decorator_skip_reason(decorator) for decorator in node.decorator_list]
+                tests[node.name] = [node.lineno, next((reason for reason in reasons if reason), None)]
+        elif isinstance(node, ast.ClassDef) and node.name.startswith('Test'):
+            lazy = False
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if any(getattr(target, 'id', None) == 'pytestmark' for target in targets):
+                lazy = False
+    lazy = lazy and bool(tests) and all(reason is not None for _, reason in tests.values())
+    return {'tests': tests, 'lazy': lazy}
+
+
+class StubIndex:
+    """Index of the stub and skipped tests of modules, cached in the pytest cache by path and modification time so
+    that unchanged modules aren't parsed again.
+
+    Args:
+        cache (:py:class:`_pytest.cacheprovider.Cache`): The pytest cache, or ``None`` not to persist the index.
+    """
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.entries = cache.get(CACHE_KEY, {}) if cache is not None else {}
+        self.changed = False
+
+    def get(self, path):
+        """Index of the module at ``path``, as returned by :py:func:`index_source`, or ``None`` if it can't be
+        parsed."""
+        path = str(path)
+        mtime = os.stat(path).st_mtime
+        entry = self.entries.get(path)
+        if entry is None or entry['mtime'] != mtime:
+            try:
+                with open(path, 'rb') as f:
+                    entry = dict(index_source(f.read()), mtime=mtime)
+            except SyntaxError:
+                # Let the regular collection report it.
+                return None
+            self.entries[path] = entry
+            self.changed = True
+        return entry
+
+    def save(self):
+        if self.cache is not None and self.changed:
+            self.cache.set(CACHE_KEY, self.entries)
+            self.changed = False
+
+
+class SkippedTest(pytest.Item):
+    """Placeholder for a test that always skips, standing for all of its parametrizations."""
+    def __init__(self, *, reason, lineno, **kwargs):
+        super().__init__(**kwargs)
+        self.reason = reason
+        self.lineno = lineno
+        self.add_marker(pytest.mark.skip(reason=reason))
+
+    def runtest(self):
+        pytest.skip(self.reason)
+
+    def reportinfo(self):
+        return self.path, self.lineno - 1, self.name
+
+
+class SkippedModule(pytest.File):
+    """Module whose tests all skip, collected from its index as :py:class:`SkippedTest` items without importing it.
+
+    Args:
+        index (:obj:`dict`): Index of the module, as returned by :py:func:`index_source`.
+    """
+    def __init__(self, *, index, **kwargs):
+        super().__init__(**kwargs)
+        self.index = index
+
+    def collect(self):
+        for name, (lineno, reason) in self.index['tests'].items():
+            yield SkippedTest.from_parent(self, name=name, reason=reason, lineno=lineno)
@@ -0,0 +1,198 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for grouping test modules by the Data Collector their hooks ask for
+
+import inspect
+import logging
+import os
+from collections import OrderedDict, namedtuple
+
+import pytest
+
+logger = logging.getLogger(__name__)
+
+BUILDER = 'builder'
+EXECUTOR = 'executor'
+# Hook fixture: Data Collectors it applies to.
+HOOK_FIXTURES = OrderedDict([('sdc_common_hook', (BUILDER, EXECUTOR)),
+                             ('sdc_builder_hook', (BUILDER,)),
+                             ('sdc_executor_hook', (EXECUTOR,))])
+# Fixture starting each Data Collector.
+SDC_FIXTURES = {BUILDER: 'sdc_builder', EXECUTOR: 'sdc_executor'}
+
+# Both fields are frozensets of (role, value) pairs; two modules with equal signatures configure identical
+# Data Collectors.
+HookSignature = namedtuple('HookSignature', ['stage_libs', 'settings'])
+NO_HOOKS = HookSignature(frozenset(), frozenset())
+
+
+class RecordingDataCollector:
+    """Stand-in for the data collector passed to hooks, recording what a hook asks of it instead of doing it.
+
+    Stage libraries go to :py:attr:`stage_libs`; anything else, i.e. attributes set (``SDC_JAVA_OPTS``), entries of
+    ``sdc_properties`` and methods called (``add_user``, ``set_user``), goes to :py:attr:`settings` as
+    ``(name, repr(value))`` pairs. Reading any other attribute raises :py:class:`AttributeError`, as hooks depending on
+    a running Data Collector can't be evaluated ahead of time.
+    """
+    def __init__(self):
+        object.__setattr__(self, 'stage_libs', set())
+        object.__setattr__(self, 'settings', set())
+        object.__setattr__(self, 'sdc_properties', _RecordingProperties(self.settings))
+
+    def add_stage_lib(self, *stage_libs):
+        self.stage_libs.update(stage_libs)
+
+    def __setattr__(self, name, value):
+        self.settings.add((name, repr(value)))
+
+    def __getattr__(self, name):
+        if name.startswith('_') or not name.islower():
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.settings.add((name, repr((args, sorted(kwargs.items())))))
+        return record
+
+
+class _RecordingProperties(dict):
+    def __init__(self, settings):
+        super().__init__()
+        self.settings = settings
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.settings.add((f'sdc_properties[{key!r}]', repr(value)))
+
+
+def module_id(item):
+    return item.nodeid.split('::')[0]
+
+
+class HookSignatures:
+    """Computes the :py:class:`HookSignature` of test modules by running their hooks against a
+    :py:class:`RecordingDataCollector`.
+
+    Only hooks defined under ``rootdir`` are run; the defaults of the test framework configure nothing. Hooks that
+    request other fixtures, or that fail or skip against the recorder, give their module a signature of its own.
+
+    Args:
+        rootdir (:obj:`str`): Root directory of the tests.
+    """
+    def __init__(self, rootdir):
+        self.rootdir = os.path.abspath(str(rootdir))
+        # id(fixture definition): (stage libs, settings), or None if the hook can't be evaluated.
+        self._recorded = {}
+
+    def item_signature(self, item):
+        """Signature of the Data Collectors an item uses, or ``None`` if it uses none."""
+        fixture_info = getattr(item, '_fixtureinfo', None)
+        if fixture_info is None:
+            return None
+        roles = [role for role, fixture in SDC_FIXTURES.items() if fixture in fixture_info.names_closure]
+        if not roles:
+            return None
+
+        stage_libs, settings = set(), set()
+        for fixture, hook_roles in HOOK_FIXTURES.items():
+            fixturedefs = fixture_info.name2fixturedefs.get(fixture)
+            if not fixturedefs:
+                continue
+            recorded = self._record(fixturedefs[-1])
+            if recorded is None:
+                return HookSignature(frozenset(), frozenset([('opaque', module_id(item))]))
+            for role in set(roles) & set(hook_roles):
+                stage_libs.update((role, stage_lib) for stage_lib in recorded[0])
+                settings.update((role, setting) for setting in recorded[1])
+        return HookSignature(frozenset(stage_libs), frozenset(settings))
+
+    def module_signatures(self, items):
+        """Ordered dict of module id to the combined signature of its items, or ``None`` if none of them uses a
+        Data Collector."""
+        signatures = OrderedDict()
+        for item in items:
+            signature, module_signature = self.item_signature(item), signatures.get(module_id(item))
+            if module_signature is not None and signature is not None:
+                signature = HookSignature(module_signature.stage_libs | signature.stage_libs,
+                                          module_signature.settings | signature.settings)
+            signatures[module_id(item)] = signature if signature is not None else module_signature
+        return signatures
+
+    def _record(self, fixturedef):
+        key = id(fixturedef)
+        if key not in self._recorded:
+            self._recorded[key] = self._run_hook(fixturedef)
+        return self._recorded[key]
+
+    def _run_hook(self, fixturedef):
+        try:
+            source = os.path.abspath(inspect.getsourcefile(fixturedef.func))
+        except TypeError:
+            return set(), set()
+        if not source.startswith(self.rootdir + os.sep):
+            return set(), set()
+        if fixturedef.argnames:
+            logger.debug('Hook %s in %s requests fixtures %s; not grouping its module', fixturedef.argname, source,
+                         fixturedef.argnames)
+            return None
+
+        data_collector = RecordingDataCollector()
+        try:
+            hook = fixturedef.func()
+            if inspect.isgenerator(hook):
+                hook = next(hook)
+            if hook is not None:
+                hook(data_collector)
+        except (Exception, pytest.skip.Exception) as e:
+            logger.debug('Hook %s in %s could not be recorded (%s); not grouping its module', fixturedef.argname,
+                         source, e)
+            return None
+        return frozenset(data_collector.stage_libs), frozenset(data_collector.settings)
+
+
+def group_modules(items, signatures):
+    """Reorder items so that modules with equal signatures run one after the other.
+
+    Groups come in the order their first module was collected, modules within a group and items within a module
+    keep their order. Modules not using a Data Collector stay with the group of the module collected before them.
+
+    Args:
+        items (:obj:`list`): Collected items.
+        signatures (:obj:`dict`): Module id to :py:class:`HookSignature`, as returned by
+            :py:meth:`HookSignatures.module_signatures`.
+
+    Returns:
+        A new :obj:`list` of items.
+    """
+    items_by_module = OrderedDict()
+    for item in items:
+        items_by_module.setdefault(module_id(item), []).append(item)
+
+    groups = OrderedDict()
+    signature = NO_HOOKS
+    for module, module_items in items_by_module.items():
+        if signatures.get(module) is not None:
+            signature = signatures[module]
+        groups.setdefault(signature, []).extend(module_items)
+    return [item for group in groups.values() for item in group]
+
+
+def describe(signature):
+    """Short, human readable form of a :py:class:`HookSignature`."""
+    if signature is None:
+        return 'no Data Collector'
+    parts = sorted(f'{role}:{stage_lib}' for role, stage_lib in signature.stage_libs)
+    parts += sorted(f'{role}:{"=".join(setting) if isinstance(setting, tuple) else setting}'
+                    for role, setting in signature.settings)
+    return ', '.join(parts) or 'default'
@@ -0,0 +1,197 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for sharing Data Collectors between consecutive modules with the same hook signature
+
+import inspect
+import logging
+from collections import namedtuple
+from concurrent.futures import Future
+
+from session.utils.utils_hooks import describe, HOOK_FIXTURES, SDC_FIXTURES
+
+logger = logging.getLogger(__name__)
+
+# A Data Collector started by a framework fixture, the arguments it was started with (kept so that their ids stay
+# unique) and the finalizers stopping it, in the order they were added.
+Instance = namedtuple('Instance', ['data_collector', 'arguments', 'finalizers'])
+# How to start a Data Collector of a role for another module: the framework fixture and the arguments it was last
+# called with, other than hooks. Only kept when those are all session-scoped.
+Template = namedtuple('Template', ['fixturedef', 'arguments'])
+
+
+class DataCollectorCache:
+    """Data Collectors started by the test framework's ``sdc_builder`` and ``sdc_executor`` fixtures, kept running
+    from one module to the next while the modules have the same hook signature.
+
+    The framework fixtures are module-scoped, so pytest stops their Data Collectors at the end of every module. The
+    root ``conftest.py`` overrides them to go through :py:meth:`get`, which calls the framework fixture function
+    itself and keeps what it returns until :py:meth:`release` or :py:meth:`close`.
+
+    A Data Collector is reused when the hook signature and every other argument of the framework fixture (e.g.
+    session-scoped fixtures) are the same. Modules whose hooks can't be recorded have a signature of their own, so
+    they get a Data Collector of their own. Pipelines left by a module stay on the Data Collector the next modules
+    of its group get.
+
+    Data Collectors can also be started ahead of their modules with :py:meth:`add`, e.g. by
+    :py:class:`session.utils.utils_warmup.WarmStandbyPool`.
+    """
+    def __init__(self):
+        # (role, signature, arguments key): Instance, or Future of an Instance being started in the background.
+        self._instances = {}
+        self._signature = None
+        # Role: Template
+        self.templates = {}
+
+    def get(self, request, role, signature):
+        """The Data Collector of ``role`` (:py:const:`session.utils.utils_hooks.BUILDER` or ``EXECUTOR``) for the
+        module of ``request``, the request of the overriding fixture.
+
+        Args:
+            signature (:py:class:`session.utils.utils_hooks.HookSignature`): Signature of the module, or ``None``
+                if it isn't known.
+        """
+        fixture = SDC_FIXTURES[role]
+        fixturedef = framework_fixturedef(request._pyfuncitem._fixtureinfo.name2fixturedefs.get(fixture, ()))
+        if fixturedef is None or signature is None:
+            return request.getfixturevalue(fixture)
+
+        arguments = {name: request.getfixturevalue(name) for name in fixturedef.argnames if name != 'request'}
+        key = (role, signature, arguments_key(arguments))
+        instance = self._instance(key)
+        if instance is not None:
+            logger.info('Reusing %s Data Collector (%s)', role, describe(signature))
+            return instance.data_collector
+
+        # Started for this signature with other arguments, so of no use to this module or the next ones.
+        self._release([other for other in self._instances if other[:2] == key[:2]])
+        finalizers = []
+        if 'request' in fixturedef.argnames:
+            arguments['request'] = _RequestProxy(request, finalizers)
+        logger.info('Starting %s Data Collector for the modules with signature %s ...', role, describe(signature))
+        self._instances[key] = Instance(call_fixture(fixturedef, arguments, finalizers), arguments, finalizers)
+
+        # The framework fixture's own arguments aren't all in the item's closure, so look them up as it got them.
+        if 'request' not in fixturedef.argnames and all(request._get_active_fixturedef(name).scope == 'session'
+                                                         for name in fixturedef.argnames if name not in HOOK_FIXTURES):
+            self.templates[role] = Template(fixturedef, {name: value for name, value in arguments.items()
+                                                         if name not in HOOK_FIXTURES})
+        return self._instances[key].data_collector
+
+    def add(self, role, signature, arguments, instance):
+        """Add a Data Collector started ahead of its modules.
+
+        Args:
+            role (:obj:`str`): :py:const:`session.utils.utils_hooks.BUILDER` or ``EXECUTOR``.
+            signature (:py:class:`session.utils.utils_hooks.HookSignature`): Signature of its modules.
+            arguments (:obj:`dict`): Arguments of the framework fixture, as given in its :py:class:`Template`.
+            instance (:py:class:`concurrent.futures.Future`): Future of the :py:class:`Instance`.
+        """
+        self._instances[(role, signature, arguments_key(arguments))] = instance
+
+    def resident(self, role=None, signature=None):
+        """(role, signature) of the Data Collectors started or being started, optionally only those of ``role``
+        and ``signature``."""
+        return [key[:2] for key in self._instances
+                if (role is None or key[0] == role) and (signature is None or key[1] == signature)]
+
+    def module_started(self, signature, upcoming=()):
+        """Stop the Data Collectors of other signatures once a module with another signature starts, except those
+        of the ``upcoming`` signatures. Modules not using a Data Collector (``signature`` is ``None``) keep them for
+        the next module."""
+        if signature is None or signature == self._signature:
+            return
+        self._signature = signature
+        self.release(keep=[signature, *upcoming])
+
+    def release(self, keep=()):
+        """Stop the Data Collectors whose signature isn't in ``keep``, the last started first."""
+        self._release([key for key in self._instances if key[1] not in keep])
+
+    def close(self):
+        self.release()
+
+    def _instance(self, key):
+        """The :py:class:`Instance` of ``key``, waiting for it if it's being started in the background, or ``None``
+        if there is none or it could not be started."""
+        instance = self._instances.get(key)
+        if isinstance(instance, Future):
+            try:
+                instance = self._instances[key] = instance.result()
+            except BaseException as e:
+                logger.warning('Could not start %s Data Collector (%s) in the background: %s', key[0],
+                               describe(key[1]), e)
+                del self._instances[key]
+                return None
+        return instance
+
+    def _release(self, keys):
+        for key in reversed(keys):
+            instance = self._instances[key]
+            if isinstance(instance, Future) and instance.cancel():
+                del self._instances[key]
+                continue
+            instance = self._instance(key)
+            if instance is not None:
+                logger.info('Stopping %s Data Collector (%s)', key[0], describe(key[1]))
+                finalize(self._instances.pop(key))
+
+
+def framework_fixturedef(fixturedefs):
+    """The fixture definition overridden by the root ``conftest.py``, i.e. the one before the last, or ``None``."""
+    return fixturedefs[-2] if len(fixturedefs) > 1 else None
+
+
+def arguments_key(arguments):
+    """Key of the arguments of a framework fixture: hook fixtures are covered by the signature, the others have to
+    be the very same objects."""
+    return tuple(sorted((name, id(value)) for name, value in arguments.items()
+                        if name not in HOOK_FIXTURES and name != 'request'))
+
+
+def call_fixture(fixturedef, arguments, finalizers):
+    """Call a fixture function outside of pytest's fixture management, adding its teardown to ``finalizers``.
+
+    Returns:
+        The value of the fixture.
+    """
+    result = fixturedef.func(**arguments)
+    if inspect.isgenerator(result):
+        generator = result
+        result = next(generator)
+        finalizers.append(lambda: next(generator, None))
+    return result
+
+
+def finalize(instance):
+    """Run the finalizers of an :py:class:`Instance` in reverse order, logging the ones that fail."""
+    for finalizer in reversed(instance.finalizers):
+        try:
+            finalizer()
+        except Exception as e:
+            logger.error('Could not stop Data Collector %s: %s', instance.data_collector, e)
+
+
+class _RequestProxy:
+    """Request handed to a framework fixture whose Data Collector outlives the module, so that its finalizers run
+    when the cache stops the Data Collector rather than at the end of the module."""
+    def __init__(self, request, finalizers):
+        self._request = request
+        self._finalizers = finalizers
+
+    def addfinalizer(self, finalizer):
+        self._finalizers.append(finalizer)
+
+    def __getattr__(self, name):
+        return getattr(self._request, name)
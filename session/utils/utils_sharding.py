@@ -0,0 +1,122 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for splitting a test session into shards of similar duration
+
+import fcntl
+import heapq
+import json
+import logging
+import os
+import statistics
+import tempfile
+from collections import OrderedDict, namedtuple
+
+from session.utils.utils_hooks import module_id
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DURATION_HISTORY = '.test_durations.json'
+# Duration assumed for every test when the history knows none of them.
+DEFAULT_TEST_DURATION_SEC = 1.0
+
+# Tests that must run in the same process, e.g. those sharing module-scoped fixtures, and their estimated duration.
+ShardUnit = namedtuple('ShardUnit', ['name', 'items', 'duration'])
+
+
+class DurationHistory:
+    """JSON file of the last known duration of each test (setup, call and teardown), by node id.
+
+    Several shards write to the same file when they finish, so saving takes an exclusive lock and merges with what
+    is on disk.
+
+    Args:
+        path (:obj:`str`, optional): Path of the file. Default: :py:const:`DEFAULT_DURATION_HISTORY`
+    """
+    def __init__(self, path=DEFAULT_DURATION_HISTORY):
+        self.path = path
+        self.durations = self._load()
+        self._recorded = {}
+
+    def duration(self, nodeid):
+        return self.durations.get(nodeid)
+
+    def record(self, nodeid, seconds):
+        """Add ``seconds`` to the duration of ``nodeid`` in this session; called once per test phase."""
+        self._recorded[nodeid] = self._recorded.get(nodeid, 0) + seconds
+
+    def save(self):
+        if not self._recorded:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(f'{self.path}.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            durations = self._load()
+            durations.update(self._recorded)
+            with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as f:
+                json.dump(durations, f, indent=1, sort_keys=True)
+            os.replace(f.name, self.path)
+        self.durations = durations
+        self._recorded = {}
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning('Ignoring unreadable test duration history %s', self.path)
+            return {}
+
+
+def shard_units(items, history):
+    """Group items by module, so that module-scoped fixtures (and the pipelines they create) stay in one shard.
+
+    Tests missing from the history are estimated at the median duration of the known ones.
+
+    Returns:
+        A :obj:`list` of :py:class:`ShardUnit`, in collection order.
+    """
+    known = [history.duration(item.nodeid) for item in items if history.duration(item.nodeid) is not None]
+    default = statistics.median(known) if known else DEFAULT_TEST_DURATION_SEC
+
+    items_by_module = OrderedDict()
+    for item in items:
+        items_by_module.setdefault(module_id(item), []).append(item)
+    return [ShardUnit(module, module_items,
+                      sum(history.duration(item.nodeid) or default for item in module_items))
+            for module, module_items in items_by_module.items()]
+
+
+def partition(units, count):
+    """Split units into ``count`` shards with the longest-processing-time-first rule: the longest unit not placed yet
+    goes to the shard with the least work so far.
+
+    The result only depends on the units' names and durations, so every process of a sharded run computes the same
+    partition from the same history.
+
+    Returns:
+        A :obj:`list` of ``count`` lists of units, each in the order the units were given.
+    """
+    order = {unit.name: index for index, unit in enumerate(units)}
+    # (load, shard index) of every shard.
+    loads = [(0, index) for index in range(count)]
+    shards = [[] for _ in range(count)]
+    for unit in sorted(units, key=lambda unit: (-unit.duration, unit.name)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(unit)
+        heapq.heappush(loads, (load + unit.duration, index))
+    return [sorted(shard, key=lambda unit: order[unit.name]) for shard in shards]
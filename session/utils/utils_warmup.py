@@ -0,0 +1,154 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for starting the Data Collectors of upcoming modules while tests run
+
+import logging
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from session.utils.utils_hooks import describe, HOOK_FIXTURES, module_id, SDC_FIXTURES
+from session.utils.utils_reuse import call_fixture, finalize, Instance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 0
+DEFAULT_MEMORY_BUDGET_MB = 4096
+# Heap of a Data Collector whose hooks don't set -Xmx, and what the JVM and container take on top of the heap.
+DEFAULT_HEAP_MB = 1024
+OVERHEAD_MB = 512
+XMX_UNITS_MB = {'k': 1 / 1024, 'm': 1, 'g': 1024}
+
+
+def estimated_memory(role, signature):
+    """Memory, in MB, a Data Collector of ``role`` configured by the given
+    :py:class:`session.utils.utils_hooks.HookSignature` takes, from the ``-Xmx`` its hooks set in ``SDC_JAVA_OPTS``.
+    """
+    heap = DEFAULT_HEAP_MB
+    for setting_role, setting in signature.settings:
+        if setting_role == role and isinstance(setting, tuple) and setting[0] == 'SDC_JAVA_OPTS':
+            xmx = re.findall(r'-Xmx(\d+)([kKmMgG]?)', setting[1])
+            if xmx:
+                size, unit = xmx[-1]
+                heap = int(size) * XMX_UNITS_MB.get(unit.lower(), 1 / 1024 ** 2)
+    return heap + OVERHEAD_MB
+
+
+def upcoming_signatures(items, signatures, module, count):
+    """The next ``count`` distinct signatures after ``module`` in ``items``, in the order they will be needed."""
+    modules = list(OrderedDict.fromkeys(module_id(item) for item in items))
+    upcoming = OrderedDict()
+    for next_module in modules[modules.index(module) + 1:] if module in modules else modules:
+        signature = signatures.get(next_module)
+        if signature is not None and signature != signatures.get(module):
+            upcoming[signature] = None
+        if len(upcoming) == count:
+            break
+    return list(upcoming)
+
+
+class WarmStandbyPool:
+    """Starts, in background threads, the Data Collectors the next modules will use, so that their start-up overlaps
+    with the tests of the current module. They go to a :py:class:`session.utils.utils_reuse.DataCollectorCache`,
+    which hands them to their modules.
+
+    A Data Collector is only started ahead once one of the same role was started by its module, whose framework
+    fixture arguments are then reused (see :py:class:`session.utils.utils_reuse.Template`), and if the hooks of its
+    module request no fixtures. Data Collectors started, or being started, never take more than ``memory_budget``
+    together, as estimated by :py:func:`estimated_memory`; the current module's ones count first.
+
+    Args:
+        cache (:py:class:`session.utils.utils_reuse.DataCollectorCache`): Cache of the session.
+        items (:obj:`list`): Items of the session, in the order they run.
+        signatures (:obj:`dict`): Module id to :py:class:`session.utils.utils_hooks.HookSignature`.
+        size (:obj:`int`, optional): Number of upcoming Data Collector configurations to start ahead.
+            Default: :py:const:`DEFAULT_POOL_SIZE`
+        memory_budget (:obj:`int`, optional): Memory, in MB, resident Data Collectors may take.
+            Default: :py:const:`DEFAULT_MEMORY_BUDGET_MB`
+    """
+    def __init__(self, cache, items, signatures, size=DEFAULT_POOL_SIZE, memory_budget=DEFAULT_MEMORY_BUDGET_MB):
+        self.cache = cache
+        self.items = items
+        self.signatures = signatures
+        self.size = size
+        self.memory_budget = memory_budget
+        self._executor = ThreadPoolExecutor(max_workers=max(size * len(SDC_FIXTURES), 1))
+        self._module = None
+        self._upcoming = []
+
+    def module_started(self, module):
+        """Keep the Data Collectors of the configurations following ``module``, and stop the others, once per module.
+
+        Args:
+            module (:obj:`str`): Id of the module whose tests are starting.
+        """
+        if module == self._module:
+            return
+        self._module = module
+        self._upcoming = upcoming_signatures(self.items, self.signatures, module, self.size)
+        self.cache.module_started(self.signatures.get(module), upcoming=self._upcoming)
+
+    def warm(self):
+        """Start the Data Collectors of the upcoming configurations that aren't started yet, within the budget."""
+        used = sum(estimated_memory(role, signature) for role, signature in self.cache.resident())
+        for signature in self._upcoming:
+            module_items = [item for item in self.items if self.signatures.get(module_id(item)) == signature]
+            for role, fixture in SDC_FIXTURES.items():
+                template = self.cache.templates.get(role)
+                if (template is None or self.cache.resident(role, signature)
+                        or not any(fixture in item._fixtureinfo.names_closure for item in module_items)):
+                    continue
+                hookdefs = _hook_fixturedefs(template.fixturedef, module_items[0])
+                if hookdefs is None:
+                    continue
+                memory = estimated_memory(role, signature)
+                if used + memory > self.memory_budget:
+                    logger.debug('Not starting %s Data Collector (%s) ahead: %s MB used of a %s MB budget', role,
+                                 describe(signature), used, self.memory_budget)
+                    return
+                used += memory
+                logger.info('Starting %s Data Collector for the modules with signature %s in the background ...',
+                            role, describe(signature))
+                self.cache.add(role, signature, template.arguments,
+                               self._executor.submit(_start, template, hookdefs))
+
+    def close(self):
+        # The cache waits for, or cancels, the Data Collectors still starting.
+        self._executor.shutdown(wait=False)
+
+
+def _hook_fixturedefs(fixturedef, item):
+    """Hook name to the definition of the hook ``item`` gets, for the hooks of a framework fixture, or ``None`` if
+    one of them requests fixtures."""
+    hookdefs = {}
+    for name in fixturedef.argnames:
+        if name in HOOK_FIXTURES:
+            fixturedefs = item._fixtureinfo.name2fixturedefs.get(name)
+            if not fixturedefs or fixturedefs[-1].argnames:
+                return None
+            hookdefs[name] = fixturedefs[-1]
+    return hookdefs
+
+
+def _start(template, hookdefs):
+    finalizers = []
+    arguments = dict(template.arguments)
+    try:
+        for name, hookdef in hookdefs.items():
+            arguments[name] = call_fixture(hookdef, {}, finalizers)
+        return Instance(call_fixture(template.fixturedef, arguments, finalizers), arguments, finalizers)
+    except BaseException:
+        finalize(Instance(None, arguments, finalizers))
+        raise
@@ -1,21 +1,10 @@
 import csv
 import io
-import textwrap
 
 import pytest
-from streamsets.sdk.models import Configuration
 
-FILE_WRITER_SCRIPT = """
-    file_contents = '''{file_contents}'''
-    for record in records:
-        with open('{filepath}', 'w') as f:
-            f.write(file_contents.decode('utf8').encode('{encoding}'))
-"""
-
-FILE_WRITER_SCRIPT_BINARY = """
-    with open('{filepath}', 'wb') as f:
-        f.write({file_contents})
-"""
+from stage.utils.utils_shell import FileWriterService
+from stage.utils.utils_validation import ConfigurationValidator
 
 @pytest.fixture(scope='module')
 def sdc_common_hook():
@@ -24,8 +13,15 @@ def sdc_common_hook():
     return hook
 
 
+@pytest.fixture(scope='module')
+def file_writer_service(sdc_executor):
+    """A :py:class:`stage.utils.utils_shell.FileWriterService` shared by every test in the module."""
+    with FileWriterService(sdc_executor) as service:
+        yield service
+
+
 @pytest.fixture
-def file_writer(sdc_executor):
+def file_writer(file_writer_service):
     """Writes a file to SDC's local FS.
 
     Args:
@@ -35,56 +31,27 @@ def file_writer(sdc_executor):
         file_data_type (:obj:`str`, optional): The file which type of data containing . Default: ``'NOT_BINARY'``
     """
     def file_writer_(filepath, file_contents, encoding='utf8', file_data_type='NOT_BINARY'):
-        write_file_with_pipeline(sdc_executor, filepath, file_contents, encoding, file_data_type)
+        file_writer_service.write_file(filepath, file_contents, encoding, file_data_type)
     return file_writer_
 
 
-@pytest.fixture
-def shell_executor(sdc_executor):
-    def shell_executor_(script, environment_variables=None):
-        builder = sdc_executor.get_pipeline_builder()
-        dev_raw_data_source = builder.add_stage('Dev Raw Data Source')
-        dev_raw_data_source.set_attributes(data_format='TEXT', raw_data='noop', stop_after_first_batch=True)
-        shell = builder.add_stage('Shell')
-        shell.set_attributes(script=script,
-                             environment_variables=(Configuration(**environment_variables)._data
-                                                    if environment_variables
-                                                    else []))
-        trash = builder.add_stage('Trash')
-        dev_raw_data_source >> [trash, shell]
-        pipeline = builder.build('Shell executor pipeline')
-
-        sdc_executor.add_pipeline(pipeline)
-        sdc_executor.start_pipeline(pipeline).wait_for_finished()
-        sdc_executor.remove_pipeline(pipeline)
-    return shell_executor_
-
-
-def write_file_with_pipeline(sdc_executor, filepath, file_contents, encoding='utf8', file_data_type='NOT_BINARY'):
-    builder = sdc_executor.get_pipeline_builder()
-    dev_raw_data_source = builder.add_stage('Dev Raw Data Source')
-    dev_raw_data_source.set_attributes(data_format='TEXT', raw_data='noop', stop_after_first_batch=True)
-    jython_evaluator = builder.add_stage('Jython Evaluator')
-
-    file_writer_script = FILE_WRITER_SCRIPT_BINARY if file_data_type == 'BINARY' else FILE_WRITER_SCRIPT
-    jython_evaluator.script = textwrap.dedent(file_writer_script).format(filepath=str(filepath),
-                                                                         file_contents=file_contents,
-                                                                         encoding=encoding)
-    trash = builder.add_stage('Trash')
-    dev_raw_data_source >> jython_evaluator >> trash
-    pipeline = builder.build('File writer pipeline')
-
-    sdc_executor.add_pipeline(pipeline)
-    sdc_executor.start_pipeline(pipeline).wait_for_finished()
-    sdc_executor.remove_pipeline(pipeline)
+@pytest.fixture(scope='module')
+def configuration_validator(sdc_builder, sdc_executor):
+    """A :py:class:`stage.utils.utils_validation.ConfigurationValidator` shared by every test in the module, so that
+    a parametrized matrix of configurations is validated in one concurrent round."""
+    validator = ConfigurationValidator(sdc_builder, sdc_executor)
+    try:
+        yield validator
+    finally:
+        validator.remove_pipelines()
 
 
 @pytest.fixture
-def delimited_file_writer(sdc_executor):
+def delimited_file_writer(file_writer_service):
     def delimited_file_writer_(filepath, file_contents_list, delimiter_format, delimiter_character, encoding='utf8',
                                file_data_type='NOT_BINARY'):
         delimited_file_contents = get_file_content(file_contents_list, delimiter_format, delimiter_character)
-        write_file_with_pipeline(sdc_executor, filepath, delimited_file_contents, encoding, file_data_type)
+        file_writer_service.write_file(filepath, delimited_file_contents, encoding, file_data_type)
     return delimited_file_writer_
 
 
@@ -32,6 +32,7 @@ from xml.etree import ElementTree
 logger = logging.getLogger(__file__)
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['DELIMITED'])
 @pytest.mark.parametrize('header_line', ['WITH_HEADER'])
 @pytest.mark.parametrize('extra_columns_present', [False, True])
@@ -93,6 +94,7 @@ def test_directory_origin_configuration_allow_extra_columns(sdc_builder, sdc_exe
             sdc_executor.stop_pipeline(pipeline)
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('create_directory_first', [True, False])
 @pytest.mark.parametrize('allow_late_directory', [False, True])
 def test_directory_origin_configuration_allow_late_directory(sdc_builder, sdc_executor,
@@ -149,6 +151,7 @@ def test_directory_origin_configuration_allow_late_directory(sdc_builder, sdc_ex
             sdc_executor.stop_pipeline(pipeline)
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('file_post_processing', ['ARCHIVE'])
 def test_directory_origin_configuration_archive_directory(sdc_builder, sdc_executor,
                                                           shell_executor, file_writer,
@@ -228,6 +231,7 @@ def test_directory_origin_configuration_avro_schema(sdc_builder, sdc_executor, d
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('batch_size_in_recs', [2, 3, 4])
 def test_directory_origin_configuration_batch_size_in_recs(sdc_builder, sdc_executor, shell_executor,
                                                            file_writer, batch_size_in_recs):
@@ -342,6 +346,7 @@ def test_directory_origin_configuration_comment_marker(sdc_builder, sdc_executor
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['TEXT', 'DELIMITED', 'JSON', 'SDC_JSON', 'XML', 'LOG'])
 @pytest.mark.parametrize('compression_format', ['COMPRESSED_FILE'])
 @pytest.mark.parametrize('compression_codec', ['GZIP', 'BZIP2'])
@@ -424,6 +429,7 @@ def test_directory_origin_configuration_custom_log_format(sdc_builder, sdc_execu
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['SDC_JSON'])
 # 'AVRO', 'DELIMITED', 'EXCEL', 'JSON', 'LOG', 'PROTOBUF',  'TEXT', 'WHOLE_FILE', 'XML'
 def test_directory_origin_configuration_data_format(sdc_builder, sdc_executor, data_format,
@@ -482,6 +488,7 @@ def test_directory_origin_configuration_delimited_messages(sdc_builder, sdc_exec
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('delimiter_format_type', ['CUSTOM'])
 @pytest.mark.parametrize('data_format', ['DELIMITED'])
 @pytest.mark.parametrize('delimiter_character', [' ', '^'])
@@ -530,6 +537,7 @@ def test_directory_origin_configuration_delimiter_character(sdc_builder, sdc_exe
         shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['XML'])
 def test_directory_origin_configuration_delimiter_element(sdc_builder, sdc_executor, shell_executor, file_writer,
                                                           data_format):
@@ -577,6 +585,7 @@ def test_directory_origin_configuration_delimiter_element(sdc_builder, sdc_execu
         shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['DELIMITED'])
 @pytest.mark.parametrize('delimiter_format_type', ['CSV', 'CUSTOM', 'POSTGRES_CSV', 'TDF', 'RFC4180', 'EXCEL',
                                                    'POSTGRES_TEXT', 'MYSQL'])
@@ -629,6 +638,7 @@ def test_directory_origin_configuration_delimiter_format_type(sdc_builder, sdc_e
         shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('delimiter_format_type', ['CUSTOM'])
 @pytest.mark.parametrize('data_format', ['DELIMITED'])
 @pytest.mark.parametrize('enable_comments', [False, True])
@@ -738,6 +748,7 @@ def test_directory_origin_configuration_exclude_interval(sdc_builder, sdc_execut
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('extra_column_prefix', ['', '_extra_'])
 @pytest.mark.parametrize('stage_attributes', [{'allow_extra_columns': True,
                                                'data_format': 'DELIMITED',
@@ -790,6 +801,7 @@ def test_directory_origin_configuration_field_path_to_regex_group_mapping(sdc_bu
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('file_name_pattern', ['pattern_check_processing_1.txt', '*.txt', 'pattern_*', '*_check_*'])
 def test_directory_origin_configuration_file_name_pattern(sdc_builder, sdc_executor, shell_executor,
                                                           file_writer, file_name_pattern):
@@ -828,6 +840,7 @@ def test_directory_origin_configuration_file_name_pattern(sdc_builder, sdc_execu
         shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('file_name_pattern_mode', ['GLOB', 'REGEX'])
 def test_directory_origin_configuration_file_name_pattern_mode(sdc_builder, sdc_executor, shell_executor,
                                                                file_writer, file_name_pattern_mode):
@@ -865,6 +878,7 @@ def test_directory_origin_configuration_file_name_pattern_mode(sdc_builder, sdc_
         shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['TEXT', 'DELIMITED', 'JSON', 'LOG', 'SDC_JSON', 'XML'])
 @pytest.mark.parametrize('compression_format', ['ARCHIVE', 'COMPRESSED_ARCHIVE'])
 def test_directory_origin_configuration_file_name_pattern_within_compressed_directory(sdc_builder, sdc_executor,
@@ -941,6 +955,7 @@ def test_directory_origin_configuration_files_directory(sdc_builder, sdc_executo
     pass
 
 
+@sdc_min_version('3.4.0')
 def test_directory_origin_configuration_first_file_to_process(sdc_builder, sdc_executor,
                                                               file_writer, shell_executor):
     files_directory = os.path.join('/tmp', get_random_string())
@@ -979,6 +994,7 @@ def test_directory_origin_configuration_first_file_to_process(sdc_builder, sdc_e
             sdc_executor.stop_pipeline(pipeline)
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('grok_pattern_is_correct', [True, False])
 @pytest.mark.parametrize('stage_attributes', [{'data_format': 'LOG', 'log_format': 'GROK'}])
 def test_grok_pattern(sdc_builder, sdc_executor, stage_attributes, grok_pattern_is_correct,
@@ -1025,6 +1041,7 @@ def test_grok_pattern(sdc_builder, sdc_executor, stage_attributes, grok_pattern_
             shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('grok_pattern_definition', ['MY_CUSTOM_LOG_1', 'MY_CUSTOM_LOG_2'])
 @pytest.mark.parametrize('stage_attributes', [{'data_format': 'LOG', 'log_format': 'GROK'}])
 def test_grok_pattern_definition(sdc_builder, sdc_executor, stage_attributes, shell_executor, file_writer,
@@ -1077,6 +1094,7 @@ def test_directory_origin_configuration_header_line(sdc_builder, sdc_executor, d
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('ignore_control_characters', [True, False])
 def test_directory_origin_configuration_ignore_control_characters_text(sdc_builder, sdc_executor,
                                                                        ignore_control_characters, shell_executor,
@@ -1105,6 +1123,7 @@ def test_directory_origin_configuration_ignore_control_characters_text(sdc_build
         sdc_executor.stop_pipeline(pipeline)
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('ignore_control_characters', [True, False])
 def test_directory_origin_configuration_ignore_control_characters_delimited(sdc_builder, sdc_executor,
                                                                             ignore_control_characters, shell_executor,
@@ -1141,6 +1160,7 @@ def test_directory_origin_configuration_ignore_control_characters_delimited(sdc_
         sdc_executor.stop_pipeline(pipeline)
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('stage_attributes', [{'ignore_control_characters': True},
                                               {'ignore_control_characters': False}])
 def test_directory_origin_configuration_ignore_control_characters_json(sdc_builder, sdc_executor,
@@ -1187,6 +1207,7 @@ def test_directory_origin_configuration_ignore_control_characters_json(sdc_build
             sdc_executor.stop_pipeline(pipeline)
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('ignore_control_characters', [True, False])
 def test_directory_origin_configuration_ignore_control_characters_log(sdc_builder, sdc_executor,
                                                                       ignore_control_characters, shell_executor,
@@ -1216,6 +1237,7 @@ def test_directory_origin_configuration_ignore_control_characters_log(sdc_builde
         sdc_executor.stop_pipeline(pipeline)
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('ignore_control_characters', [True, False])
 @pytest.mark.skip('Not yet implemented')
 def test_directory_origin_configuration_ignore_control_characters_xml(sdc_builder, sdc_executor,
@@ -1227,6 +1249,7 @@ def test_directory_origin_configuration_ignore_control_characters_xml(sdc_builde
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('ignore_control_characters', [True, False])
 @pytest.mark.skip('Not yet implemented')
 def test_directory_origin_configuration_ignore_control_characters_datagram(sdc_builder, sdc_executor,
@@ -1255,6 +1278,7 @@ def test_directory_origin_configuration_include_custom_delimiter(sdc_builder, sd
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['XML'])
 @pytest.mark.parametrize('include_field_xpaths', [True, False])
 def test_directory_origin_configuration_include_field_xpaths(sdc_builder, sdc_executor, shell_executor, file_writer,
@@ -1333,6 +1357,7 @@ def test_directory_origin_configuration_include_field_xpaths(sdc_builder, sdc_ex
         shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['JSON'])
 @pytest.mark.parametrize('json_content', ['ARRAY_OBJECTS', 'MULTIPLE_OBJECTS'])
 def test_directory_origin_configuration_json_content(sdc_builder, sdc_executor, shell_executor, data_format,
@@ -1370,6 +1395,7 @@ def test_directory_origin_configuration_json_content(sdc_builder, sdc_executor,
         shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['DELIMITED'])
 def test_directory_origin_configuration_lines_to_skip(sdc_builder, sdc_executor, data_format, shell_executor,
                                                       file_writer):
@@ -1438,6 +1464,7 @@ def test_directory_origin_configuration_max_files_soft_limit(sdc_builder, sdc_ex
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['LOG', 'TEXT'])
 @pytest.mark.parametrize('max_line_length', [155, 82])
 def test_directory_origin_configuration_max_line_length(sdc_builder, sdc_executor, data_format,
@@ -1488,6 +1515,7 @@ def test_directory_origin_configuration_max_record_length_in_chars(sdc_builder,
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['XML'])
 @pytest.mark.parametrize('max_record_length_in_chars', [206, 208, 220])
 def test_directory_origin_configuration_max_record_length_in_chars_xml(sdc_builder, sdc_executor, shell_executor,
@@ -1559,6 +1587,7 @@ def test_directory_origin_configuration_message_type(sdc_builder, sdc_executor,
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['XML'])
 def test_directory_origin_configuration_namespaces(sdc_builder, sdc_executor, shell_executor, file_writer, data_format):
     """Test for Directory origin can read XML files with namespaces.
@@ -1623,6 +1652,7 @@ def test_directory_origin_configuration_namespaces(sdc_builder, sdc_executor, sh
         shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('stage_attributes', [{'data_format': 'DELIMITED', 'parse_nulls': True}])
 def test_null_constant(sdc_builder, sdc_executor, stage_attributes, keep_data, shell_executor, delimited_file_writer):
     """Verify that the Null Constant configuration works as expected when Parse Nulls is enabled for delimited files."""
@@ -1650,6 +1680,7 @@ def test_directory_origin_configuration_on_record_error(sdc_builder, sdc_executo
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['XML'])
 @pytest.mark.parametrize('output_field_attributes', [False, True])
 def test_directory_origin_configuration_output_field_attributes(sdc_builder, sdc_executor, shell_executor, file_writer,
@@ -1719,6 +1750,7 @@ def test_directory_origin_configuration_output_field_attributes(sdc_builder, sdc
         shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('null_constant', ['TEST_DATA'])
 @pytest.mark.parametrize('stage_attributes', [{'data_format': 'DELIMITED', 'parse_nulls': False},
                                               {'data_format': 'DELIMITED', 'parse_nulls': True}])
@@ -1759,6 +1791,7 @@ def test_parse_nulls(sdc_builder, sdc_executor, stage_attributes, keep_data,
             shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('read_order', ['TIMESTAMP'])
 @pytest.mark.parametrize('process_subdirectories', [False, True])
 def test_directory_origin_configuration_process_subdirectories(sdc_builder, sdc_executor, read_order,
@@ -1798,6 +1831,7 @@ def test_directory_origin_configuration_protobuf_descriptor_file(sdc_builder, sd
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('delimiter_format_type', ['CUSTOM'])
 @pytest.mark.parametrize('data_format', ['DELIMITED'])
 @pytest.mark.parametrize('quote_character', ['\t', ';' , ' '])
@@ -1842,6 +1876,7 @@ def test_directory_origin_configuration_quote_character(sdc_builder, sdc_executo
         shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('stage_attributes', [{'data_format': 'WHOLE_FILE'}])
 def test_rate_per_second(sdc_builder, sdc_executor, stage_attributes, shell_executor, file_writer, keep_data):
     """Test if Directory origin honors "Rate Per Second" configuration.
@@ -1892,6 +1927,7 @@ def test_rate_per_second(sdc_builder, sdc_executor, stage_attributes, shell_exec
             shell_executor(f'rm -r {files_directory}')
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('read_order', ['LEXICOGRAPHICAL', 'TIMESTAMP'])
 def test_directory_origin_configuration_read_order(sdc_builder, sdc_executor, shell_executor,
                                                    file_writer, read_order):
@@ -1948,6 +1984,7 @@ def test_directory_origin_configuration_record_generation_mode(sdc_builder, sdc_
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['LOG'])
 @pytest.mark.parametrize('log_format', ['REGEX'])
 @pytest.mark.parametrize('regular_expression',
@@ -2040,6 +2077,7 @@ def test_directory_origin_configuration_template_cache_timeout_in_ms(sdc_builder
     pass
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('data_format', ['LOG'])
 @pytest.mark.parametrize('log_format', ['LOG4J'])
 @pytest.mark.parametrize('on_parse_error', ['INCLUDE_AS_STACK_TRACE'])
@@ -2112,6 +2150,7 @@ def test_directory_origin_configuration_use_custom_log_format(sdc_builder, sdc_e
     pass
 
 
+@sdc_min_version('3.4.0')
 def test_directory_no_read_permissions(sdc_builder, sdc_executor, shell_executor):
     FILES_DIRECTORY = '/tmp'
 
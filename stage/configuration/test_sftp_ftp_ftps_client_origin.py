@@ -1052,6 +1052,7 @@ def test_quote_character(sdc_builder, sdc_executor, stage_attributes):
     pass
 
 
+@sdc_min_version('3.4.0')
 @sftp
 @pytest.mark.parametrize('stage_attributes', [{'data_format': 'WHOLE_FILE'}])
 def test_rate_per_second(sdc_builder, sdc_executor, stage_attributes, sftp, shell_executor, keep_data):
@@ -1,12 +1,18 @@
 import pytest
 
-from streamsets.sdk.sdc_api import StartError
 from streamsets.testframework.decorators import stub
 
+from stage.utils.utils_validation import stage_issue_messages, stage_pipeline
+
 
 KEYSTORE_FILE_PATH = 'resources/tls/keystore.jks'
 KEYSTORE_TYPE = 'JKS'
 KEYSTORE_PASSWORD = 'password'
+# Accepted and rejected "KeyStore path" configurations of test_keystore_file.
+KEYSTORE_FILE_CONFIGURATIONS = [{'use_tls': True, 'keystore_file': keystore_file, 'keystore_type': KEYSTORE_TYPE,
+                                 'keystore_password': KEYSTORE_PASSWORD, 'data_format': 'JSON',
+                                 'application_id': 'admin'}
+                                for keystore_file in (KEYSTORE_FILE_PATH, 'wrong/path/file.jks')]
 
 
 @stub
@@ -456,39 +462,26 @@ def test_json_content(sdc_builder, sdc_executor, stage_attributes):
     pass
 
 
-@pytest.mark.parametrize('stage_attributes', [{'use_tls': True, 'keystore_file': KEYSTORE_FILE_PATH},
-                                              {'use_tls': True, 'keystore_file': 'wrong/path/file.jks'}])
-def test_keystore_file(sdc_builder, sdc_executor, stage_attributes):
+@pytest.mark.parametrize('stage_attributes', KEYSTORE_FILE_CONFIGURATIONS)
+def test_keystore_file(configuration_validator, stage_attributes):
     """Test "KeyStore path" config parameter. It is tested with two values, one pointing to a real KeyStore file
-    and the other to an unexisting file. We check a TLS_01 error is raised for the unexisting file and that
-    the pipeline successfully transitions to RUNNING state if the file exists.
+    and the other to an unexisting file. We check a TLS_01 issue is reported for the unexisting file and that
+    the pipeline validates if the file exists. Both configurations are validated in one round.
 
     Pipeline:
       websocket_server >> trash
 
     """
-    builder = sdc_builder.get_pipeline_builder()
-    websocket_server = builder.add_stage('WebSocket Server')
-    websocket_server.set_attributes(keystore_type=KEYSTORE_TYPE,
-                                    keystore_password=KEYSTORE_PASSWORD,
-                                    data_format='JSON',
-                                    application_id='admin',
-                                    **stage_attributes)
-    trash = builder.add_stage('Trash')
-    websocket_server >> trash
-
-    pipeline = builder.build()
-    sdc_executor.add_pipeline(pipeline)
+    result = configuration_validator.validate(stage_pipeline('WebSocket Server', 'origin'),
+                                              KEYSTORE_FILE_CONFIGURATIONS, stage_attributes)
 
     if stage_attributes['keystore_file'] == KEYSTORE_FILE_PATH:
-        # Expecting SDC loads the KeyStore and successfully starts to run the pipeline.
-        sdc_executor.start_pipeline(pipeline).wait_for_status(status='RUNNING')
-        sdc_executor.stop_pipeline(pipeline)
+        # Expecting SDC loads the KeyStore and accepts the configuration.
+        assert result.valid, result.issues
     else:
-        # Expecting a StartError from SDC due to unexisting KeyStore file (TLS_01 error).
-        with pytest.raises(StartError) as e:
-            sdc_executor.start_pipeline(pipeline).wait_for_status(status='RUNNING')
-        assert e.value.message.startswith('TLS_01')
+        # Expecting a TLS_01 issue from SDC due to unexisting KeyStore file.
+        assert not result.valid
+        assert any('TLS_01' in message for message in stage_issue_messages(result)), result.issues
 
 
 @stub
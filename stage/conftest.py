@@ -0,0 +1,47 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from stage.utils.utils_kafka import close_producers
+from stage.utils.utils_shell import ShellService
+
+
+@pytest.fixture(scope='session', autouse=True)
+def kafka_producers():
+    """Share the Kafka producers of :py:mod:`stage.utils.utils_kafka` across all stage tests and close them at the
+    end of the session."""
+    yield
+    close_producers()
+
+
+@pytest.fixture(scope='module')
+def shell_service(sdc_executor):
+    """A :py:class:`stage.utils.utils_shell.ShellService` shared by every test in the module.
+
+    The Jython stage library must be added by the module's ``sdc_common_hook``.
+    """
+    with ShellService(sdc_executor) as service:
+        yield service
+
+
+@pytest.fixture
+def shell_executor(shell_service):
+    """Runs a shell script on SDC's host.
+
+    The returned callable takes ``(script, environment_variables=None)`` and returns a
+    :py:class:`stage.utils.utils_shell.ShellResult`. Use ``shell_executor.execute_batch`` to run a test's setup or
+    teardown commands in one go.
+    """
+    return shell_service
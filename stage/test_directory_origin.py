@@ -83,27 +83,6 @@ def write_file_with_pipeline(sdc_executor, filepath, file_contents, encoding='ut
     sdc_executor.remove_pipeline(pipeline)
 
 
-@pytest.fixture
-def shell_executor(sdc_executor):
-    def shell_executor_(script, environment_variables=None):
-        builder = sdc_executor.get_pipeline_builder()
-        dev_raw_data_source = builder.add_stage('Dev Raw Data Source')
-        dev_raw_data_source.set_attributes(data_format='TEXT', raw_data='noop', stop_after_first_batch=True)
-        shell = builder.add_stage('Shell')
-        shell.set_attributes(script=script,
-                             environment_variables=(Configuration(**environment_variables)._data
-                                                    if environment_variables
-                                                    else []))
-        trash = builder.add_stage('Trash')
-        dev_raw_data_source >> [trash, shell]
-        pipeline = builder.build('Shell executor pipeline')
-
-        sdc_executor.add_pipeline(pipeline)
-        sdc_executor.start_pipeline(pipeline).wait_for_finished()
-        sdc_executor.remove_pipeline(pipeline)
-    return shell_executor_
-
-
 @pytest.fixture
 def list_dir(sdc_executor):
     def list_dir_(data_format, files_directory, file_name_pattern, recursive=True, batches=1, batch_size=10):
@@ -1439,6 +1418,7 @@ def generate_files(sdc_builder, sdc_executor, tmp_directory):
     sdc_executor.stop_pipeline(files_pipeline)
 
 
+@sdc_min_version('3.4.0')
 @pytest.mark.parametrize('read_order', ['TIMESTAMP', 'LEXICOGRAPHICAL'])
 @pytest.mark.parametrize('file_post_processing', ['DELETE', 'ARCHIVE'])
 def test_directory_no_post_process_older_files(sdc_builder, sdc_executor, file_writer, shell_executor, list_dir,
@@ -13,19 +13,18 @@
 # limitations under the License.
 
 import base64
-import io
 import json
 import logging
 import string
 import time
 
-import avro
 import pytest
-from avro.datafile import DataFileWriter
 
 from streamsets.testframework.environments.cloudera import ClouderaManagerCluster
 from streamsets.testframework.markers import cluster, sdc_min_version
 from streamsets.testframework.utils import get_random_string
+
+from stage.utils.utils_kafka import avro_container_encoder, avro_encoder, produce_messages
 from stage.utils.utils_xml import get_xml_output_field
 
 logger = logging.getLogger(__name__)
@@ -48,6 +47,7 @@ SCHEMA = {
         {'name': 'boss', 'type': ['Employee', 'null']}
     ]
 }
+AVRO_ENCODERS = {'AVRO': avro_encoder(SCHEMA), 'AVRO_WITHOUT_SCHEMA': avro_container_encoder(SCHEMA)}
 
 
 @pytest.fixture(autouse=True)
@@ -285,12 +285,8 @@ def test_kafka_multi_origin_standalone_honor_prod_batch_size(sdc_builder, sdc_ex
 
     sdc_executor.add_pipeline(kafka_multitopic_consumer_pipeline)
 
-    producer = cluster.kafka.producer()
     logger.info('Number of Messages to be produced: %s', max_records)
-
-    for _ in range(max_records):
-        producer.send(topic_name, 'Hello World!'.encode())
-    producer.flush()
+    produce_messages(cluster, topic_name, ['Hello World!'.encode()] * max_records)
     # After SDC-13487, the batch size in SDC properties should be honored. So a batch size of 1000 (default in SDC
     # props) should be used rather than 100,000 which is configured on the pipeline. With batch size of 1000, and
     # max records as 10000, the pipeline should have 10 batches within the configured timeout.
@@ -920,38 +916,22 @@ def get_kafka_consumer_stage_since_sdc_3_6_0(pipeline_builder, cluster):
 
 def produce_kafka_messages(topic, cluster, message, data_format):
     """Send basic messages to Kafka"""
-    # Get Kafka producer
-    producer = cluster.kafka.producer()
+    produce_kafka_messages_batch(topic, cluster, [message], data_format)
 
+
+def produce_kafka_messages_batch(topic, cluster, messages, data_format):
+    """Send messages to Kafka with a pooled producer, flushing once for the whole batch"""
     basic_data_formats = ['XML', 'CSV', 'SYSLOG', 'NETFLOW', 'COLLECTD', 'BINARY', 'LOG', 'TEXT', 'JSON']
 
     # Write records into Kafka depending on the data_format.
     if data_format in basic_data_formats:
-        producer.send(topic, message)
+        produce_messages(cluster, topic, messages)
 
     elif data_format == 'WITH_KEY':
-        producer.send(topic, message, key=get_random_string(string.ascii_letters, 10).encode())
-
-    elif data_format == 'AVRO':
-        writer = avro.io.DatumWriter(avro.schema.Parse(json.dumps(SCHEMA)))
-        bytes_writer = io.BytesIO()
-        encoder = avro.io.BinaryEncoder(bytes_writer)
-        writer.write(message, encoder)
-        raw_bytes = bytes_writer.getvalue()
-        producer.send(topic, raw_bytes)
-
-    elif data_format == 'AVRO_WITHOUT_SCHEMA':
-        bytes_writer = io.BytesIO()
-        datum_writer = avro.io.DatumWriter(avro.schema.Parse(json.dumps(SCHEMA)))
-        data_file_writer = DataFileWriter(writer=bytes_writer, datum_writer=datum_writer,
-                                          writer_schema=avro.schema.Parse(json.dumps(SCHEMA)))
-        data_file_writer.append(message)
-        data_file_writer.flush()
-        raw_bytes = bytes_writer.getvalue()
-        data_file_writer.close()
-        producer.send(topic, raw_bytes)
-
-    producer.flush()
+        produce_messages(cluster, topic, messages, key=lambda _: get_random_string(string.ascii_letters, 10).encode())
+
+    elif data_format in ('AVRO', 'AVRO_WITHOUT_SCHEMA'):
+        produce_messages(cluster, topic, messages, encoder=AVRO_ENCODERS[data_format])
 
 
 def produce_kafka_messages_in_different_timestamp(topic, cluster, messages, data_format, num_messages_to_send_first):
@@ -962,18 +942,16 @@ def produce_kafka_messages_in_different_timestamp(topic, cluster, messages, data
     timestamp = -1
     if num_messages_to_send_first < len(messages):
         # Send first batch of messages.
-        for i in range(0, num_messages_to_send_first):
-            message = messages[i]
-            produce_kafka_messages(topic, cluster, message.encode(), data_format)
+        produce_kafka_messages_batch(topic, cluster, [message.encode() for message in
+                                                      messages[:num_messages_to_send_first]], data_format)
 
         # Sleep for 30 seconds.
         time.sleep(30)
         timestamp = int(time.time() * 1000)
 
         # Send second batch of messages.
-        for j in range(num_messages_to_send_first, len(messages)):
-            message = messages[j]
-            produce_kafka_messages(topic, cluster, message.encode(), data_format)
+        produce_kafka_messages_batch(topic, cluster, [message.encode() for message in
+                                                      messages[num_messages_to_send_first:]], data_format)
 
     return timestamp
 
@@ -24,6 +24,9 @@ import sqlalchemy
 from streamsets.testframework.markers import database, sdc_min_version
 from streamsets.testframework.utils import get_random_string
 
+from stage.utils.utils_jdbc import create_tables, drop_tables
+from stage.utils.utils_replication import assert_table_contains
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_SCHEMA_NAME = 'dbo'
@@ -33,33 +36,43 @@ def setup_table(connection, schema_name, table_name, sample_data=None, capture_i
     """Create table and insert the sample data into the table"""
     table = create_table(connection, schema_name, table_name)
 
-    if capture_instance_name is None:
-      capture_instance_name = f'{schema_name}_{table_name}'
-
-    logger.info('Enabling CDC on %s.%s...', schema_name, table_name)
-    connection.execute(f'exec sys.sp_cdc_enable_table @source_schema=\'{schema_name}\', '
-                       f'@source_name=\'{table_name}\', '
-                       f'@capture_instance=\'{capture_instance_name}\', '
-                       f'@supports_net_changes=1, @role_name=NULL')
+    enable_cdc(connection, table, capture_instance_name)
 
     if sample_data is not None:
         add_data_to_table(connection, table, sample_data)
 
     return table
 
+
+def enable_cdc(connection, table, capture_instance_name=None):
+    if capture_instance_name is None:
+        capture_instance_name = f'{table.schema}_{table.name}'
+
+    logger.info('Enabling CDC on %s.%s...', table.schema, table.name)
+    connection.execute(f'exec sys.sp_cdc_enable_table @source_schema=\'{table.schema}\', '
+                       f'@source_name=\'{table.name}\', '
+                       f'@capture_instance=\'{capture_instance_name}\', '
+                       f'@supports_net_changes=1, @role_name=NULL')
+
+
 def add_data_to_table(connection, table, sample_data):
     logger.info('Adding %s rows into %s...', len(sample_data), table)
     connection.execute(table.insert(), sample_data)
 
 
+def table_definition(schema_name, table_name):
+    """Table with the following schema: id int primary key, name varchar(25), dt datetime"""
+    return sqlalchemy.Table(table_name, sqlalchemy.MetaData(),
+                            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True, autoincrement=False),
+                            sqlalchemy.Column('name', sqlalchemy.String(25)),
+                            sqlalchemy.Column('dt', sqlalchemy.String(25)),
+                            schema=schema_name)
+
+
 def create_table(database, schema_name, table_name):
     """Create table with the folloiwng scheam: id int primary key, name varchar(25), dt datetime"""
     logger.info('Creating table %s.%s...', schema_name, table_name)
-    table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(),
-                             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True, autoincrement=False),
-                             sqlalchemy.Column('name', sqlalchemy.String(25)),
-                             sqlalchemy.Column('dt', sqlalchemy.String(25)),
-                             schema=schema_name)
+    table = table_definition(schema_name, table_name)
 
     table.create(database.engine)
 
@@ -68,18 +81,7 @@ def create_table(database, schema_name, table_name):
 
 def assert_table_replicated(database, sample_data, schema_name, table_name):
     """Assert the sample data matches with the desitnation table data wrote using JDBC Producer"""
-    db_engine = database.engine
-
-    target_table = sqlalchemy.Table(table_name, sqlalchemy.MetaData(),
-                                    autoload=True, autoload_with=db_engine,
-                                    schema=schema_name)
-    target_result = db_engine.execute(target_table.select().order_by(target_table.c['id']))
-    target_result_list = target_result.fetchall()
-    target_result.close()
-
-    input_values = [tuple(data.values()) for data in sample_data]
-
-    assert sorted(input_values) == sorted(target_result_list)
+    assert_table_contains(database, table_name, sample_data, key='id', schema=schema_name)
 
 
 def setup_sample_data(no_of_records):
@@ -131,7 +133,6 @@ def test_sql_server_cdc_with_specific_capture_instance_name(sdc_builder, sdc_exe
         pytest.skip('Test only runs against SQL Server with CDC enabled.')
 
     try:
-        connection = database.engine.connect()
         schema_name = DEFAULT_SCHEMA_NAME
         tables = []
         table_configs = []
@@ -140,15 +141,16 @@ def test_sql_server_cdc_with_specific_capture_instance_name(sdc_builder, sdc_exe
         rows_in_database = setup_sample_data(no_of_threads * no_of_records)
 
         # setup the tables first
+        sample_data = {}
         for index in range(0, no_of_threads):
             table_name = get_random_string(string.ascii_lowercase, 20)
             # split the rows_in_database into no_of_records for each table
             # e.g. for no_of_records=5, the first table inserts rows_in_database[0:5]
             # and the secord table inserts rows_in_database[5:10]
-            table = setup_table(connection, schema_name, table_name,
-                                rows_in_database[(index*no_of_records): ((index+1)*no_of_records)])
-            tables.append(table)
+            sample_data[table_name] = rows_in_database[(index*no_of_records): ((index+1)*no_of_records)]
+            tables.append(table_definition(schema_name, table_name))
             table_configs.append({'capture_instance': f'{schema_name}_{table_name}'})
+        create_tables(database, tables, sample_data, after_create=enable_cdc)
 
         target_rows = rows_in_database[target_table_index * no_of_records: (target_table_index + 1) * no_of_records]
 
@@ -184,9 +186,7 @@ def test_sql_server_cdc_with_specific_capture_instance_name(sdc_builder, sdc_exe
         assert_table_replicated(database, rows_in_database, DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        for table in tables:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
+        drop_tables(database, tables)
 
 
 @database('sqlserver')
@@ -246,13 +246,7 @@ def test_sql_server_cdc_with_empty_initial_offset(sdc_builder, sdc_executor, dat
         assert_table_replicated(database, rows_in_database, DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        if table is not None:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
-
-        if dest_table is not None:
-            logger.info('Dropping table %s in %s database...', dest_table, database.type)
-            dest_table.drop(database.engine)
+        drop_tables(database, [created for created in (table, dest_table) if created is not None])
 
 
 @database('sqlserver')
@@ -324,13 +318,7 @@ def test_sql_server_cdc_with_nonempty_initial_offset(sdc_builder, sdc_executor,
         assert_table_replicated(database, rows_in_database[first_no_of_records:total_no_of_records], DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        if table is not None:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
-
-        if dest_table is not None:
-            logger.info('Dropping table %s in %s database...', dest_table, database.type)
-            dest_table.drop(database.engine)
+        drop_tables(database, [created for created in (table, dest_table) if created is not None])
 
         if connection is not None:
             connection.close()
@@ -403,13 +391,7 @@ def test_sql_server_cdc_with_last_committed_offset(sdc_builder, sdc_executor, da
         assert_table_replicated(database, rows_in_database, DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        if table is not None:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
-
-        if dest_table is not None:
-            logger.info('Dropping table %s in %s database...', dest_table, database.type)
-            dest_table.drop(database.engine)
+        drop_tables(database, [created for created in (table, dest_table) if created is not None])
 
         if connection is not None:
             connection.close()
@@ -480,13 +462,7 @@ def test_sql_server_cdc_insert_and_update(sdc_builder, sdc_executor, database, u
         assert_table_replicated(database, expected_rows_in_database, DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        if table is not None:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
-
-        if dest_table is not None:
-            logger.info('Dropping table %s in %s database...', dest_table, database.type)
-            dest_table.drop(database.engine)
+        drop_tables(database, [created for created in (table, dest_table) if created is not None])
 
         if connection is not None:
             connection.close()
@@ -560,13 +536,7 @@ def test_sql_server_cdc_insert_update_delete(sdc_builder, sdc_executor, database
         assert_table_replicated(database, expected_rows_in_database, DEFAULT_SCHEMA_NAME, dest_table_name)
 
     finally:
-        if table is not None:
-            logger.info('Dropping table %s in %s database...', table, database.type)
-            table.drop(database.engine)
-
-        if dest_table is not None:
-            logger.info('Dropping table %s in %s database...', dest_table, database.type)
-            dest_table.drop(database.engine)
+        drop_tables(database, [created for created in (table, dest_table) if created is not None])
 
         if connection is not None:
             connection.close()
@@ -643,12 +613,7 @@ def test_sql_server_cdc_multiple_tables(sdc_builder, sdc_executor, database, use
         msgs_sent_count = sqlserver_cdc_pipeline_history.latest.metrics.counter('pipeline.batchOutputRecords.counter').count
         assert msgs_sent_count == total_no_of_records
     finally:
-        for index in range(0, no_of_tables):
-            logger.info('Dropping table %s in %s database...', tables[index], database.type)
-            tables[index].drop(database.engine)
-
-        logger.info('Dropping table %s in %s database...', dest_table, database.type)
-        dest_table.drop(database.engine)
+        drop_tables(database, tables + [dest_table])
 
         if connection is not None:
             connection.close()
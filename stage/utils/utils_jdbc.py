@@ -0,0 +1,108 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for setting up and tearing down JDBC test tables
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlalchemy
+
+logger = logging.getLogger(__name__)
+
+# Stay below the default connection pool size plus overflow of SQLAlchemy engines.
+DEFAULT_MAX_WORKERS = 8
+# SQL Server refuses statements with more than 2100 parameters; keep multi-row inserts well below that.
+MAX_INSERT_PARAMETERS = 2000
+# SQL Server also accepts at most 1000 rows in a single INSERT ... VALUES.
+MSSQL_MAX_INSERT_ROWS = 1000
+# Databases accepting several tables in one DROP TABLE statement.
+MULTI_TABLE_DROP_DIALECTS = {'postgresql', 'mysql', 'mssql'}
+
+
+def create_tables(database, tables, rows=None, after_create=None, max_workers=DEFAULT_MAX_WORKERS):
+    """Create tables and fill them concurrently, each on its own pooled connection, using multi-row inserts.
+
+    Args:
+        database: The STF database environment.
+        tables (:obj:`list`): :py:class:`sqlalchemy.Table` instances to create.
+        rows (:obj:`dict`, optional): Rows to insert, as lists of :obj:`dict` keyed by table name.
+        after_create (:obj:`callable`, optional): Called with ``(connection, table)`` after a table is created and
+            before its rows are inserted (e.g. to enable CDC on it).
+        max_workers (:obj:`int`, optional): Maximum number of tables set up at the same time.
+            Default: :py:const:`DEFAULT_MAX_WORKERS`
+    """
+    rows = rows or {}
+
+    def setup(table):
+        with database.engine.connect() as connection:
+            logger.info('Creating table %s in %s database ...', table.name, database.type)
+            table.create(connection)
+            if after_create:
+                after_create(connection, table)
+            if rows.get(table.name):
+                logger.info('Inserting %s rows into table %s in %s database ...',
+                            len(rows[table.name]), table.name, database.type)
+                insert_rows(connection, table, rows[table.name])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Iterating over the results re-raises the first failure, if any.
+        list(executor.map(setup, tables))
+
+
+def insert_rows(connection, table, rows):
+    """Insert rows with as few statements as the database allows."""
+    if not connection.dialect.supports_multivalues_insert:
+        connection.execute(table.insert(), rows)
+        return
+    chunk_size = max(1, MAX_INSERT_PARAMETERS // len(table.columns))
+    if connection.dialect.name == 'mssql':
+        chunk_size = min(MSSQL_MAX_INSERT_ROWS, chunk_size)
+    for start in range(0, len(rows), chunk_size):
+        connection.execute(table.insert().values(rows[start:start + chunk_size]))
+
+
+def drop_tables(database, tables, schema=None):
+    """Drop tables in a single batch, without reflecting them first. Tables that cannot be dropped (e.g. because
+    they don't exist) are logged and skipped.
+
+    Args:
+        database: The STF database environment.
+        tables (:obj:`list`): :py:class:`sqlalchemy.Table` instances or table names.
+        schema (:obj:`str`, optional): Schema of the tables given by name. Default: ``None``
+    """
+    tables = [table if isinstance(table, sqlalchemy.Table) else sqlalchemy.Table(table, sqlalchemy.MetaData(),
+                                                                                  schema=schema)
+              for table in tables]
+    if not tables:
+        return
+
+    preparer = database.engine.dialect.identifier_preparer
+    table_names = [preparer.format_table(table) for table in tables]
+    logger.info('Dropping tables %s in %s database ...', ', '.join(table_names), database.type)
+    if database.engine.dialect.name in MULTI_TABLE_DROP_DIALECTS:
+        try:
+            with database.engine.begin() as connection:
+                connection.execute(f'DROP TABLE {", ".join(table_names)}')
+            return
+        except sqlalchemy.exc.DBAPIError as e:
+            # Typically one of the tables was never created; drop the others one by one.
+            logger.warning('Could not drop all tables at once (%s), dropping them one by one ...', e)
+
+    with database.engine.connect() as connection:
+        for table_name in table_names:
+            try:
+                connection.execute(f'DROP TABLE {table_name}')
+            except sqlalchemy.exc.DBAPIError as e:
+                logger.error('Could not drop table %s: %s', table_name, e)
@@ -0,0 +1,222 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for feeding test data into Kafka
+
+import io
+import json
+import logging
+import threading
+import time
+
+import avro.io
+import avro.schema
+from avro.datafile import DataFileWriter
+
+logger = logging.getLogger(__name__)
+
+# Producer settings for tests sending a handful of messages: batch whatever is sent within a few milliseconds and
+# compress the batches.
+DEFAULT_PRODUCER_CONFIG = {'linger_ms': 5, 'compression_type': 'gzip'}
+# Producer settings for pushing millions of messages: large compressed batches and enough buffer to keep sending
+# while previous batches are in flight.
+HIGH_VOLUME_PRODUCER_CONFIG = {'linger_ms': 50,
+                               'batch_size': 1024 * 1024,
+                               'compression_type': 'gzip',
+                               'buffer_memory': 256 * 1024 * 1024}
+# Number of messages sent between two flushes in high-volume mode.
+DEFAULT_FLUSH_EVERY = 100_000
+
+_producers = {}
+_producers_lock = threading.Lock()
+
+
+def get_producer(cluster, **config):
+    """Return a Kafka producer for the cluster, creating it on first use.
+
+    Producers are shared by all tests of the session, one per cluster and configuration, and closed by
+    :py:func:`close_producers`.
+
+    Args:
+        cluster: The STF cluster with Kafka.
+        **config: Settings passed on to ``cluster.kafka.producer``. Default: :py:const:`DEFAULT_PRODUCER_CONFIG`
+    """
+    config = config or DEFAULT_PRODUCER_CONFIG
+    key = (id(cluster.kafka), tuple(sorted(config.items())))
+    with _producers_lock:
+        if key not in _producers:
+            logger.info('Creating Kafka producer with %s ...', config)
+            _producers[key] = cluster.kafka.producer(**config)
+        return _producers[key]
+
+
+def close_producers():
+    """Flush and close all producers created by :py:func:`get_producer`."""
+    with _producers_lock:
+        for producer in _producers.values():
+            producer.close()
+        _producers.clear()
+
+
+def produce_messages(cluster, topic, messages, encoder=None, key=None, **config):
+    """Send messages to a topic with a pooled producer and wait for all of them to be acknowledged.
+
+    Args:
+        cluster: The STF cluster with Kafka.
+        topic (:obj:`str`): Topic to send to.
+        messages (:obj:`list`): Messages, as :obj:`bytes` or as anything ``encoder`` accepts.
+        encoder (:obj:`callable`, optional): Turns a message into :obj:`bytes`, e.g. :py:func:`avro_encoder`.
+        key (:obj:`callable`, optional): Called with every message to get its key as :obj:`bytes`.
+        **config: Producer settings, see :py:func:`get_producer`.
+
+    Returns:
+        The number of messages sent.
+    """
+    producer = get_producer(cluster, **config)
+    count = _send(producer, topic, messages, encoder, key)
+    producer.flush()
+    return count
+
+
+def produce_message_stream(cluster, topic, messages, encoder=None, key=None, flush_every=DEFAULT_FLUSH_EVERY,
+                           **config):
+    """Send a large, lazily generated stream of messages to a topic.
+
+    Messages are pulled from ``messages`` (typically a generator) as they are sent, so the stream is never held in
+    memory, and the producer is flushed every ``flush_every`` messages to bound the amount of unacknowledged data.
+
+    Args:
+        cluster: The STF cluster with Kafka.
+        topic (:obj:`str`): Topic to send to.
+        messages (:obj:`iterable`): Messages, as :obj:`bytes` or as anything ``encoder`` accepts.
+        encoder (:obj:`callable`, optional): Turns a message into :obj:`bytes`.
+        key (:obj:`callable`, optional): Called with every message to get its key as :obj:`bytes`.
+        flush_every (:obj:`int`, optional): Number of messages between flushes. Default: :py:const:`DEFAULT_FLUSH_EVERY`
+        **config: Producer settings, see :py:func:`get_producer`. Default: :py:const:`HIGH_VOLUME_PRODUCER_CONFIG`
+
+    Returns:
+        The number of messages sent.
+    """
+    producer = get_producer(cluster, **(config or HIGH_VOLUME_PRODUCER_CONFIG))
+    messages = iter(messages)
+    count = 0
+    start = time.time()
+    while True:
+        sent = _send(producer, topic, _take(messages, flush_every), encoder, key)
+        producer.flush()
+        count += sent
+        if sent < flush_every:
+            break
+        logger.debug('Sent %s messages to %s ...', count, topic)
+    elapsed = time.time() - start
+    logger.info('Sent %s messages to %s in %.1f s (%.0f messages/s)', count, topic, elapsed,
+                count / elapsed if elapsed else 0)
+    return count
+
+
+def avro_encoder(schema):
+    """Return a function encoding a datum as schemaless Avro binary, for a schema parsed only once.
+
+    Args:
+        schema (:obj:`dict` or :obj:`str`): The Avro schema.
+    """
+    datum_writer = avro.io.DatumWriter(_parse_avro_schema(schema))
+
+    def encode(datum):
+        bytes_writer = io.BytesIO()
+        datum_writer.write(datum, avro.io.BinaryEncoder(bytes_writer))
+        return bytes_writer.getvalue()
+    return encode
+
+
+def avro_container_encoder(schema):
+    """Return a function encoding a datum as an Avro container file (i.e. with the schema embedded), for a schema
+    parsed only once.
+
+    Args:
+        schema (:obj:`dict` or :obj:`str`): The Avro schema.
+    """
+    parsed_schema = _parse_avro_schema(schema)
+    datum_writer = avro.io.DatumWriter(parsed_schema)
+
+    def encode(datum):
+        bytes_writer = io.BytesIO()
+        data_file_writer = DataFileWriter(writer=bytes_writer, datum_writer=datum_writer, writer_schema=parsed_schema)
+        data_file_writer.append(datum)
+        data_file_writer.flush()
+        raw_bytes = bytes_writer.getvalue()
+        data_file_writer.close()
+        return raw_bytes
+    return encode
+
+
+def protobuf_encoder(descriptor_file, message_type, delimited=True):
+    """Return a function encoding a :obj:`dict` as a protobuf message, for a message class compiled only once from
+    a descriptor file.
+
+    Args:
+        descriptor_file (:obj:`str`): Path of a descriptor set, as written by ``protoc --descriptor_set_out``
+            (e.g. ``resources/protobuf/addressbook.desc``).
+        message_type (:obj:`str`): Full name of the message type, e.g. ``Contact``.
+        delimited (:obj:`bool`, optional): Prefix every message with its varint-encoded length, as expected by stages
+            configured with ``delimited_messages``. Default: ``True``
+    """
+    # protobuf is only needed by the tests producing protobuf messages.
+    from google.protobuf import descriptor_pb2, descriptor_pool, json_format, message_factory
+
+    with open(descriptor_file, 'rb') as f:
+        file_descriptor_set = descriptor_pb2.FileDescriptorSet.FromString(f.read())
+    pool = descriptor_pool.DescriptorPool()
+    for file_descriptor in file_descriptor_set.file:
+        pool.Add(file_descriptor)
+    descriptor = pool.FindMessageTypeByName(message_type)
+    # GetMessageClass replaced MessageFactory.GetPrototype in protobuf 4.x.
+    message_class = (message_factory.GetMessageClass(descriptor) if hasattr(message_factory, 'GetMessageClass')
+                     else message_factory.MessageFactory(pool).GetPrototype(descriptor))
+
+    def encode(datum):
+        raw_bytes = json_format.ParseDict(datum, message_class()).SerializeToString()
+        return _varint(len(raw_bytes)) + raw_bytes if delimited else raw_bytes
+    return encode
+
+
+def _parse_avro_schema(schema):
+    return avro.schema.Parse(schema if isinstance(schema, str) else json.dumps(schema))
+
+
+def _varint(value):
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _take(iterator, count):
+    for _ in range(count):
+        try:
+            yield next(iterator)
+        except StopIteration:
+            return
+
+
+def _send(producer, topic, messages, encoder, key):
+    count = 0
+    for message in messages:
+        producer.send(topic,
+                      encoder(message) if encoder else message,
+                      key=key(message) if key else None)
+        count += 1
+    return count
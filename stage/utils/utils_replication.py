@@ -0,0 +1,199 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for verifying that tables were replicated correctly
+
+import itertools
+import logging
+from collections import namedtuple
+
+import sqlalchemy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10_000
+# Separates the columns of a row, resp. stands for NULL, in the text a row is hashed from.
+COLUMN_SEPARATOR = '|'
+NULL_MARKER = '\\N'
+# Long enough for any column the tests replicate, short enough for VARCHAR casts on every supported database.
+MAX_COLUMN_TEXT_LENGTH = 4000
+
+# Per-dialect SQL computing a 32-bit integer hash of a row's text, formatted with the SQL of that text. The key is
+# part of the text, so the sum of the hashes of a chunk changes whenever a row is missing, extra, changed or moved
+# to another key.
+ROW_HASH_SQL = {
+    'postgresql': "('x' || substr(md5({}), 1, 8))::bit(32)::bigint",
+    'mysql': 'CRC32({})',
+    'mssql': "CAST(CAST(CAST(HASHBYTES('MD5', {}) AS BINARY(4)) AS INT) AS BIGINT)",
+    'oracle': 'ORA_HASH({})',
+}
+
+RowDiff = namedtuple('RowDiff', ['key', 'expected', 'actual'])
+
+
+def assert_tables_replicated(database, source_table, target_table, key, schema=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Assert that two tables hold the same rows.
+
+    Rows are grouped in chunks by ``key // chunk_size`` and every chunk is reduced to a row count and a hash sum
+    inside the database, so only one digest per chunk is transferred. Rows are fetched, one chunk at a time, only for
+    chunks whose digests differ, to report which rows don't match. Databases without a row hash in
+    :py:const:`ROW_HASH_SQL`, and non-integer keys, fall back to streaming both tables in key order chunk by chunk.
+
+    Args:
+        database: The STF database environment.
+        source_table (:obj:`str` or :py:class:`sqlalchemy.Table`): The table that was replicated.
+        target_table (:obj:`str` or :py:class:`sqlalchemy.Table`): The table it was replicated to.
+        key (:obj:`str`): Name of the column identifying rows; unique in both tables.
+        schema (:obj:`str`, optional): Schema of the tables given by name. Default: ``None``
+        chunk_size (:obj:`int`, optional): Number of keys per chunk. Default: :py:const:`DEFAULT_CHUNK_SIZE`
+    """
+    engine = database.engine
+    source_table = _reflect(engine, source_table, schema)
+    target_table = _reflect(engine, target_table, schema)
+    logger.info('Comparing source table %s and target table %s ...', source_table.name, target_table.name)
+
+    if (engine.dialect.name in ROW_HASH_SQL
+            and isinstance(source_table.c[key].type, sqlalchemy.Integer)
+            and isinstance(target_table.c[key].type, sqlalchemy.Integer)):
+        source_digests = chunk_digests(engine, source_table, key, chunk_size)
+        target_digests = chunk_digests(engine, target_table, key, chunk_size)
+        mismatches = sorted(chunk for chunk in source_digests.keys() | target_digests.keys()
+                            if source_digests.get(chunk) != target_digests.get(chunk))
+        logger.info('%s of %s chunks differ', len(mismatches), len(source_digests.keys() | target_digests.keys()))
+        diffs = []
+        for chunk in mismatches:
+            low, high = chunk * chunk_size, (chunk + 1) * chunk_size
+            diffs.extend(_diff_rows(_fetch_range(engine, source_table, key, low, high),
+                                    _fetch_range(engine, target_table, key, low, high),
+                                    source_table.c.keys().index(key)))
+    else:
+        logger.info('No row hash for %s keys in %s database, comparing rows directly',
+                    source_table.c[key].type, engine.dialect.name)
+        diffs = list(_diff_rows(_stream(engine, source_table, key, chunk_size),
+                                _stream(engine, target_table, key, chunk_size),
+                                source_table.c.keys().index(key)))
+
+    assert not diffs, _describe(source_table, target_table, diffs)
+
+
+def assert_table_contains(database, table, expected_rows, key, schema=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Assert that a table holds exactly the given rows.
+
+    The table is streamed in key order, ``chunk_size`` rows at a time, and compared against the expected rows sorted
+    by key, so the table is never loaded as a whole.
+
+    Args:
+        database: The STF database environment.
+        table (:obj:`str` or :py:class:`sqlalchemy.Table`): The table to check.
+        expected_rows (:obj:`list`): Expected rows, as :obj:`dict` keyed by column name.
+        key (:obj:`str`): Name of the column identifying rows; unique in the table.
+        schema (:obj:`str`, optional): Schema of the table given by name. Default: ``None``
+        chunk_size (:obj:`int`, optional): Number of rows fetched at a time. Default: :py:const:`DEFAULT_CHUNK_SIZE`
+    """
+    engine = database.engine
+    table = _reflect(engine, table, schema)
+    columns = table.c.keys()
+    expected = sorted((tuple(row[column] for column in columns) for row in expected_rows),
+                      key=lambda row: row[columns.index(key)])
+    diffs = list(_diff_rows(iter(expected), _stream(engine, table, key, chunk_size), columns.index(key)))
+    assert not diffs, _describe('expected rows', table, diffs)
+
+
+def chunk_digests(engine, table, key, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Compute the digest of every chunk of a table inside the database.
+
+    Returns:
+        A :obj:`dict` mapping chunk numbers to ``(row count, hash sum)``.
+    """
+    preparer = engine.dialect.identifier_preparer
+    row_text = _row_text(table).compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True})
+    # PostgreSQL and SQL Server divide integers towards zero, which would put negative keys in chunk 0; dividing a
+    # decimal floors them into the chunks that _fetch_range reads.
+    chunk = f'FLOOR(CAST({preparer.quote(key)} AS DECIMAL(38, 0)) / {int(chunk_size)})'
+    query = (f'SELECT {chunk} AS chunk, COUNT(*) AS row_count, '
+             f'SUM({ROW_HASH_SQL[engine.dialect.name].format(row_text)}) AS digest '
+             f'FROM {preparer.format_table(table)} GROUP BY {chunk}')
+    with engine.connect() as connection:
+        return {int(row[0]): (int(row[1]), int(row[2])) for row in connection.execute(sqlalchemy.text(query))}
+
+
+def _row_text(table):
+    """SQL expression concatenating all columns of a row as text."""
+    columns = [sqlalchemy.func.coalesce(sqlalchemy.cast(column, sqlalchemy.String(MAX_COLUMN_TEXT_LENGTH)),
+                                        sqlalchemy.literal(NULL_MARKER))
+               for column in table.columns]
+    text = columns[0]
+    for column in columns[1:]:
+        text = text + sqlalchemy.literal(COLUMN_SEPARATOR) + column
+    return text
+
+
+def _reflect(engine, table, schema=None):
+    """Reflect a table given by name or as :py:class:`sqlalchemy.Table`, so that its columns are in database order."""
+    if isinstance(table, sqlalchemy.Table):
+        table, schema = table.name, table.schema
+    return sqlalchemy.Table(table, sqlalchemy.MetaData(), autoload=True, autoload_with=engine, schema=schema)
+
+
+def _fetch_range(engine, table, key, low, high):
+    column = table.c[key]
+    with engine.connect() as connection:
+        return iter(connection.execute(table.select()
+                                       .where(sqlalchemy.and_(column >= low, column < high))
+                                       .order_by(column)).fetchall())
+
+
+def _stream(engine, table, key, chunk_size):
+    """Yield all rows of a table in key order, fetching ``chunk_size`` rows at a time (keyset pagination)."""
+    column = table.c[key]
+    last_key = None
+    with engine.connect() as connection:
+        while True:
+            query = table.select().order_by(column).limit(chunk_size)
+            if last_key is not None:
+                query = query.where(column > last_key)
+            rows = connection.execute(query).fetchall()
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+            last_key = rows[-1][key]
+
+
+def _diff_rows(expected, actual, key_index):
+    """Merge two row iterators sorted by key and yield a :py:class:`RowDiff` for every row that differs."""
+    expected, actual = iter(expected), iter(actual)
+    expected_row, actual_row = next(expected, None), next(actual, None)
+    while expected_row is not None or actual_row is not None:
+        expected_key = expected_row[key_index] if expected_row is not None else None
+        actual_key = actual_row[key_index] if actual_row is not None else None
+        if actual_row is None or (expected_row is not None and expected_key < actual_key):
+            yield RowDiff(expected_key, tuple(expected_row), None)
+            expected_row = next(expected, None)
+        elif expected_row is None or actual_key < expected_key:
+            yield RowDiff(actual_key, None, tuple(actual_row))
+            actual_row = next(actual, None)
+        else:
+            if tuple(expected_row) != tuple(actual_row):
+                yield RowDiff(expected_key, tuple(expected_row), tuple(actual_row))
+            expected_row, actual_row = next(expected, None), next(actual, None)
+
+
+def _describe(expected, actual, diffs, limit=10):
+    lines = [f'{len(diffs)} rows differ between {getattr(expected, "name", expected)} '
+             f'and {getattr(actual, "name", actual)}:']
+    lines.extend(f'  {diff.key}: expected {diff.expected}, got {diff.actual}'
+                 for diff in itertools.islice(diffs, limit))
+    if len(diffs) > limit:
+        lines.append('  ...')
+    return '\n'.join(lines)
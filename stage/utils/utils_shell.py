@@ -0,0 +1,257 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for running shell commands and writing files on SDC's host
+
+import base64
+import http.client as httpclient
+import json
+import logging
+import textwrap
+from collections import namedtuple
+
+from streamsets.sdk.utils import Version
+from streamsets.testframework.utils import get_random_string
+
+logger = logging.getLogger(__name__)
+
+SHELL_SERVICE_PORT = 18632
+
+# Each record carries one script. Records of a request are executed in order and the outcome of every script is
+# sent back to the client through Send Response to Origin.
+SHELL_SERVICE_SCRIPT = """
+    import os
+    import subprocess
+
+    for record in records:
+        environment = dict(os.environ)
+        if record.value['environment_variables']:
+            environment.update(dict((str(key), str(value))
+                                    for key, value in record.value['environment_variables'].items()))
+        process = subprocess.Popen(record.value['script'], shell=True, env=environment,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+        record.value['exit_code'] = process.returncode
+        record.value['stdout'] = stdout
+        record.value['stderr'] = stderr
+        output.write(record)
+"""
+
+# Every record received by the file writer service describes one file. Contents travel base64-encoded so that
+# binary files and arbitrary text survive the trip through the JSON parser untouched. Each file is fsynced before
+# its record is passed on, so by the time the HTTP Server origin acknowledges the request the files are on disk.
+FILE_WRITER_SERVICE_SCRIPT = """
+    import base64
+    import os
+
+    for record in records:
+        file_contents = base64.b64decode(record.value['file_contents'])
+        if record.value['file_data_type'] != 'BINARY':
+            file_contents = file_contents.decode('utf8').encode(record.value['encoding'])
+        with open(record.value['filepath'], 'wb') as f:
+            f.write(file_contents)
+            f.flush()
+            os.fsync(f.fileno())
+        output.write(record)
+"""
+
+FILE_WRITER_SERVICE_PORT = 18631
+# Upper bound (in base64 characters) on the size of a single file sent to the file writer service.
+FILE_WRITER_SERVICE_MAX_FILE_SIZE = 64 * 1024 * 1024
+
+ShellResult = namedtuple('ShellResult', ['script', 'exit_code', 'stdout', 'stderr'])
+
+
+class PipelineService:
+    """Base class of the services that run as one long-lived pipeline on SDC and take requests over HTTP.
+
+    Subclasses build :py:attr:`pipeline` around an HTTP origin listening on :py:attr:`port` that accepts requests
+    carrying :py:attr:`application_id`. A service is a context manager: entering it starts the pipeline, exiting it
+    stops and removes the pipeline.
+
+    Args:
+        sdc_executor: The SDC instance on which the service pipeline runs.
+        port (:obj:`int`): HTTP port the service listens on.
+    """
+    #: Name of the service in log and error messages.
+    name = 'Pipeline service'
+
+    def __init__(self, sdc_executor, port):
+        self.sdc_executor = sdc_executor
+        self.port = port
+        self.application_id = get_random_string()
+        self.pipeline = None
+
+    def start(self):
+        logger.info('Starting %s on port %s ...', self.name.lower(), self.port)
+        self.sdc_executor.add_pipeline(self.pipeline)
+        self.sdc_executor.start_pipeline(self.pipeline)
+
+    def stop(self):
+        if self.sdc_executor.get_pipeline_status(self.pipeline).response.json().get('status') == 'RUNNING':
+            self.sdc_executor.stop_pipeline(self.pipeline)
+        self.sdc_executor.remove_pipeline(self.pipeline)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _post(self, body):
+        """POST newline-delimited JSON records to the service and return the body of its response.
+
+        Plain HTTP is always used, as the HTTP origins of the service pipelines don't inherit SDC's own TLS setting.
+        """
+        connection = httpclient.HTTPConnection(self.sdc_executor.server_host, self.port)
+        try:
+            connection.request('POST', '/', body, {'X-SDC-APPLICATION-ID': self.application_id,
+                                                   'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response_body = response.read()
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise Exception(f'{self.name} failed with HTTP status {response.status}: {response_body}')
+        return response_body
+
+
+class ShellService(PipelineService):
+    """Runs shell scripts on SDC's host through one long-lived REST Service >> Jython Evaluator >> Send Response to
+    Origin pipeline, instead of building and running a Shell executor pipeline per script.
+
+    The service is callable with the same arguments the ``shell_executor`` fixtures always took, and
+    :py:meth:`execute_batch` runs several scripts, in order, in a single round trip.
+
+    The Jython stage library must be installed on the SDC, and the REST Service origin needs SDC 3.4.0 or later.
+
+    Args:
+        sdc_executor: The SDC instance on which the service pipeline runs.
+        port (:obj:`int`, optional): HTTP port the service listens on. Default: :py:const:`SHELL_SERVICE_PORT`
+    """
+    name = 'Shell service'
+
+    def __init__(self, sdc_executor, port=SHELL_SERVICE_PORT):
+        super().__init__(sdc_executor, port)
+
+        builder = sdc_executor.get_pipeline_builder()
+        rest_service = builder.add_stage('REST Service')
+        rest_service.set_attributes(application_id=self.application_id,
+                                    data_format='JSON',
+                                    http_listening_port=port,
+                                    json_content='MULTIPLE_OBJECTS')
+        jython_evaluator = builder.add_stage('Jython Evaluator')
+        jython_evaluator.script = textwrap.dedent(SHELL_SERVICE_SCRIPT)
+        send_response_to_origin = builder.add_stage('Send Response to Origin')
+        send_response_to_origin.status_code = 200
+        rest_service >> jython_evaluator >> send_response_to_origin
+        self.pipeline = builder.build('Shell service pipeline')
+
+    def __call__(self, script, environment_variables=None):
+        """Run a single script. See :py:meth:`execute_batch`.
+
+        Returns:
+            A :py:class:`ShellResult`.
+        """
+        return self.execute_batch([(script, environment_variables)])[0]
+
+    def execute_batch(self, scripts):
+        """Run scripts one after another in SDC's host and wait for all of them to finish.
+
+        A failing script does not prevent the following ones from running; check ``exit_code`` of the results when
+        that matters.
+
+        Args:
+            scripts (:obj:`list`): Scripts as either strings or ``(script, environment_variables)`` tuples, where
+                ``environment_variables`` is a :obj:`dict` or ``None``.
+
+        Returns:
+            A :obj:`list` of :py:class:`ShellResult`, in the same order as ``scripts``.
+        """
+        commands = [(script, None) if isinstance(script, str) else script for script in scripts]
+        if not commands:
+            return []
+
+        body = '\n'.join(json.dumps(dict(index=index, script=script, environment_variables=environment_variables))
+                         for index, (script, environment_variables) in enumerate(commands))
+        records = sorted(json.loads(self._post(body))['data'], key=lambda record: record['index'])
+        if len(records) != len(commands):
+            raise Exception(f'Shell service returned {len(records)} results for {len(commands)} scripts')
+        results = [ShellResult(record['script'], record['exit_code'], record['stdout'], record['stderr'])
+                   for record in records]
+        for result in results:
+            logger.debug('Script %s exited with %s', result.script, result.exit_code)
+        return results
+
+
+class FileWriterService(PipelineService):
+    """Writes files to SDC's local FS through one long-lived HTTP Server >> Jython Evaluator pipeline.
+
+    Any number of files can be sent in a single request; :py:meth:`write_files` only returns once all of them
+    have been written and fsynced by SDC, so writing N files costs one HTTP round trip instead of N pipeline runs.
+    A file that can't be written stops the service pipeline, so that the request, and any later one, raises.
+
+    Args:
+        sdc_executor: The SDC instance on which the service pipeline runs.
+        port (:obj:`int`, optional): HTTP port the service listens on. Default: :py:const:`FILE_WRITER_SERVICE_PORT`
+    """
+    name = 'File writer service'
+
+    def __init__(self, sdc_executor, port=FILE_WRITER_SERVICE_PORT):
+        super().__init__(sdc_executor, port)
+
+        builder = sdc_executor.get_pipeline_builder()
+        http_server = builder.add_stage('HTTP Server')
+        http_server.set_attributes(data_format='JSON',
+                                   http_listening_port=port,
+                                   json_content='MULTIPLE_OBJECTS',
+                                   max_object_length_in_chars=FILE_WRITER_SERVICE_MAX_FILE_SIZE,
+                                   max_request_size_in_mb=2000)
+        if Version(sdc_executor.version) >= Version('3.14.0'):
+            http_server.list_of_application_ids = [{'appId': self.application_id}]
+        else:
+            http_server.application_id = self.application_id
+        jython_evaluator = builder.add_stage('Jython Evaluator')
+        # A file that can't be written fails the batch, and so the request, instead of becoming an error record.
+        jython_evaluator.set_attributes(script=textwrap.dedent(FILE_WRITER_SERVICE_SCRIPT),
+                                        on_record_error='STOP_PIPELINE')
+        trash = builder.add_stage('Trash')
+        http_server >> jython_evaluator >> trash
+        self.pipeline = builder.build('File writer service pipeline')
+
+    def write_file(self, filepath, file_contents, encoding='utf8', file_data_type='NOT_BINARY'):
+        """Write a single file. See :py:meth:`write_files`."""
+        self.write_files([(filepath, file_contents, encoding, file_data_type)])
+
+    def write_files(self, files):
+        """Write a batch of files and wait until all of them are on disk.
+
+        Args:
+            files (:obj:`list`): ``(filepath, file_contents[, encoding[, file_data_type]])`` tuples. ``encoding``
+                defaults to ``'utf8'`` and ``file_data_type`` to ``'NOT_BINARY'``, as in the ``file_writer``
+                fixtures.
+        """
+        body = '\n'.join(json.dumps(self._file_to_record(*file)) for file in files)
+        if body:
+            self._post(body)
+
+    @staticmethod
+    def _file_to_record(filepath, file_contents, encoding='utf8', file_data_type='NOT_BINARY'):
+        if isinstance(file_contents, str):
+            file_contents = file_contents.encode('utf8')
+        return {'filepath': str(filepath),
+                'file_contents': base64.b64encode(file_contents).decode('ascii'),
+                'encoding': encoding,
+                'file_data_type': file_data_type}
@@ -0,0 +1,161 @@
+# Copyright 2020 StreamSets Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A module providing utils for validating many stage configurations at once
+
+import functools
+import json
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 16
+
+# ``issues`` is the issues dict of SDC's validation (issueCount, pipelineIssues, stageIssues), or None if valid.
+ValidationResult = namedtuple('ValidationResult', ['stage_attributes', 'pipeline', 'stage', 'valid', 'issues'])
+
+
+@functools.lru_cache(maxsize=None)
+def stage_pipeline(stage_name, stage_type):
+    """Return a pipeline factory for :py:meth:`ConfigurationValidator.validate`, connecting a single stage the way
+    ``stage/configuration`` tests do: ``<stage> >> trash`` for origins, ``dev_raw_data_source >> <stage> >> trash``
+    for processors and ``dev_raw_data_source >> <stage>`` for destinations and executors.
+
+    The same arguments return the same factory, so that results are shared between tests.
+
+    Args:
+        stage_name (:obj:`str`): Label of the stage, as passed to ``add_stage``.
+        stage_type (:obj:`str`): ``'origin'``, ``'processor'``, ``'destination'`` or ``'executor'``.
+    """
+    def build(pipeline_builder, stage_attributes):
+        stage = pipeline_builder.add_stage(stage_name, type=stage_type)
+        stage.set_attributes(**stage_attributes)
+        if stage_type == 'origin':
+            stage >> pipeline_builder.add_stage('Trash')
+            return stage
+
+        dev_raw_data_source = pipeline_builder.add_stage('Dev Raw Data Source')
+        dev_raw_data_source.set_attributes(data_format='JSON', raw_data='{}')
+        dev_raw_data_source >> stage
+        if stage_type == 'processor':
+            stage >> pipeline_builder.add_stage('Trash')
+        return stage
+    return build
+
+
+class ConfigurationValidator:
+    """Validates a matrix of stage configurations in one round: one pipeline is built per attribute set, all of them
+    are added to SDC at once and validated concurrently through SDC's validate API, which doesn't start them.
+
+    Results are cached by pipeline factory and attributes, so parametrized tests of the same matrix can each ask for
+    the whole matrix and assert on their own configuration; only the first one waits for SDC. Use it through the
+    ``configuration_validator`` fixture, e.g.::
+
+        CONFIGURATIONS = [{'extra_fields': 'DISCARD', 'fields_to_order': ['/f2', '/f1']},
+                          {'extra_fields': 'TO_ERROR', 'fields_to_order': ['/f2', '/f1']}]
+
+        @pytest.mark.parametrize('stage_attributes', CONFIGURATIONS)
+        def test_extra_fields_accepted(configuration_validator, stage_attributes):
+            result = configuration_validator.validate(stage_pipeline('Field Order', 'processor'), CONFIGURATIONS,
+                                                      stage_attributes)
+            assert result.valid
+
+    Args:
+        sdc_builder: The SDC instance building the pipelines.
+        sdc_executor: The SDC instance validating them.
+        max_workers (:obj:`int`, optional): Maximum number of concurrent validations. Default:
+            :py:const:`DEFAULT_MAX_WORKERS`
+    """
+    def __init__(self, sdc_builder, sdc_executor, max_workers=DEFAULT_MAX_WORKERS):
+        self.sdc_builder = sdc_builder
+        self.sdc_executor = sdc_executor
+        self.max_workers = max_workers
+        # (pipeline factory, attributes as JSON): ValidationResult.
+        self._results = {}
+        self._pipelines = []
+
+    def validate(self, build_pipeline, configurations, stage_attributes=None):
+        """Validate every configuration not validated yet with the given factory.
+
+        Args:
+            build_pipeline (:obj:`callable`): Takes a pipeline builder and a dict of stage attributes, adds the
+                stages, and returns the stage under test, e.g. :py:func:`stage_pipeline`.
+            configurations (:obj:`list`): Dicts of stage attributes.
+            stage_attributes (:obj:`dict`, optional): If given, only the result of this configuration is returned.
+                Default: ``None``
+
+        Returns:
+            The :py:class:`ValidationResult` of ``stage_attributes`` if given, else a :obj:`list` of the results of
+            ``configurations``, in order.
+        """
+        pending = {}
+        for configuration in list(configurations) + ([stage_attributes] if stage_attributes is not None else []):
+            key = self._key(build_pipeline, configuration)
+            if key not in self._results and key not in pending:
+                pending[key] = configuration
+        if pending:
+            self._validate_all(build_pipeline, list(pending.values()))
+
+        if stage_attributes is not None:
+            return self._results[self._key(build_pipeline, stage_attributes)]
+        return [self._results[self._key(build_pipeline, configuration)] for configuration in configurations]
+
+    def remove_pipelines(self):
+        for pipeline in self._pipelines:
+            self.sdc_executor.remove_pipeline(pipeline)
+        self._pipelines = []
+
+    def _validate_all(self, build_pipeline, configurations):
+        built = []
+        for index, configuration in enumerate(configurations):
+            pipeline_builder = self.sdc_builder.get_pipeline_builder()
+            stage = build_pipeline(pipeline_builder, dict(configuration))
+            built.append((configuration, pipeline_builder.build(f'Configuration validation {index}'), stage))
+        pipelines = [pipeline for _, pipeline, _ in built]
+        self.sdc_executor.add_pipeline(*pipelines)
+        self._pipelines.extend(pipelines)
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            issues = list(executor.map(self._issues, pipelines))
+        logger.info('Validated %s configurations in %.1f s, %s of them invalid', len(built), time.time() - start,
+                    sum(1 for pipeline_issues in issues if pipeline_issues is not None))
+
+        for (configuration, pipeline, stage), pipeline_issues in zip(built, issues):
+            self._results[self._key(build_pipeline, configuration)] = ValidationResult(
+                stage_attributes=configuration, pipeline=pipeline, stage=stage, valid=pipeline_issues is None,
+                issues=pipeline_issues)
+
+    def _issues(self, pipeline):
+        try:
+            self.sdc_executor.validate_pipeline(pipeline)
+            return None
+        except Exception as error:
+            if getattr(error, 'issues', None) is None:
+                raise
+            return error.issues
+
+    @staticmethod
+    def _key(build_pipeline, configuration):
+        return build_pipeline, json.dumps(configuration, sort_keys=True, default=str)
+
+
+def stage_issue_messages(result):
+    """Messages of the issues raised by the stage under test of a :py:class:`ValidationResult`."""
+    if result.issues is None:
+        return []
+    return [issue['message'] for issue in result.issues.get('stageIssues', {}).get(result.stage.instance_name, [])]